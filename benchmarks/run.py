@@ -0,0 +1,302 @@
+"""
+Бенчмарки сервісів БД на синтетичних даних (10k / 100k / 1M рядків у таблиці).
+
+Для кожного розміру генерується (або береться з кешу) детермінована БД, копіюється
+у тимчасовий файл (методи запису змінюють дані) і кожен метод викликається repeat
+разів з аргументами з фіксованим seed. Звіт: медіана, p95 та мінімум часу виклику,
+пік виділеної пам'яті (tracemalloc, окремий прохід, щоб не впливати на час).
+
+    python benchmarks/run.py --sizes 10k,100k
+    python benchmarks/run.py --sizes 10k,100k,1m --save-baseline
+    python benchmarks/run.py --sizes 100k --baseline benchmarks/baseline.json --threshold 0.25
+
+Порівняння з baseline-файлом позначає REGRESSION, якщо медіана часу або пік пам'яті
+гірші більше ніж на threshold, і завершується з кодом 1. Baseline записується лише
+з --save-baseline і має сенс тільки для тієї ж машини та версій Python/SQLite.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import datagen # noqa: E402 (налаштовує sys.path та змінні середовища для Config)
+
+from services.database_service import DatabaseService, user_cache
+from services.db_pool import db_pool
+from services.migrations import Migrator
+from services.order_service import OrderService
+from services.payment_service import PaymentService
+from services.write_queue import write_queue
+
+from config import Config
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "gradle-benchmarks")
+
+# Мінімальна різниця, менша за яку відхилення не вважається регресією (шум вимірювання)
+MIN_TIME_DELTA = 0.00005 # 50 мкс
+MIN_MEMORY_DELTA = 4096 # байт
+
+Call = Callable[[], Awaitable[Any]]
+
+class Case:
+    """Один метод сервісу: фабрика викликів з детермінованими аргументами."""
+
+    def __init__(self, name: str, make_call: Callable[[random.Random], Call], repeat_divisor: int = 1):
+        self.name = name
+        self.make_call = make_call
+        self.repeat_divisor = repeat_divisor # для запитів, що повертають тисячі рядків
+
+def build_cases(size: int) -> List[Case]:
+    database_service = DatabaseService()
+    order_service = OrderService()
+    payment_service = PaymentService()
+    workers = list(datagen.worker_ids())
+
+    def random_user(rng: random.Random) -> int:
+        return datagen.user_id(rng.randrange(size))
+
+    def random_order(rng: random.Random) -> str:
+        return datagen.order_id(rng.randrange(size))
+
+    def get_user(rng: random.Random) -> Call:
+        user_id = random_user(rng)
+        async def call():
+            # Без кешу: вимірюємо запит до БД, а не LRU
+            user_cache.clear()
+            return await database_service.get_by_id('user_data', 'ID', user_id)
+        return call
+
+    def create_order(rng: random.Random) -> Call:
+        order_data = {
+            "ID_user": random_user(rng),
+            "subject": "maths",
+            "type_work": "1",
+            "order_details": "Бенчмарк",
+        }
+        return lambda: order_service.create_order(order_data)
+
+    return [
+        Case("DatabaseService.get_by_id[order_request]",
+             lambda rng: (lambda order_id=random_order(rng):
+                          database_service.get_by_id('order_request', 'ID_order', order_id))),
+        Case("DatabaseService.get_by_id[user_data]", get_user),
+        Case("DatabaseService.get_all_by_field[ID_user]",
+             lambda rng: (lambda user_id=random_user(rng):
+                          database_service.get_all_by_field('order_request', 'ID_user', user_id))),
+        Case("DatabaseService.get_all_by_field[status=NEW]",
+             lambda rng: (lambda: database_service.get_all_by_field('order_request', 'status', 1)),
+             repeat_divisor=50),
+        Case("DatabaseService.get_worker_statistics",
+             lambda rng: (lambda worker_id=rng.choice(workers):
+                          database_service.get_worker_statistics(worker_id))),
+        Case("OrderService.create_order", create_order),
+        Case("OrderService.get_worker_orders",
+             lambda rng: (lambda worker_id=rng.choice(workers): OrderService.get_worker_orders(worker_id)),
+             repeat_divisor=10),
+        Case("PaymentService.get_unpaid_orders",
+             lambda rng: (lambda user_id=random_user(rng): payment_service.get_unpaid_orders(user_id, 0))),
+        Case("PaymentService.mark_confirm_pay",
+             lambda rng: (lambda order_id=random_order(rng): payment_service.mark_confirm_pay(order_id))),
+    ]
+
+def percentile(values: List[float], percent: float) -> float:
+    """Percentile методом найближчого рангу (values відсортовані)."""
+    rank = max(0, min(len(values) - 1, int(round(percent / 100 * len(values) + 0.5)) - 1))
+    return values[rank]
+
+async def measure(case: Case, repeat: int, warmup: int, memory_repeat: int, seed: int) -> Dict[str, Any]:
+    """Час (медіана/p95/мін) та пік пам'яті для repeat викликів методу."""
+    repeat = max(3, repeat // case.repeat_divisor)
+    rng = random.Random(f"{seed}:{case.name}")
+    calls = [case.make_call(rng) for _ in range(warmup + repeat)]
+
+    for call in calls[:warmup]:
+        await call()
+
+    timings = []
+    gc.collect()
+    gc.disable()
+    try:
+        for call in calls[warmup:]:
+            started_at = time.perf_counter()
+            await call()
+            timings.append(time.perf_counter() - started_at)
+    finally:
+        gc.enable()
+
+    # Окремий прохід під tracemalloc: він уповільнює виконання в кілька разів
+    peaks = []
+    for call in calls[warmup:warmup + max(1, min(memory_repeat, repeat))]:
+        tracemalloc.start()
+        try:
+            await call()
+            peaks.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "repeat": repeat,
+        "median_s": timings[len(timings) // 2],
+        "p95_s": percentile(timings, 95),
+        "min_s": timings[0],
+        "peak_memory_b": sorted(peaks)[len(peaks) // 2],
+    }
+
+def prepare_dataset(size: int, data_dir: str, regenerate: bool) -> str:
+    """Шлях до кешованої БД потрібного розміру (генерується за потреби)."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"bench_{datagen.format_size(size)}.sqlite")
+    if regenerate or not datagen.is_current(path, size):
+        print(f"Генерація даних {datagen.format_size(size)}...", flush=True)
+        elapsed = datagen.generate(path, size)
+        print(f"  готово за {elapsed:.1f} с", flush=True)
+    return path
+
+async def run_size(size: int, template: str, args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    workdir = tempfile.mkdtemp(prefix="gradle-bench-")
+    path = os.path.join(workdir, "bench.sqlite")
+    shutil.copyfile(template, path)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    await db_pool.open(path, Config.DB_POOL_SIZE)
+    try:
+        # Кешовані дані могли бути згенеровані до нових міграцій - доводимо схему до актуальної
+        await Migrator.migrate()
+        await write_queue.start()
+        for case in build_cases(size):
+            if args.only and not any(part in case.name for part in args.only):
+                continue
+            results[case.name] = await measure(case, args.repeat, args.warmup, args.memory_repeat, args.seed)
+            print_result(datagen.format_size(size), case.name, results[case.name])
+    finally:
+        await write_queue.stop()
+        await db_pool.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+def print_result(size: str, name: str, result: Dict[str, Any], verdict: str = "") -> None:
+    print(
+        f"{size:>5}  {name:<48}{result['repeat']:>6}"
+        f"{result['median_s'] * 1000:>10.3f}{result['p95_s'] * 1000:>10.3f}{result['min_s'] * 1000:>10.3f}"
+        f"{result['peak_memory_b'] / 1024:>11.1f}  {verdict}"
+    )
+
+def compare(results: Dict[str, Dict[str, Dict[str, Any]]], baseline: Dict[str, Any],
+            threshold: float) -> List[Tuple[str, str, str]]:
+    """
+    Порівняння результатів з baseline
+
+    Return:
+        List[Tuple[str, str, str]] - регресії (розмір, метод, опис)
+    """
+    regressions = []
+    for size, cases in results.items():
+        for name, result in cases.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if not base:
+                continue
+
+            time_delta = result["median_s"] - base["median_s"]
+            if time_delta > MIN_TIME_DELTA and result["median_s"] > base["median_s"] * (1 + threshold):
+                regressions.append((size, name,
+                    f"час {base['median_s'] * 1000:.3f} -> {result['median_s'] * 1000:.3f} мс"))
+
+            memory_delta = result["peak_memory_b"] - base["peak_memory_b"]
+            if memory_delta > MIN_MEMORY_DELTA and result["peak_memory_b"] > base["peak_memory_b"] * (1 + threshold):
+                regressions.append((size, name,
+                    f"пам'ять {base['peak_memory_b'] / 1024:.1f} -> {result['peak_memory_b'] / 1024:.1f} КБ"))
+    return regressions
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Бенчмарки сервісів БД на синтетичних даних")
+    parser.add_argument("--sizes", default="10k,100k", help="розміри через кому (10k,100k,1m)")
+    parser.add_argument("--repeat", type=int, default=200, help="викликів кожного методу")
+    parser.add_argument("--warmup", type=int, default=20, help="викликів для прогріву (не рахуються)")
+    parser.add_argument("--memory-repeat", type=int, default=5, help="викликів під tracemalloc")
+    parser.add_argument("--seed", type=int, default=datagen.SEED)
+    parser.add_argument("--only", action="append", help="тільки методи, що містять рядок (можна кілька)")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="каталог кешу згенерованих БД")
+    parser.add_argument("--regenerate", action="store_true", help="згенерувати дані заново")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="файл baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="записати результати як baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="допустиме погіршення (0.2 = 20%%)")
+    parser.add_argument("--json", help="зберегти результати в JSON-файл")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    sizes = [datagen.parse_size(size) for size in args.sizes.split(",") if size.strip()]
+    print(f"{'розм':>5}  {'метод':<48}{'к-сть':>6}{'мед мс':>10}{'p95 мс':>10}{'мін мс':>10}{'пік КБ':>11}")
+
+    results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for size in sizes:
+        template = prepare_dataset(size, args.data_dir, args.regenerate)
+        results[datagen.format_size(size)] = asyncio.run(run_size(size, template, args))
+
+    report = {
+        "environment": environment(),
+        "dataset_version": datagen.DATASET_VERSION,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nBaseline збережено в {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nBaseline {args.baseline} не знайдено, порівняння пропущено (--save-baseline створить його)")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("environment") != report["environment"]:
+        print("\nУвага: baseline записано в іншому середовищі, порівняння може бути неточним")
+    if baseline.get("dataset_version") != datagen.DATASET_VERSION or baseline.get("seed") != args.seed:
+        print("\nBaseline записано на інших даних (версія генератора або seed), порівняння пропущено")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if not regressions:
+        print(f"\nРегресій відносно baseline немає (поріг {args.threshold:.0%})")
+        return 0
+
+    print(f"\nREGRESSION (поріг {args.threshold:.0%}):")
+    for size, name, description in regressions:
+        print(f"  {size:>5}  {name}: {description}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
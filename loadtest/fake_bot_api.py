@@ -0,0 +1,190 @@
+import asyncio
+import itertools
+import json
+import time
+
+from aiohttp import web
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional
+
+# Методи, що повертають Message
+MESSAGE_METHODS = {
+    "sendMessage", "sendPhoto", "sendDocument", "sendVideo", "sendVoice", "sendAudio",
+    "sendAnimation", "sendSticker", "sendLocation", "sendContact", "forwardMessage",
+    "editMessageText", "editMessageCaption", "editMessageReplyMarkup", "editMessageMedia",
+}
+
+# Поля запиту з файлами (в multipart приходять як файл або file_id)
+MEDIA_FIELDS = ("photo", "document", "video", "voice", "audio", "animation")
+
+class FakeBotAPI:
+    """
+    Локальний сервер, що відповідає на запити бота замість api.telegram.org.
+
+    Записує всі виклики методів (лічильники та останні max_records повідомлень),
+    повертає правдоподібні відповіді (Message, список Message для sendMediaGroup,
+    True для решти) та віддає оновлення з push_update() через getUpdates (long polling).
+    latency - штучна затримка кожної відповіді (секунди), імітує мережу до Telegram.
+    """
+
+    def __init__(self, bot_id: int = 123456, latency: float = 0.0, max_records: int = 10000):
+        self.bot_id = bot_id
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self.records: Deque[Dict[str, Any]] = deque(maxlen=max_records)
+        self.base_url = ""
+
+        self._message_ids = itertools.count(1_000_000)
+        self._updates: List[Dict[str, Any]] = []
+        self._updates_changed = asyncio.Condition()
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Запуск сервера
+
+        Return:
+            str - базова адреса для Config.TELEGRAM_API_URL (наприклад http://127.0.0.1:8081)
+        """
+        app = web.Application()
+        app.router.add_route("*", "/bot{token}/{method}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def push_update(self, update: Dict[str, Any]) -> None:
+        """Додає оновлення в чергу getUpdates."""
+        async with self._updates_changed:
+            self._updates.append(update)
+            self._updates_changed.notify_all()
+
+    @property
+    def pending_updates(self) -> int:
+        return len(self._updates)
+
+    def sent_to(self, chat_id: int) -> List[Dict[str, Any]]:
+        """Записані повідомлення в чат chat_id (з останніх max_records)."""
+        return [record for record in self.records if record.get("chat_id") == chat_id]
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = await self._read_params(request)
+        self.calls[method] += 1
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if method == "getUpdates":
+            result = await self._get_updates(params)
+        else:
+            result = self._result(method, params)
+
+        return web.json_response({"ok": True, "result": result})
+
+    @staticmethod
+    async def _read_params(request: web.Request) -> Dict[str, Any]:
+        if request.content_type == "application/json":
+            return await request.json()
+
+        params: Dict[str, Any] = {}
+        for name, value in (await request.post()).items():
+            if isinstance(value, web.FileField):
+                params[name] = value.filename
+                continue
+            # Складні параметри aiogram передає як JSON-рядки
+            try:
+                params[name] = json.loads(value)
+            except ValueError:
+                params[name] = value
+        return params
+
+    async def _get_updates(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        offset = int(params.get("offset") or 0)
+        timeout = float(params.get("timeout") or 0)
+        limit = int(params.get("limit") or 100)
+
+        async with self._updates_changed:
+            # offset підтверджує отримання всіх попередніх оновлень
+            self._updates = [update for update in self._updates if update["update_id"] >= offset]
+            if not self._updates and timeout:
+                try:
+                    await asyncio.wait_for(self._updates_changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            return self._updates[:limit]
+
+    def _result(self, method: str, params: Dict[str, Any]) -> Any:
+        if method == "getMe":
+            return {
+                "id": self.bot_id, "is_bot": True, "first_name": "Load test bot",
+                "username": "loadtest_bot", "can_join_groups": True,
+                "can_read_all_group_messages": False, "supports_inline_queries": False,
+            }
+        if method == "getWebhookInfo":
+            return {"url": "", "has_custom_certificate": False, "pending_update_count": self.pending_updates}
+        if method == "sendMediaGroup":
+            return [self._message(method, params, item) for item in params.get("media", [])]
+        if method == "copyMessage":
+            self._record(method, params)
+            return {"message_id": next(self._message_ids)}
+        if method in MESSAGE_METHODS:
+            return self._message(method, params)
+        # answerCallbackQuery, deleteMessage, setWebhook, deleteWebhook, setMyCommands...
+        return True
+
+    def _record(self, method: str, params: Dict[str, Any], item: Optional[Dict[str, Any]] = None) -> None:
+        try:
+            chat_id = int(params.get("chat_id"))
+        except (TypeError, ValueError):
+            chat_id = params.get("chat_id")
+        source = item or params
+        self.records.append({
+            "method": method,
+            "chat_id": chat_id,
+            "text": source.get("text") or source.get("caption"),
+            "at": time.time(),
+        })
+
+    def _message(self, method: str, params: Dict[str, Any], item: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        self._record(method, params, item)
+        chat_id = params.get("chat_id") or 0
+        try:
+            chat = {"id": int(chat_id), "type": "private" if int(chat_id) > 0 else "supergroup"}
+        except (TypeError, ValueError):
+            chat = {"id": -1, "type": "channel", "username": str(chat_id).lstrip("@")}
+
+        message: Dict[str, Any] = {
+            "message_id": params.get("message_id") or next(self._message_ids),
+            "date": int(time.time()),
+            "chat": chat,
+            "from": {"id": self.bot_id, "is_bot": True, "first_name": "Load test bot"},
+        }
+        source = item or params
+        if source.get("text"):
+            message["text"] = source["text"]
+        if source.get("caption"):
+            message["caption"] = source["caption"]
+        for field in MEDIA_FIELDS:
+            if field == (item or {}).get("type") or field in params:
+                message.update(_media_stub(field))
+        return message
+
+def _media_stub(field: str) -> Dict[str, Any]:
+    file = {"file_id": f"fake-{field}", "file_unique_id": f"fake-{field}-unique"}
+    if field == "photo":
+        return {"photo": [dict(file, width=1, height=1)]}
+    if field in ("video", "animation"):
+        return {field: dict(file, width=1, height=1, duration=1)}
+    if field in ("voice", "audio"):
+        return {field: dict(file, duration=1)}
+    return {field: file}
@@ -0,0 +1,449 @@
+"""
+Навантажувальний тест бота з fake Bot API.
+
+N користувачів реєструються, оформлюють замовлення та оплачують їх, а W виконавців
+(адміністраторів) беруть замовлення, ставлять ціну, підтверджують оплату й надсилають
+роботу. Бот працює з тими ж роутерами, сервісами та БД, що й у продакшені, але запити
+до Telegram йдуть на локальний FakeBotAPI. Для кожного кроку сценарію виводяться
+p50/p95/p99 часу обробки оновлення та часу роботи з БД.
+
+Запуск з кореня репозиторію:
+    python loadtest/run.py --users 200 --workers 5 --transport polling
+    python loadtest/run.py --users 50 --orders-per-user 3 --json report.json
+
+Транспорти: feed (dp.feed_update напряму), polling (getUpdates з fake-сервера),
+webhook (POST на aiohttp-сервер бота). Ліміти вихідних повідомлень за замовчуванням
+вимкнені, щоб вимірювати обробники, а не паузи Telegram (--rate-limit вмикає їх).
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_bot_api import FakeBotAPI
+
+BOT_TOKEN = "123456:loadtest"
+WORKER_BASE_ID = 1000
+USER_BASE_ID = 100000
+WEBHOOK_SECRET = "loadtest-secret"
+
+# Кроки сценарію в порядку виконання (для звіту)
+REGISTRATION_STEPS = ["start", "contact", "full_name", "patronymic", "education", "course", "group"]
+ORDER_STEPS = [
+    "order", "order_confirm", "subject", "type_work", "comment",
+    "take_order", "put_price", "price", "pay_order", "paid", "confirm_pay",
+    "send_work", "work_text", "finish_sending", "complete_order",
+]
+
+def percentile(values: List[float], percent: float) -> float:
+    """Percentile методом найближчого рангу (values відсортовані)."""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, int(round(percent / 100 * len(values) + 0.5)) - 1))
+    return values[rank]
+
+class StepStats:
+    __slots__ = ("latency", "db_time", "db_calls", "errors")
+
+    def __init__(self):
+        self.latency: List[float] = []
+        self.db_time: List[float] = []
+        self.db_calls = 0
+        self.errors = 0
+
+    def summary(self) -> Dict[str, Any]:
+        latency = sorted(self.latency)
+        db_time = sorted(self.db_time)
+        return {
+            "count": len(latency),
+            "errors": self.errors,
+            "latency_ms": {f"p{p}": round(percentile(latency, p) * 1000, 2) for p in (50, 95, 99)},
+            "db_ms": {f"p{p}": round(percentile(db_time, p) * 1000, 2) for p in (50, 95, 99)},
+            "db_calls_per_update": round(self.db_calls / len(latency), 2) if latency else 0,
+        }
+
+class LoadTest:
+    """Сценарій навантаження та вимірювання часу обробки оновлень."""
+
+    def __init__(self, args: argparse.Namespace, fake_api: FakeBotAPI):
+        self.args = args
+        self.fake_api = fake_api
+        self.stats: Dict[str, StepStats] = defaultdict(StepStats)
+        self.failures: List[str] = []
+
+        self.runner = None
+        self.dp = None
+        self.bot = None
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._steps: Dict[int, str] = {}
+        self._worker_locks: Dict[int, asyncio.Lock] = {}
+        self._webhook_runner = None
+        self._webhook_url = ""
+        self._http = None
+        self._polling_task: Optional[asyncio.Task] = None
+
+    # --- Підготовка бота -------------------------------------------------
+
+    async def setup(self) -> None:
+        from main import BotRunner
+        from utils.concurrency import UpdateConcurrencyMiddleware
+
+        self.runner = BotRunner()
+        self.runner.concurrency = UpdateConcurrencyMiddleware(self.args.concurrency)
+        await self.runner.setup()
+        self.bot, self.dp = self.runner.bot, self.runner.dp
+
+        # Після обмеження одночасності: час у черзі семафора не рахується як час обробки
+        self.dp.update.outer_middleware(self._probe)
+
+        if self.args.transport == "polling":
+            self._polling_task = asyncio.create_task(self.dp.start_polling(
+                self.bot, handle_signals=False, close_bot_session=False, polling_timeout=1
+            ))
+        elif self.args.transport == "webhook":
+            await self._start_webhook()
+
+    async def _start_webhook(self) -> None:
+        import aiohttp
+        from aiohttp import web
+        from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+
+        app = web.Application()
+        SimpleRequestHandler(
+            dispatcher=self.dp, bot=self.bot, secret_token=WEBHOOK_SECRET, handle_in_background=True
+        ).register(app, path="/webhook")
+        self._webhook_runner = web.AppRunner(app, access_log=None)
+        await self._webhook_runner.setup()
+        site = web.TCPSite(self._webhook_runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self._webhook_url = f"http://127.0.0.1:{port}/webhook"
+        self._http = aiohttp.ClientSession()
+
+    async def close(self) -> None:
+        if self._polling_task is not None:
+            try:
+                await self.dp.stop_polling()
+            except RuntimeError:
+                pass
+            await self._polling_task
+        if self._http is not None:
+            await self._http.close()
+        if self._webhook_runner is not None:
+            await self._webhook_runner.cleanup()
+        if self.runner is not None:
+            await self.runner.concurrency.drain()
+            await self.runner.shutdown()
+
+    async def _probe(self, handler, event, data):
+        """Outer middleware: час обробки оновлення та час роботи з БД у ньому."""
+        from services.db_pool import QueryTimer, db_timer
+
+        timer = QueryTimer(db_timer.get())
+        token = db_timer.set(timer)
+        started_at = time.perf_counter()
+        error = None
+        try:
+            return await handler(event, data)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            elapsed = time.perf_counter() - started_at
+            db_timer.reset(token)
+
+            stats = self.stats[self._steps.pop(event.update_id, "other")]
+            stats.latency.append(elapsed)
+            stats.db_time.append(timer.total)
+            stats.db_calls += timer.count
+            if error is not None:
+                stats.errors += 1
+
+            future = self._pending.pop(event.update_id, None)
+            if future is not None and not future.done():
+                future.set_result(error)
+
+    # --- Оновлення ------------------------------------------------------
+
+    @staticmethod
+    def _user(user_id: int) -> Dict[str, Any]:
+        return {
+            "id": user_id, "is_bot": False, "first_name": f"User{user_id}",
+            "username": f"user{user_id}", "language_code": "uk",
+        }
+
+    def _message(self, user_id: int, **content: Any) -> Dict[str, Any]:
+        return {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": self._user(user_id),
+            **content,
+        }
+
+    async def send_message(self, step: str, user_id: int, **content: Any) -> None:
+        await self._send(step, {"message": self._message(user_id, **content)})
+
+    async def send_callback(self, step: str, user_id: int, data: str, text: str = "...") -> None:
+        message = self._message(user_id, text=text)
+        message["from"] = {"id": self.bot.id, "is_bot": True, "first_name": "Load test bot"}
+        await self._send(step, {"callback_query": {
+            "id": str(next(self._message_ids)),
+            "from": self._user(user_id),
+            "chat_instance": str(user_id),
+            "message": message,
+            "data": data,
+        }})
+
+    async def _send(self, step: str, payload: Dict[str, Any]) -> None:
+        from aiogram.types import Update
+
+        update_id = next(self._update_ids)
+        payload = {"update_id": update_id, **payload}
+        future = asyncio.get_running_loop().create_future()
+        self._pending[update_id] = future
+        self._steps[update_id] = step
+
+        try:
+            if self.args.transport == "polling":
+                await self.fake_api.push_update(payload)
+            elif self.args.transport == "webhook":
+                async with self._http.post(
+                    self._webhook_url, json=payload,
+                    headers={"X-Telegram-Bot-Api-Secret-Token": WEBHOOK_SECRET}
+                ) as response:
+                    response.raise_for_status()
+            else:
+                update = Update.model_validate(payload, context={"bot": self.bot})
+                asyncio.create_task(self.dp.feed_update(self.bot, update))
+
+            error = await asyncio.wait_for(future, self.args.step_timeout)
+        except asyncio.TimeoutError:
+            self._pending.pop(update_id, None)
+            self.stats[self._steps.pop(update_id, step)].errors += 1
+            raise RuntimeError(f"крок {step}: оновлення {update_id} не оброблено за {self.args.step_timeout} с")
+
+        if error is not None:
+            raise RuntimeError(f"крок {step}: {error!r}")
+        if self.args.think:
+            await asyncio.sleep(self.args.think)
+
+    # --- Сценарій -------------------------------------------------------
+
+    async def register(self, user_id: int) -> None:
+        await self.send_message("start", user_id, text="/start")
+        await self.send_message("contact", user_id, contact={
+            "phone_number": f"+380{user_id:09d}", "first_name": f"User{user_id}", "user_id": user_id
+        })
+        await self.send_message("full_name", user_id, text=f"Ім'я{user_id}")
+        await self.send_message("patronymic", user_id, text=f"Прізвище{user_id}")
+        await self.send_message("education", user_id, text="Олександрійський Політех")
+        await self.send_message("course", user_id, text="1")
+        await self.send_message("group", user_id, text="ПК-251")
+
+    async def _last_order_id(self, user_id: int) -> str:
+        from services.db_pool import db_pool
+
+        async with db_pool.reader() as db:
+            async with db.execute(
+                "SELECT ID_order FROM order_request WHERE ID_user = ? ORDER BY ID_order DESC LIMIT 1",
+                (user_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+        if not row:
+            raise RuntimeError(f"замовлення користувача {user_id} не створено")
+        return row["ID_order"]
+
+    async def order(self, user_id: int, worker_id: int) -> None:
+        from utils.callbacks import OrderAction, OrderCallback, PaymentAction, PaymentCallback
+
+        def order_cb(action: OrderAction) -> str:
+            return OrderCallback(action=action, order_id=order_id).pack()
+
+        def payment_cb(action: PaymentAction) -> str:
+            return PaymentCallback(action=action, order_id=order_id).pack()
+
+        await self.send_message("order", user_id, text="/order")
+        await self.send_callback("order_confirm", user_id, "yes")
+        await self.send_callback("subject", user_id, "maths")
+        await self.send_callback("type_work", user_id, "1")
+        await self.send_message("comment", user_id, text=f"Навантажувальний тест {user_id}")
+        order_id = await self._last_order_id(user_id)
+
+        # Стан FSM виконавця один на чат, тому його кроки з різними замовленнями не змішуємо
+        async with self._worker_locks[worker_id]:
+            await self.send_callback("take_order", worker_id, order_cb(OrderAction.TAKE), text=f"Замовлення {order_id}")
+            await self.send_callback("put_price", worker_id, payment_cb(PaymentAction.PUT_PRICE))
+            await self.send_message("price", worker_id, text="150.00")
+
+        await self.send_callback("pay_order", user_id, payment_cb(PaymentAction.PAY))
+        await self.send_callback("paid", user_id, payment_cb(PaymentAction.PAID))
+        await self.send_callback("confirm_pay", worker_id, payment_cb(PaymentAction.CONFIRM))
+
+        async with self._worker_locks[worker_id]:
+            await self.send_callback("send_work", worker_id, order_cb(OrderAction.SEND_WORK))
+            await self.send_message("work_text", worker_id, text=f"Робота до замовлення {order_id}")
+            await self.send_callback("finish_sending", worker_id, order_cb(OrderAction.FINISH_SENDING))
+
+        await self.send_callback("complete_order", user_id, order_cb(OrderAction.COMPLETE))
+
+    async def user_session(self, index: int, workers: List[int]) -> None:
+        user_id = USER_BASE_ID + index
+        if self.args.ramp:
+            await asyncio.sleep(self.args.ramp * index / max(1, self.args.users))
+        try:
+            await self.register(user_id)
+            for number in range(self.args.orders_per_user):
+                await self.order(user_id, workers[(index + number) % len(workers)])
+        except Exception as e:
+            self.failures.append(f"користувач {user_id}: {e}")
+
+    async def run(self) -> float:
+        workers = [WORKER_BASE_ID + i for i in range(self.args.workers)]
+        self._worker_locks = {worker_id: asyncio.Lock() for worker_id in workers}
+
+        # await_price читає дані виконавця, тому виконавці теж зареєстровані
+        await asyncio.gather(*(self.register(worker_id) for worker_id in workers))
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*(self.user_session(i, workers) for i in range(self.args.users)))
+        return time.perf_counter() - started_at
+
+    async def completed_orders(self) -> Dict[int, int]:
+        from services.db_pool import db_pool
+
+        async with db_pool.reader() as db:
+            async with db.execute("SELECT status, COUNT(*) AS count FROM order_request GROUP BY status") as cursor:
+                return {row["status"]: row["count"] for row in await cursor.fetchall()}
+
+    def report(self, elapsed: float, statuses: Dict[int, int]) -> Dict[str, Any]:
+        order = REGISTRATION_STEPS + ORDER_STEPS
+        steps = sorted(self.stats, key=lambda step: order.index(step) if step in order else len(order))
+        total = StepStats()
+        for stats in self.stats.values():
+            total.latency.extend(stats.latency)
+            total.db_time.extend(stats.db_time)
+            total.db_calls += stats.db_calls
+            total.errors += stats.errors
+
+        return {
+            "config": {k: v for k, v in vars(self.args).items() if k != "json"},
+            "elapsed_s": round(elapsed, 3),
+            "updates": len(total.latency),
+            "updates_per_s": round(len(total.latency) / elapsed, 1) if elapsed else 0,
+            "order_statuses": statuses,
+            "api_calls": dict(self.fake_api.calls.most_common()),
+            "failures": self.failures[:20],
+            "total": total.summary(),
+            "steps": {step: self.stats[step].summary() for step in steps},
+        }
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"\nОновлень: {report['updates']} за {report['elapsed_s']} с ({report['updates_per_s']}/с)")
+    print(f"Статуси замовлень: {report['order_statuses']}")
+    print(f"Виклики Bot API: {report['api_calls']}")
+
+    header = f"{'крок':<16}{'к-сть':>7}{'помил.':>7}" \
+             f"{'p50 мс':>9}{'p95 мс':>9}{'p99 мс':>9}{'БД p50':>9}{'БД p95':>9}{'БД p99':>9}{'БД/онов':>9}"
+    print("\n" + header)
+    print("-" * len(header))
+    for step, summary in list(report["steps"].items()) + [("РАЗОМ", report["total"])]:
+        latency, db = summary["latency_ms"], summary["db_ms"]
+        print(
+            f"{step:<16}{summary['count']:>7}{summary['errors']:>7}"
+            f"{latency['p50']:>9}{latency['p95']:>9}{latency['p99']:>9}"
+            f"{db['p50']:>9}{db['p95']:>9}{db['p99']:>9}{summary['db_calls_per_update']:>9}"
+        )
+
+    if report["failures"]:
+        print("\nПомилки сценарію:")
+        for failure in report["failures"]:
+            print(f"  {failure}")
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Навантажувальний тест бота з fake Bot API")
+    parser.add_argument("--users", type=int, default=50, help="кількість клієнтів")
+    parser.add_argument("--workers", type=int, default=3, help="кількість виконавців (адміністраторів)")
+    parser.add_argument("--orders-per-user", type=int, default=1)
+    parser.add_argument("--transport", choices=("feed", "polling", "webhook"), default="feed")
+    parser.add_argument("--concurrency", type=int, default=64, help="MAX_CONCURRENT_UPDATES бота")
+    parser.add_argument("--ramp", type=float, default=0.0, help="за скільки секунд стартують всі клієнти")
+    parser.add_argument("--think", type=float, default=0.0, help="пауза користувача між кроками (с)")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="затримка відповіді fake Bot API (с)")
+    parser.add_argument("--step-timeout", type=float, default=30.0, help="максимальний час обробки кроку (с)")
+    parser.add_argument("--rate-limit", action="store_true", help="не вимикати ліміти вихідних повідомлень")
+    parser.add_argument("--fsm-storage", choices=("sqlite", "memory"), default="sqlite")
+    parser.add_argument("--database", help="файл БД (за замовчуванням тимчасовий)")
+    parser.add_argument("--json", help="зберегти звіт у JSON-файл")
+    parser.add_argument("--verbose", action="store_true", help="показувати логи бота")
+    return parser.parse_args(argv)
+
+def configure_environment(args: argparse.Namespace, api_url: str, workdir: str) -> None:
+    """Змінні середовища для Config (до імпорту модулів бота)."""
+    os.environ.update({
+        "BOT_TOKEN": BOT_TOKEN,
+        "ADMIN_IDS": ",".join(str(WORKER_BASE_ID + i) for i in range(args.workers)),
+        "ADMIN_CHANNEL_ID": "-1001",
+        "DATABASE_PATH": os.path.abspath(args.database) if args.database else os.path.join(workdir, "loadtest.sqlite"),
+        "TELEGRAM_API_URL": api_url,
+        "BOT_MODE": "polling",
+        "FSM_STORAGE": args.fsm_storage,
+        "MAX_CONCURRENT_UPDATES": str(args.concurrency),
+        "REDIS_URL": "",
+        "METRICS_PORT": "0",
+    })
+    if not args.rate_limit:
+        os.environ.update({
+            "OUTBOUND_GLOBAL_RATE": "1000000",
+            "OUTBOUND_CHAT_RATE": "1000000",
+            "OUTBOUND_GROUP_RATE_PER_MIN": "60000000",
+        })
+
+async def main(argv: List[str] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+
+    fake_api = FakeBotAPI(bot_id=int(BOT_TOKEN.split(":")[0]), latency=args.api_latency)
+    api_url = await fake_api.start()
+
+    # Логи бота (logs/bot.log) пишуться в тимчасовий каталог
+    workdir = tempfile.mkdtemp(prefix="gradle-loadtest-")
+    configure_environment(args, api_url, workdir)
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    test = LoadTest(args, fake_api)
+    try:
+        await test.setup()
+        elapsed = await test.run()
+        report = test.report(elapsed, await test.completed_orders())
+    finally:
+        await test.close()
+        await fake_api.stop()
+        os.chdir(previous_cwd)
+        logging.disable(logging.NOTSET)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nЗвіт збережено в {args.json}")
+    return report
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -11,6 +11,12 @@ setup(
         'aiosqlite',
         'asyncio',
     ],
+    extras_require={
+        # Спільний стан для кількох процесів бота (REDIS_URL, FSM_STORAGE=redis)
+        'redis': ['redis>=5'],
+        # Тести (tests/): спільний стан перевіряється з fakeredis
+        'test': ['pytest', 'redis>=5', 'fakeredis'],
+    },
     author='Pandas',
     author_tg='@Pandas_san',
     description='Telegram Bot for Order Management',
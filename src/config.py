@@ -1,21 +1,110 @@
 import os
 from dotenv import load_dotenv
+from typing import Optional, Union
 
 # Завантажуємо змінні середовища з .env файлу
 load_dotenv()
 
+def _chat_id(value: str) -> Optional[Union[int, str]]:
+    """ID чату з налаштувань: число для числового ID, інакше рядок (@username каналу)."""
+    value = value.strip()
+    if not value:
+        return None
+    return int(value) if value.lstrip("-").isdigit() else value
+
 class Config:
     # Токен бота
     BOT_TOKEN = os.getenv("BOT_TOKEN")
     
     # ID адміністраторів (можна додати декілька)
-    ADMIN_IDS = [int(id) for id in os.getenv("ADMIN_IDS", "").split(",") if id]
+    ADMIN_IDS = frozenset(int(id) for id in os.getenv("ADMIN_IDS", "").split(",") if id)
 
-    # ID адмін каналу
-    ADMIN_CHANNEL_ID = os.getenv("ADMIN_CHANNEL_ID")
+    # ID адмін каналу або @username (не задано - сповіщення про нові замовлення не надсилаються)
+    ADMIN_CHANNEL_ID = _chat_id(os.getenv("ADMIN_CHANNEL_ID", ""))
     
     # Налаштування бази даних
     DATABASE_PATH = os.getenv("DATABASE_PATH", "database.sqlite")
+
+    # Кількість з'єднань для читання в пулі БД
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+
+    # Розмір сторінки при посторінковому читанні з БД
+    DB_PAGE_SIZE = int(os.getenv("DB_PAGE_SIZE", "50"))
+
+    # Кількість замовлень на одній сторінці списку в чаті
+    ORDER_LIST_PAGE_SIZE = int(os.getenv("ORDER_LIST_PAGE_SIZE", "5"))
+
+    # Черга запису: максимум змін в одній транзакції та вікно збору пакету (секунди)
+    WRITE_QUEUE_MAX_BATCH = int(os.getenv("WRITE_QUEUE_MAX_BATCH", "100"))
+    WRITE_QUEUE_TICK = float(os.getenv("WRITE_QUEUE_TICK", "0.005"))
+
+    # Кеш даних користувачів: максимальна кількість записів та час життя (секунди)
+    USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+    USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "300"))
+    
+    # Адреса Bot API (порожня - api.telegram.org; локальний сервер або fake-сервер навантажувальних тестів)
+    TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "")
+
+    # Режим отримання оновлень: polling (за замовчуванням) або webhook
+    BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+    # Публічна адреса для setWebhook (порожня - webhook не реєструється, наприклад для локальних тестів)
+    WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+    WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+    WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+    WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "127.0.0.1")
+    WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+
+    # Максимум оновлень, що обробляються одночасно, та час очікування їх завершення при зупинці
+    MAX_CONCURRENT_UPDATES = int(os.getenv("MAX_CONCURRENT_UPDATES", "64"))
+    SHUTDOWN_DRAIN_TIMEOUT = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", "30"))
+
+    # HTTP-ендпоінт метрик у форматі Prometheus (порт 0 - вимкнено)
+    METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "9101"))
+
+    # Redis для спільного стану кількох процесів бота (інвалідація кешу, FSM)
+    REDIS_URL = os.getenv("REDIS_URL", "")
+
+    # FSM-сховище: sqlite (зберігається між перезапусками), redis (спільне для процесів) або memory
+    FSM_STORAGE = os.getenv("FSM_STORAGE", "sqlite").lower()
+    # Інтервал пакетного запису змін FSM та час життя покинутих станів (секунди)
+    FSM_FLUSH_INTERVAL = float(os.getenv("FSM_FLUSH_INTERVAL", "0.5"))
+    FSM_STATE_TTL = float(os.getenv("FSM_STATE_TTL", str(7 * 24 * 3600)))
+    FSM_SWEEP_INTERVAL = float(os.getenv("FSM_SWEEP_INTERVAL", "3600"))
+
+    # Скільки чекати решту повідомлень альбому (секунди)
+    ALBUM_LATENCY = float(os.getenv("ALBUM_LATENCY", "0.5"))
+
+    # Ліміти вихідних повідомлень (Telegram: ~30 повідомлень/с загалом, 1/с в чат, 20/хв в групу)
+    OUTBOUND_GLOBAL_RATE = float(os.getenv("OUTBOUND_GLOBAL_RATE", "30"))
+    OUTBOUND_CHAT_RATE = float(os.getenv("OUTBOUND_CHAT_RATE", "1"))
+    OUTBOUND_GROUP_RATE_PER_MIN = float(os.getenv("OUTBOUND_GROUP_RATE_PER_MIN", "20"))
+    OUTBOUND_GROUP_BURST = float(os.getenv("OUTBOUND_GROUP_BURST", "3"))
+    OUTBOUND_MAX_RETRIES = int(os.getenv("OUTBOUND_MAX_RETRIES", "3"))
+
+    # Outbox сповіщень: розмір пакету, інтервал перевірки, спроби з експоненційною паузою,
+    # час резервування запису процесом та скільки зберігати надіслані (секунди)
+    OUTBOX_BATCH = int(os.getenv("OUTBOX_BATCH", "50"))
+    OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "5"))
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+    OUTBOX_RETRY_BASE = float(os.getenv("OUTBOX_RETRY_BASE", "2"))
+    OUTBOX_RETRY_MAX = float(os.getenv("OUTBOX_RETRY_MAX", "600"))
+    OUTBOX_LEASE = float(os.getenv("OUTBOX_LEASE", "120"))
+    OUTBOX_RETENTION = float(os.getenv("OUTBOX_RETENTION", str(7 * 24 * 3600)))
+
+    # Планувальник задач: на скільки секунд вперед задачі з БД тримаються в пам'яті,
+    # пауза та кількість спроб після помилки, скільки зберігати виконані (секунди)
+    SCHEDULER_HORIZON = float(os.getenv("SCHEDULER_HORIZON", "3600"))
+    SCHEDULER_RETRY_DELAY = float(os.getenv("SCHEDULER_RETRY_DELAY", "60"))
+    SCHEDULER_MAX_ATTEMPTS = int(os.getenv("SCHEDULER_MAX_ATTEMPTS", "5"))
+    SCHEDULER_RETENTION = float(os.getenv("SCHEDULER_RETENTION", str(7 * 24 * 3600)))
+
+    # Нагадування (секунди): про оплату після встановлення ціни, виконавцю про замовлення
+    # в роботі без змін, клієнту про непідтверджену роботу; скільки разів повторювати
+    PAYMENT_REMINDER_DELAY = float(os.getenv("PAYMENT_REMINDER_DELAY", str(6 * 3600)))
+    STALE_ORDER_DELAY = float(os.getenv("STALE_ORDER_DELAY", str(48 * 3600)))
+    CONFIRM_REMINDER_DELAY = float(os.getenv("CONFIRM_REMINDER_DELAY", str(24 * 3600)))
+    REMINDER_REPEATS = int(os.getenv("REMINDER_REPEATS", "3"))
     
     # Налаштування платежів (якщо потрібно)
     PAYMENT_TOKEN = os.getenv("PAYMENT_TOKEN")
@@ -23,6 +112,14 @@ class Config:
     # Інші налаштування
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
 
+    # Логи: каталог, ротація bot.log за розміром (старі файли стискаються), формат text або json
+    LOG_DIR = os.getenv("LOG_DIR", "logs")
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+    # Частка записів INFO/DEBUG окремих логерів, що записуються: "handlers/admin/views=0.1,..."
+    LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")
+
     # Посилання на чат допомоги
     support_url = "https://t.me/Gradle_support_bot"
 
@@ -37,5 +134,11 @@ class Config:
         if not cls.ADMIN_IDS:
             raise ValueError("ADMIN_IDS не налаштовано")
 
+        if cls.BOT_MODE not in ("polling", "webhook"):
+            raise ValueError(f"Невідомий BOT_MODE: {cls.BOT_MODE}")
+
+        if cls.BOT_MODE == "webhook" and not cls.WEBHOOK_SECRET:
+            raise ValueError("WEBHOOK_SECRET не налаштовано (обов'язковий в режимі webhook)")
+
 # Перевіряємо конфігурацію при імпорті
 Config.validate()
\ No newline at end of file
@@ -1,24 +1,30 @@
-from aiogram import Router, F
+from typing import AsyncIterator, Dict
+
+from aiogram import Router
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery
 
 from services.admin_service import AdminService
 from services.database_service import DatabaseService
+from services.order_list_service import OrderListService
 from services.order_service import OrderService
-from utils.decorators import require_admin
+from utils.callbacks import CallbackTable, MenuAction, MenuCallback
 from utils.keyboards import get_admin_keyboard
 from utils.logging import get_logger
 
 admin_router = Router(name='admin')
+callbacks = CallbackTable(admin_router)
 
 logger = get_logger("handlers/admin")
+# Записи для кожного замовлення у списках /status (гарячий цикл) - вибірково
+views_logger = get_logger("handlers/admin/views", sample_rate=0.1)
 
 admin_service = AdminService()
 database_service = DatabaseService()
 order_service = OrderService()
+order_list_service = OrderListService()
 
 @admin_router.message(Command("admin"))
-@require_admin
 async def show_admin_panel(message: Message) -> None:
     await message.answer(
         "🔧 Панель керування замовленнями\n"
@@ -26,8 +32,7 @@ async def show_admin_panel(message: Message) -> None:
         reply_markup=get_admin_keyboard().as_markup()
     )
 
-@admin_router.callback_query(F.data == "back_to_admin")
-@require_admin
+@callbacks(MenuCallback, MenuAction.BACK_TO_ADMIN)
 async def back_to_admin(callback: CallbackQuery) -> None:
     try:
         await callback.message.edit_text(
@@ -39,8 +44,39 @@ async def back_to_admin(callback: CallbackQuery) -> None:
         logger.exception(f"Error returning to admin panel: ")
         await callback.answer("Error returning to menu", show_alert=True)
 
+async def _send_order_views(message: Message, orders: AsyncIterator[Dict], no_payment_text: str) -> int:
+    """
+    Надсилає повну інформацію про замовлення, отримані через DatabaseService.iter_order_views().
+
+    Return:
+        int - кількість оброблених замовлень
+    """
+    count = 0
+    async for order in orders:
+        count += 1
+        views_logger.debug(f"Обробляємо замовлення {order['ID_order']}")
+
+        if order['id_operation'] is None:
+            views_logger.info(f"Платежів для замовлення {order['ID_order']} немає")
+            await message.answer(no_payment_text)
+            continue
+
+        text_message = admin_service.generate_order_info_message(
+            order['ID_order'], 
+            order['ID_user'], 
+            order['ID_worker'], 
+            order['subject'], 
+            order['type_work'], 
+            order['order_details'], 
+            order['price'],
+            order['status'], 
+            order['pay_status']
+        )
+        await message.answer(text=text_message, parse_mode='HTML')
+
+    return count
+
 @admin_router.message(Command("status"))
-@require_admin
 async def status_order(message: Message) -> None:
     try:
         text = message.text
@@ -65,216 +101,48 @@ async def status_order(message: Message) -> None:
         logger.debug(f"args = {args}")
 
         if order_id:
-            order = await database_service.get_by_id('order_request', 'ID_order', order_id)
-            payment = await database_service.get_by_id('payments', 'ID_order', order_id)
-            text_message = admin_service.generate_order_info_message(order['ID_order'], order['ID_user'], order['ID_worker'], order['subject'], order['type_work'], order['order_details'], payment['price'], order['status'], payment['status'])
-
-            await message.answer(text=text_message, parse_mode='HTML')
-
-        elif filters_order_status:
+            filters = [('order_request', 'ID_order', order_id)]
             try:
-                logger.info(f"Шукаємо замовлення зі статусом: {filters_order_status}")
-
-                # 1. Отримуємо всі замовлення за статусом  
-                orders = await database_service.get_all_by_field('order_request', 'status', filters_order_status)
-                logger.info(f"Знайдено замовлень: {len(orders)}")
-
-                if not orders:
-                    await message.answer("Замовлень з таким статусом не знайдено.")
-                    return
-
-                # 2. Для кожного замовлення отримуємо платежі
-                for i, order in enumerate(orders):
-                    logger.info(f"Обробляємо замовлення {i+1}: {order}")
-
-                    order_id = order['ID_order']
-                    logger.info(f"ID замовлення: {order_id}")
-
-                    # Отримуємо платежі для цього ID_order
-                    payments = await database_service.get_all_by_field('payments', 'ID_order', order_id)
-                    logger.info(f"Знайдено платежів: {len(payments)}")
-                    logger.info(f"Платежі: {payments}")
-
-                    # Якщо є платежі
-                    if payments:
-                        for j, payment in enumerate(payments):
-                            logger.info(f"Обробляємо платіж {j+1}: {payment}")
-
-                            # Перевіряємо чи є потрібні поля
-                            if 'price' not in payment:
-                                logger.exception(f"Поле 'price' відсутнє в платежі: {payment}")
-                                continue
-                            if 'status' not in payment:
-                                logger.exception(f"Поле 'status' відсутнє в платежі: {payment}")
-                                continue
-                            
-                            text_message = admin_service.generate_order_info_message(
-                                order['ID_order'], 
-                                order['ID_user'], 
-                                order['ID_worker'], 
-                                order['subject'], 
-                                order['type_work'], 
-                                order['order_details'], 
-                                payment['price'],
-                                order['status'], 
-                                payment['status']
-                            )
-                            logger.info("Відправляємо повідомлення...")
-                            await message.answer(text=text_message, parse_mode='HTML')
-                    else:
-                        logger.info("Платежів немає, відправляємо без платіжної інформації")
-                        await message.answer("Платежів по цьому фільтру статусу замовлення не знайдено.")
+                logger.info(f"Шукаємо замовлення за фільтром: {filters}")
+                count = await _send_order_views(
+                    message,
+                    database_service.iter_order_views(filters),
+                    "Платежів для цього замовлення не знайдено."
+                )
+                if not count:
+                    await message.answer(f"Замовлення {order_id} не знайдено.")
 
             except Exception as e:
-                logger.exception(f"Помилка: ")
-                logger.exception(f"Тип помилки: {type(e)}")
-                import traceback
-                logger.exception(f"Повний traceback: {traceback.format_exc()}")
+                logger.exception(f"Помилка при отриманні замовлення {order_id}: ")
                 await message.answer("Помилка при отриманні замовлень!")
                 raise
+            return
 
+        # Списки замовлень показуємо посторінково в одному повідомленні
+        if filters_order_status:
+            kind, arg = 'ost', filters_order_status
         elif filters_pay_status:
-            try:
-                logger.info(f"Шукаємо замовлення зі статусом: {filters_pay_status}")
-
-                # 1. Отримуємо всі замовлення за статусом  
-                payments = await database_service.get_all_by_field('payments', 'status', filters_pay_status)
-                logger.info(f"Знайдено замовлень: {len(payments)}")
-
-                if not payments:
-                    await message.answer("Замовлень з таким статусом не знайдено.")
-                    return
-
-                # 2. Для кожного замовлення отримуємо платежі
-                for i, payment in enumerate(payments):
-                    logger.info(f"Обробляємо замовлення {i+1}: {payment}")
-
-                    order_id = payment['ID_order']
-                    logger.info(f"ID замовлення: {order_id}")
-
-                    # Отримуємо платежі для цього ID_order
-                    orders = await database_service.get_all_by_field('order_request', 'ID_order', order_id)
-                    logger.info(f"Знайдено платежів: {len(orders)}")
-                    logger.info(f"Платежі: {orders}")
-
-                    # Якщо є платежі
-                    if orders:
-                        for j, order in enumerate(orders):
-                            logger.info(f"Обробляємо платіж {j+1}: {order}")
-
-                            # Перевіряємо чи є потрібні поля
-                            if 'ID_user' not in order:
-                                logger.exception(f"Поле 'ID_user' відсутнє в платежі: {order}")
-                                continue
-                            if 'ID_worker' not in order:
-                                logger.exception(f"Поле 'ID_worker' відсутнє в платежі: {order}")
-                                continue
-                            if 'subject' not in order:
-                                logger.exception(f"Поле 'subject' відсутнє в платежі: {order}")
-                                continue
-                            if 'type_work' not in order:
-                                logger.exception(f"Поле 'type_worker' відсутнє в платежі: {order}")
-                                continue
-                            if 'order_details' not in order:
-                                logger.exception(f"Поле 'order_details' відсутнє в платежі: {order}")
-                                continue
-                            if 'status' not in order:
-                                logger.exception(f"Поле 'status' відсутнє в платежі: {order}")
-                                continue
-                            
-                            text_message = admin_service.generate_order_info_message(
-                                order['ID_order'], 
-                                order['ID_user'], 
-                                order['ID_worker'], 
-                                order['subject'], 
-                                order['type_work'], 
-                                order['order_details'], 
-                                payment['price'],
-                                order['status'], 
-                                payment['status']
-                            )
-                            logger.info("Відправляємо повідомлення...")
-                            await message.answer(text=text_message, parse_mode='HTML')
-                    else:
-                        logger.info("Платежів немає, відправляємо без платіжної інформації")
-                        await message.answer("Платежів по цьому фільтру статусу оплати не знайдено.")
-
-            except Exception as e:
-                logger.exception(f"Помилка: ")
-                logger.exception(f"Тип помилки: {type(e)}")
-                import traceback
-                logger.exception(f"Повний traceback: {traceback.format_exc()}")
-                await message.answer("Помилка при отриманні замовлень!")
-                raise
-       
+            kind, arg = 'pst', filters_pay_status
         elif filters_user:
-            try:
-                logger.info(f"Шукаємо замовлення зі статусом: {filters_user}")
-
-                # 1. Отримуємо всі замовлення за статусом  
-                orders = await database_service.get_all_by_field('order_request', 'ID_user', filters_user)
-                logger.info(f"Знайдено замовлень: {len(orders)}")
-
-                if not orders:
-                    await message.answer("Замовлень з таким статусом не знайдено.")
-                    return
-
-                # 2. Для кожного замовлення отримуємо платежі
-                for i, order in enumerate(orders):
-                    logger.info(f"Обробляємо замовлення {i+1}: {order}")
-
-                    order_id = order['ID_order']
-                    logger.info(f"ID замовлення: {order_id}")
-
-                    # Отримуємо платежі для цього ID_order
-                    payments = await database_service.get_all_by_field('payments', 'ID_order', order_id)
-                    logger.info(f"Знайдено платежів: {len(payments)}")
-                    logger.info(f"Платежі: {payments}")
-
-                    # Якщо є платежі
-                    if payments:
-                        for j, payment in enumerate(payments):
-                            logger.info(f"Обробляємо платіж {j+1}: {payment}")
+            kind, arg = 'usr', filters_user
+        else:
+            await message.answer("Невідомий параметр команди. Використайте -order_id, -order_status, -pay_status або -user.")
+            return
 
-                            # Перевіряємо чи є потрібні поля
-                            if 'price' not in payment:
-                                logger.exception(f"Поле 'price' відсутнє в платежі: {payment}")
-                                continue
-                            if 'status' not in payment:
-                                logger.exception(f"Поле 'status' відсутнє в платежі: {payment}")
-                                continue
-                            
-                            text_message = admin_service.generate_order_info_message(
-                                order['ID_order'], 
-                                order['ID_user'], 
-                                order['ID_worker'], 
-                                order['subject'], 
-                                order['type_work'], 
-                                order['order_details'], 
-                                payment['price'],
-                                order['status'], 
-                                payment['status']
-                            )
-                            logger.info("Відправляємо повідомлення...")
-                            await message.answer(text=text_message, parse_mode='HTML')
-                    else:
-                        logger.info("Платежів немає, відправляємо без платіжної інформації")
-                        await message.answer("Платежів для цього фільтру по користувачам не знайдено.")
+        try:
+            text, markup = await order_list_service.render_page(kind, 0, str(arg), message.from_user.id)
+            await message.answer(text, reply_markup=markup)
 
-            except Exception as e:
-                logger.exception(f"Помилка: ")
-                logger.exception(f"Тип помилки: {type(e)}")
-                import traceback
-                logger.exception(f"Повний traceback: {traceback.format_exc()}")
-                await message.answer("Помилка при отриманні замовлень!")
-                raise
+        except Exception as e:
+            logger.exception(f"Помилка при отриманні замовлень ({kind} = {arg}): ")
+            await message.answer("Помилка при отриманні замовлень!")
+            raise
 
     except Exception as e:
         logger.exception(f"eroor: ")
         raise
 
 @admin_router.message(Command("search"))
-@require_admin
 async def search_user(message: Message):
     """Пошук користувача за ID"""
     try:
@@ -7,7 +7,7 @@ from utils.decorators import require_admin
 from config import Config
 from text import help_text, help_text_admin, about_text, price_text
 
-basic_router = Router()
+basic_router = Router(name='basic')
 
 @basic_router.message(F.text.lower().contains("допомога"))
 async def text_help(message: types.Message):
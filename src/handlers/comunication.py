@@ -1,5 +1,5 @@
 import aiosqlite
-from aiogram import Router, types, F
+from aiogram import Router, types
 
 from aiogram.filters import Command
 from aiogram.utils.keyboard import InlineKeyboardBuilder
@@ -9,10 +9,14 @@ from aiogram.fsm.context import FSMContext
 from services.admin_service import AdminService
 from services.database_service import DatabaseService
 from states.user_states import UserState
-from utils.decorators import require_admin
+from utils.callbacks import CallbackTable, ReplyCallback, ReplySide
 from utils.logging import get_logger
 
-comunication_router = Router()
+user_comunication_router = Router(name='user_comunication')
+admin_comunication_router = Router(name='admin_comunication')
+
+user_callbacks = CallbackTable(user_comunication_router)
+admin_callbacks = CallbackTable(admin_comunication_router)
 
 logger = get_logger("handlers/communication")
 
@@ -23,8 +27,7 @@ database_service = DatabaseService()
 # АДМІН: Команда /send_message
 # ==========================================
 
-@comunication_router.message(Command("send_message"))
-@require_admin
+@admin_comunication_router.message(Command("send_message"))
 async def send_message(message: Message, state: FSMContext):
     """Відправлення повідомлення користувачу"""
     try:
@@ -83,7 +86,7 @@ async def send_message(message: Message, state: FSMContext):
 
         # Створення кнопки для відповіді
         builder = InlineKeyboardBuilder()
-        builder.button(text="↩️ Відповісти", callback_data=f"reply_user:{user_id}:{admin_id}")
+        builder.button(text="↩️ Відповісти", callback_data=ReplyCallback(action=ReplySide.USER, user_id=user_id, admin_id=admin_id).pack())
 
         # Отримання даних адміна
         admin_data = await database_service.get_by_id('user_data', 'ID', admin_id)
@@ -115,20 +118,14 @@ async def send_message(message: Message, state: FSMContext):
 # КОРИСТУВАЧ: Відповідь адміну (Callback)
 # ==========================================
     
-@comunication_router.callback_query(F.data.startswith("reply_user:"))
-async def reply_message_from_user(callback: CallbackQuery, state: FSMContext):
+@user_callbacks(ReplyCallback, ReplySide.USER)
+async def reply_message_from_user(callback: CallbackQuery, callback_data: ReplyCallback, state: FSMContext):
     """Callback коли користувач натискає кнопку 'Відповісти'"""
     try:
         await callback.answer()
 
-        # Парсинг даних з callback
-        parts = callback.data.split(':')
-        if len(parts) < 3:
-            await callback.message.answer("❌ Помилка: неправильний формат даних")
-            return
-            
         user_id = callback.from_user.id
-        admin_id = parts[2]
+        admin_id = callback_data.admin_id
 
         # Встановлюємо стан очікування повідомлення
         await state.set_state(UserState.waiting_for_reply_message_user)
@@ -150,7 +147,7 @@ async def reply_message_from_user(callback: CallbackQuery, state: FSMContext):
 # КОРИСТУВАЧ: Відправка повідомлення (Message Handler)
 # ==========================================
 
-@comunication_router.message(UserState.waiting_for_reply_message_user)
+@user_comunication_router.message(UserState.waiting_for_reply_message_user)
 async def send_reply_to_admin(message: Message, state: FSMContext):
     """Handler для отримання текстового повідомлення від користувача"""
     try:
@@ -168,7 +165,7 @@ async def send_reply_to_admin(message: Message, state: FSMContext):
 
         # Створення кнопки для зворотної відповіді
         builder = InlineKeyboardBuilder()
-        builder.button(text="↩️ Відповісти", callback_data=f"reply_admin:{user_id}:{admin_id}")
+        builder.button(text="↩️ Відповісти", callback_data=ReplyCallback(action=ReplySide.ADMIN, user_id=user_id, admin_id=admin_id).pack())
 
         # Отримання даних користувача
         user_data = await database_service.get_by_id('user_data', 'ID', user_id)
@@ -203,20 +200,14 @@ async def send_reply_to_admin(message: Message, state: FSMContext):
 # АДМІН: Відповідь користувачу (Callback)
 # ==========================================
 
-@comunication_router.callback_query(F.data.startswith("reply_admin:"))
-async def reply_message_from_admin(callback: CallbackQuery, state: FSMContext):
+@admin_callbacks(ReplyCallback, ReplySide.ADMIN)
+async def reply_message_from_admin(callback: CallbackQuery, callback_data: ReplyCallback, state: FSMContext):
     """Callback коли адмін натискає кнопку 'Відповісти'"""
     try:
         await callback.answer()
 
-        # Парсинг даних
-        parts = callback.data.split(':')
-        if len(parts) < 3:
-            await callback.message.answer("❌ Помилка: неправильний формат даних")
-            return
-
         admin_id = callback.from_user.id
-        user_id = parts[1]
+        user_id = callback_data.user_id
 
         # Встановлюємо стан
         await state.set_state(UserState.waiting_for_reply_message_admin)
@@ -238,7 +229,7 @@ async def reply_message_from_admin(callback: CallbackQuery, state: FSMContext):
 # АДМІН: Відправка повідомлення (Message Handler)
 # ==========================================
 
-@comunication_router.message(UserState.waiting_for_reply_message_admin)
+@admin_comunication_router.message(UserState.waiting_for_reply_message_admin)
 async def send_reply_to_user(message: Message, state: FSMContext):
     """Handler для отримання текстового повідомлення від адміна"""
     try:
@@ -256,7 +247,7 @@ async def send_reply_to_user(message: Message, state: FSMContext):
 
         # Створення кнопки для відповіді
         builder = InlineKeyboardBuilder()
-        builder.button(text="↩️ Відповісти", callback_data=f"reply_user:{user_id}:{admin_id}")
+        builder.button(text="↩️ Відповісти", callback_data=ReplyCallback(action=ReplySide.USER, user_id=user_id, admin_id=admin_id).pack())
 
         # Отримання даних адміна
         admin_data = await database_service.get_by_id('user_data', 'ID', admin_id)
@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from aiogram import Router, F, types
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command
@@ -7,26 +9,50 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from model.order import OrderStatus
 from services.database_service import DatabaseService
+from services.file_service import FileService
+from services.order_list_service import OrderListService
 from services.order_service import OrderService
+from services.outbox import outbox
+from services.reminder_service import ReminderService
 from states.order_states import OrderStates
+from utils.album import AlbumMiddleware, append_to_state
+from utils.callbacks import (CallbackTable, MenuAction, MenuCallback, OrderAction, OrderCallback,
+                             OrderListCallback, OrderListTakeCallback, PaymentAction, PaymentCallback)
 from utils.logging import get_logger
-from utils.decorators import require_admin
 from utils.dict import work_dict
-from utils.keyboards import get_worker_order_keyboard, subject_keyboard, type_work_keyboard
+from utils.keyboards import subject_keyboard, type_work_keyboard
 from utils.validators import validate_input
 
 from config import Config
 from text import type_work_text
 
 # Створюємо роутер
-user_orders_router = Router()
-admin_orders_router = Router()
+user_orders_router = Router(name='user_orders')
+admin_orders_router = Router(name='admin_orders')
+
+# Callback-запити з callback_data (utils.callbacks) - через таблицю обробників
+user_callbacks = CallbackTable(user_orders_router)
+admin_callbacks = CallbackTable(admin_orders_router)
 
 logger = get_logger("handlers.orders")
 
+# Підтвердження додавання файлу до черги відправки
+FILE_ADDED_TEXT = {
+    "photo": "✅ Фото додано до черги відправки",
+    "document": "✅ Документ додано до черги відправки",
+    "video": "✅ Відео додано до черги відправки",
+    "voice": "✅ Голосове повідомлення додано до черги відправки",
+}
+
+# Альбоми обробляються одним викликом обробника
+user_orders_router.message.middleware(AlbumMiddleware())
+admin_orders_router.message.middleware(AlbumMiddleware())
+
 # Ініціалізуємо сервіс
 database_service = DatabaseService()
 order_service = OrderService()
+order_list_service = OrderListService()
+reminder_service = ReminderService()
 
 @user_orders_router.message(Command("order"))
 async def cmd_order(message: types.Message):
@@ -116,16 +142,13 @@ async def process_details(message: Message, state: FSMContext):
             user_id=message.from_user.id,
             username=message.from_user.username or 'Без нікнейма',
             order_data=order_data,
-            comment=comment,
-            bot=message.bot
+            comment=comment
         )
         logger.debug(
             f"\nuser_id: {message.from_user.id}\n"
             f"username: {message.from_user.username}\n"
             f"order_data: {order_data}\n"
             f"comment: {comment}\n"
-            f"bot: {message.bot}\n"
-                     
                      )
 
         if new_id is None:
@@ -140,103 +163,95 @@ async def process_details(message: Message, state: FSMContext):
         await state.clear()
 
 
-@admin_orders_router.callback_query(F.data == "new_orders")
-@require_admin
+async def _edit_order_list(callback: CallbackQuery, kind: str, page: int = 0, arg: str = "") -> None:
+    """Показує сторінку списку замовлень у поточному повідомленні."""
+    text, markup = await order_list_service.render_page(kind, page, arg, callback.from_user.id)
+    try:
+        await callback.message.edit_text(text, reply_markup=markup)
+    except TelegramBadRequest as e:
+        # Натиснули "Оновити", а список не змінився
+        if "message is not modified" not in str(e):
+            raise
+
+@admin_callbacks(MenuCallback, MenuAction.NEW_ORDERS)
 async def show_new_orders(callback: CallbackQuery) -> None:
     """Показує список нових замовлень."""
     try:
-        orders = await database_service.get_all_by_field('order_request', 'status', 1)
-        
-        if not orders:
-            keyboard = InlineKeyboardBuilder()
-            keyboard.button(text="🔙 Назад", callback_data="back_to_admin")
-            await callback.message.edit_text(
-                "У вас немає нових замовлень.",
-                reply_markup=keyboard.as_markup()
-            )
-            return
-
-        await callback.message.delete()
-
-        for order in orders:
-            keyboard = InlineKeyboardBuilder()
-            keyboard.button(text="✅ Взяти замовлення", callback_data=f"take_order_{order['ID_order']}")
-            keyboard.button(text="🔙 Назад", callback_data="back_to_admin")
-            keyboard.adjust(1)
-
-            user_data = await database_service.get_by_id('user_data', 'ID', order['ID_user'])
-
-            order_text = (
-                f"📌 Замовлення #{order['ID_order']}\n"
-                f"📚 Предмет: {work_dict.subjects.get(order['subject'], order['subject'])}\n"
-                f"📝 Тип роботи: {work_dict.type_work.get(order['type_work'], order['type_work'])}\n"
-                f"📋 Деталі: {order['order_details']}\n"
-                f"👤 Замовник: @{user_data['user_link']}\n"
-                f"📅 Створено: {order['created_at']}"
-            )
-
-            await callback.message.answer(order_text, reply_markup=keyboard.as_markup())
+        await _edit_order_list(callback, 'new')
+        await callback.answer()
 
     except Exception as e:
         logger.exception(f"Помилка при показі нових замовлень: ")
         keyboard = InlineKeyboardBuilder()
-        keyboard.button(text="🔙 Назад", callback_data="back_to_admin")
+        keyboard.button(text="🔙 Назад", callback_data=MenuCallback(action=MenuAction.BACK_TO_ADMIN).pack())
         await callback.message.edit_text(
             "Сталася помилка при отриманні нових замовлень.",
             reply_markup=keyboard.as_markup()
         )
 
-@admin_orders_router.callback_query(lambda c: c.data == "my_orders")
-@require_admin
+@admin_callbacks(OrderListCallback)
+async def show_order_list_page(callback: CallbackQuery, callback_data: OrderListCallback) -> None:
+    """Перехід між сторінками списку замовлень (◀️/▶️/🔄)."""
+    try:
+        kind, page, arg = order_list_service.parse_page_callback(callback_data)
+        await _edit_order_list(callback, kind, page, arg)
+        await callback.answer()
+
+    except Exception as e:
+        logger.exception(f"Помилка при переході між сторінками замовлень: ")
+        await callback.answer("Сталася помилка при отриманні замовлень", show_alert=True)
+
+@admin_callbacks(MenuCallback, MenuAction.MY_ORDERS)
 async def handle_my_orders(callback: CallbackQuery):
     """Обробляє запит на перегляд замовлень працівника."""
     await show_worker_orders_handler(callback)
 
-@admin_orders_router.callback_query(lambda c: c.data == "refresh_worker_orders")
-@require_admin
+@admin_callbacks(MenuCallback, MenuAction.REFRESH_ORDERS)
 async def handle_refresh_orders(callback: CallbackQuery):
     """Оновлює список замовлень працівника."""
     await show_worker_orders_handler(callback)
 
-@admin_orders_router.callback_query(F.data.startswith("take_order_"))
-@require_admin
-async def take_order(callback: CallbackQuery) -> None:
-    """Обробляє взяття замовлення адміністратором."""
-    try:
-        # Отримуємо ID замовлення з callback даних
-        order_id = callback.data.split('_', 2)[2] # Витяг номер замовлення
-        worker_id = callback.from_user.id # Витяг ID працівника який натиснув на кнопку
-        worker_username = callback.from_user.username or 'без_імені' # Витяг ім'я працівника
-        
-        # Отримуємо замовлення та перевіряємо його статус
+async def _take_order(callback: CallbackQuery, order_id: str) -> bool:
+    """
+    Перевіряє та переводить замовлення в роботу працівнику, що натиснув кнопку.
+
+    Return:
+        bool - True якщо замовлення взято (про невдачу користувач вже повідомлений)
+    """
+    worker_id = callback.from_user.id # Витяг ID працівника який натиснув на кнопку
+    worker_username = callback.from_user.username or 'без_імені' # Витяг ім'я працівника
+
+    # Зміна статусу одним запитом NEW -> IN_PROGRESS: з одночасних спроб виграє одна
+    if not await order_service.take_order(order_id, worker_id):
+        # Причину невдачі з'ясовуємо окремим читанням лише для тих, хто програв
         order = await database_service.get_by_id('order_request', 'ID_order', order_id)
-        
         if not order:
             logger.warning(f"Замовлення {order_id} не знайдено при спробі взяття")
             await callback.answer("Замовлення не знайдено.", show_alert=True)
-            return
-            
-        if order['status'] != 1:
-            "Перевірка статусу замовлення"
+        elif order['status'] != OrderStatus.NEW.value:
             logger.info(f"Спроба взяти вже взяте замовлення {order_id} користувачем {worker_id}")
             await callback.answer("Це замовлення вже взято іншим виконавцем.", show_alert=True)
-            return
-        
-        # Оновлюємо статус замовлення через сервіс
-        success = await order_service.in_progress_order(
-            order_id=order_id,
-            worker_id=worker_id
-        )
-        
-        if not success:
-            logger.exception(f"Не вдалося оновити статус замовлення {order_id}")
+        else:
             await callback.answer("Не вдалося взяти замовлення. Спробуйте пізніше.", show_alert=True)
+        return False
+
+    logger.info(f"Замовлення {order_id} успішно взято адміністратором {worker_id} (@{worker_username})")
+    return True
+
+@admin_callbacks(OrderCallback, OrderAction.TAKE)
+async def take_order(callback: CallbackQuery, callback_data: OrderCallback) -> None:
+    """Обробляє взяття замовлення адміністратором."""
+    try:
+        order_id = callback_data.order_id
+        worker_username = callback.from_user.username or 'без_імені' # Витяг ім'я працівника
+
+        if not await _take_order(callback, order_id):
             return
         
         # Створюємо клавіатуру для оновленого повідомлення
         keyboard = InlineKeyboardBuilder()
-        keyboard.button(text="📋 Поставити ціну", callback_data=f"put_price_{order_id}")
-        keyboard.button(text="🔙 Назад", callback_data="back_to_admin")
+        keyboard.button(text="📋 Поставити ціну", callback_data=PaymentCallback(action=PaymentAction.PUT_PRICE, order_id=order_id).pack())
+        keyboard.button(text="🔙 Назад", callback_data=MenuCallback(action=MenuAction.BACK_TO_ADMIN).pack())
         keyboard.adjust(1)  # Розміщуємо кнопки в один стовпчик
 
         # Оновлюємо повідомлення з інформацією про взяття замовлення
@@ -247,25 +262,60 @@ async def take_order(callback: CallbackQuery) -> None:
         
         # Повідомляємо адміністратора про успішне взяття замовлення
         await callback.answer("Замовлення успішно взято!", show_alert=True)
-        
-        logger.info(f"Замовлення {order_id} успішно взято адміністратором {worker_id} (@{worker_username})")
 
     except Exception as e:
         logger.exception(f"Помилка при взятті замовлення: ", exc_info=True)
         await callback.answer("Помилка при взятті замовлення. Спробуйте пізніше.", show_alert=True)      
 
-@admin_orders_router.callback_query(F.data.startswith("send_work_"))
-@require_admin
-async def send_work_to_client(callback: CallbackQuery, state: FSMContext) -> None:
+@admin_callbacks(OrderListTakeCallback)
+async def take_order_from_list(callback: CallbackQuery, callback_data: OrderListTakeCallback) -> None:
+    """Взяття замовлення зі сторінки списку нових замовлень з оновленням сторінки."""
+    try:
+        page, order_id = max(0, callback_data.page), callback_data.order_id
+
+        if not await _take_order(callback, order_id):
+            await _edit_order_list(callback, 'new', page)
+            return
+
+        # Замовлення зникає зі списку нових, ціну ставимо окремим повідомленням
+        keyboard = InlineKeyboardBuilder()
+        keyboard.button(text="📋 Поставити ціну", callback_data=PaymentCallback(action=PaymentAction.PUT_PRICE, order_id=order_id).pack())
+        await callback.message.answer(
+            f"✅ Замовлення #{order_id} взято в роботу!",
+            reply_markup=keyboard.as_markup()
+        )
+        await _edit_order_list(callback, 'new', page)
+        await callback.answer("Замовлення успішно взято!")
+
+    except Exception as e:
+        logger.exception(f"Помилка при взятті замовлення зі списку: ")
+        await callback.answer("Помилка при взятті замовлення. Спробуйте пізніше.", show_alert=True)
+
+async def _collect_files(message: Message, state: FSMContext, album: Optional[List[Message]]) -> None:
+    """Додає файли повідомлення або цілого альбому до черги відправки одним записом у стан."""
+    try:
+        items = [item for item in map(FileService.file_item, album or [message]) if item]
+        await append_to_state(state, "files", items)
+
+        if len(items) == 1:
+            await message.answer(FILE_ADDED_TEXT[items[0]["type"]])
+        else:
+            await message.answer(f"✅ Альбом з {len(items)} файлів додано до черги відправки")
+    except Exception as e:
+        logger.exception(f"Помилка при обробці файлів: ")
+        await message.answer("❌ Помилка при додаванні файлів")
+
+@admin_callbacks(OrderCallback, OrderAction.SEND_WORK)
+async def send_work_to_client(callback: CallbackQuery, callback_data: OrderCallback, state: FSMContext) -> None:
     """Ініціює процес відправки виконаної роботи клієнту."""
     try:
-        order_id = str(callback.data.split("_")[2])
+        order_id = callback_data.order_id
         await state.set_state(OrderStates.AWAITING_WORK)
         await state.update_data(order_id=order_id, files=[], messages=[])
         
         keyboard = InlineKeyboardBuilder()
-        keyboard.button(text="✅ Завершити відправку", callback_data=f"finish_sending_{order_id}")
-        keyboard.button(text="❌ Скасувати", callback_data=f"cancel_send_{order_id}")
+        keyboard.button(text="✅ Завершити відправку", callback_data=OrderCallback(action=OrderAction.FINISH_SENDING, order_id=order_id).pack())
+        keyboard.button(text="❌ Скасувати", callback_data=OrderCallback(action=OrderAction.CANCEL_SEND, order_id=order_id).pack())
         
         await callback.message.edit_text(
             "📤 Надішліть файли, фото, відео або текстові повідомлення.\n"
@@ -281,120 +331,54 @@ async def send_work_to_client(callback: CallbackQuery, state: FSMContext) -> Non
 async def handle_text_for_client(message: Message, state: FSMContext) -> None:
     """Обробляє текстові повідомлення для відправки клієнту."""
     try:
-        data = await state.get_data()
-        messages = data.get("messages", [])
-        messages.append({"type": "text", "content": message.text})
-        await state.update_data(messages=messages)
+        await append_to_state(state, "messages", [{"type": "text", "content": message.text}])
         
         await message.answer("✅ Текстове повідомлення додано до черги відправки")
     except Exception as e:
         logger.exception(f"Помилка при обробці текстового повідомлення: ")
         await message.answer("❌ Помилка при додаванні повідомлення")
 
-@admin_orders_router.message(OrderStates.AWAITING_WORK, F.photo)
-async def handle_photo_for_client(message: Message, state: FSMContext) -> None:
-    """Обробляє фото для відправки клієнту."""
-    try:
-        data = await state.get_data()
-        files = data.get("files", [])
-        
-        photo = message.photo[-1]  # Беремо найбільшу версію фото
-        file_id = photo.file_id
-        
-        caption = message.caption if message.caption else ""
-        
-        files.append({"type": "photo", "file_id": file_id, "caption": caption})
-        await state.update_data(files=files)
-        
-        await message.answer("✅ Фото додано до черги відправки")
-    except Exception as e:
-        logger.exception(f"Помилка при обробці фото: ")
-        await message.answer("❌ Помилка при додаванні фото")
-
-@admin_orders_router.message(OrderStates.AWAITING_WORK, F.document)
-async def handle_document_for_client(message: Message, state: FSMContext) -> None:
-    """Обробляє документи для відправки клієнту."""
-    try:
-        data = await state.get_data()
-        files = data.get("files", [])
-        
-        file_id = message.document.file_id
-        caption = message.caption if message.caption else ""
-        
-        files.append({"type": "document", "file_id": file_id, "caption": caption})
-        await state.update_data(files=files)
-        
-        await message.answer("✅ Документ додано до черги відправки")
-    except Exception as e:
-        logger.exception(f"Помилка при обробці документа: ")
-        await message.answer("❌ Помилка при додаванні документа")
-
-@admin_orders_router.message(OrderStates.AWAITING_WORK, F.video)
-async def handle_video_for_client(message: Message, state: FSMContext) -> None:
-    """Обробляє відео для відправки клієнту."""
-    try:
-        data = await state.get_data()
-        files = data.get("files", [])
-        
-        file_id = message.video.file_id
-        caption = message.caption if message.caption else ""
-        
-        files.append({"type": "video", "file_id": file_id, "caption": caption})
-        await state.update_data(files=files)
-        
-        await message.answer("✅ Відео додано до черги відправки")
-    except Exception as e:
-        logger.exception(f"Помилка при обробці відео: ")
-        await message.answer("❌ Помилка при додаванні відео")
-
-@admin_orders_router.message(OrderStates.AWAITING_WORK, F.voice)
-async def handle_voice_for_client(message: Message, state: FSMContext) -> None:
-    """Обробляє голосові повідомлення для відправки клієнту."""
-    try:
-        data = await state.get_data()
-        files = data.get("files", [])
-        
-        file_id = message.voice.file_id
-        
-        files.append({"type": "voice", "file_id": file_id})
-        await state.update_data(files=files)
+@admin_orders_router.message(OrderStates.AWAITING_WORK, F.photo | F.document | F.video | F.voice)
+async def handle_file_for_client(message: Message, state: FSMContext, album: Optional[List[Message]] = None) -> None:
+    """Обробляє фото, документи, відео та голосові (в тому числі альбоми) для відправки клієнту."""
+    await _collect_files(message, state, album)
         
-        await message.answer("✅ Голосове повідомлення додано до черги відправки")
-    except Exception as e:
-        logger.exception(f"Помилка при обробці голосового повідомлення: ")
-        await message.answer("❌ Помилка при додаванні голосового повідомлення")
-        
-@admin_orders_router.callback_query(F.data.startswith("finish_sending_"))
-@require_admin
-async def finish_sending_work(callback: CallbackQuery, state: FSMContext) -> None:
+@admin_callbacks(OrderCallback, OrderAction.FINISH_SENDING)
+async def finish_sending_work(callback: CallbackQuery, callback_data: OrderCallback, state: FSMContext) -> None:
     """Завершує процес відправки роботи та надсилає всі файли клієнту."""
 
     try:
-        order_id = callback.data.split("_")[2]
-        order = await database_service.get_by_id('order_request', 'ID_order', order_id)
-        payment = await database_service.get_by_id('payments', 'ID_order', order_id)
+        order_id = callback_data.order_id
+        order = await database_service.get_order_view(order_id)
 
-        if payment['status'] == 0:
-            try:
-                await callback.bot.send_message(order['ID_worker'], text=(
-                    f"Клієнт ще не оплатив замовлення. Почекайте трішки.\n"
-                    f"Повідомлення про оплату було надіслано користувачу."
-                ))
-                await callback.bot.send_message(order['ID_user'], text=(
-                    f"Замовлення вже виконано, але оплата не була проведена.\n" 
-                    f"Якщо ви виконали оплату для данного замовлення, фле бачите це повідомлення зверніться в центр підтримки /support та надішліть скрін оплати.\n" 
-                    f"Також при зверненні до служби підтримки перешліть повідомлення з інформацією про замовлення.\n" 
-                    f"Воно з'явиться нижче."))
+        if not order:
+            await callback.answer("Замовлення не знайдено", show_alert=True)
+            await state.clear()
+            return
 
+        # Всі повідомлення записуються в outbox однією транзакцією і надсилаються
+        # фоновою задачею в порядку запису (для кожного чату)
+        if order['pay_status'] == 0:
+            try:
                 payment_text = (
-                    f"📌 Замовлення #{payment["ID_order"]}\n"
+                    f"📌 Замовлення #{order['ID_order']}\n"
                     f"📚 Предмет: {work_dict.subjects.get(order['subject'], order['subject'])}\n"
                     f"📝 Тип роботи: {work_dict.type_work.get(order['type_work'], order['type_work'])}\n"
-                    f"💰 Ціна: {payment["price"]} грн\n"
-                    f"💳 Статус оплати: {work_dict.status_payment.get(payment['status'], payment['status'])}\n"
+                    f"💰 Ціна: {order['price']} грн\n"
+                    f"💳 Статус оплати: {work_dict.status_payment.get(order['pay_status'], order['pay_status'])}\n"
                     f"📅 Створено: {order['created_at']}\n"
                 )
-                await callback.bot.send_message(order['ID_user'], text=payment_text)
+                await outbox.enqueue(
+                    dict(chat_id=order['ID_worker'], text=(
+                        f"Клієнт ще не оплатив замовлення. Почекайте трішки.\n"
+                        f"Повідомлення про оплату було надіслано користувачу.")),
+                    dict(chat_id=order['ID_user'], text=(
+                        f"Замовлення вже виконано, але оплата не була проведена.\n" 
+                        f"Якщо ви виконали оплату для данного замовлення, фле бачите це повідомлення зверніться в центр підтримки /support та надішліть скрін оплати.\n" 
+                        f"Також при зверненні до служби підтримки перешліть повідомлення з інформацією про замовлення.\n" 
+                        f"Воно з'явиться нижче.")),
+                    dict(chat_id=order['ID_user'], text=payment_text),
+                )
 
                 return
             except Exception as e:
@@ -403,111 +387,50 @@ async def finish_sending_work(callback: CallbackQuery, state: FSMContext) -> Non
 
         else:
             try:
-                order_id = callback.data.split("_")[2]
                 data = await state.get_data()
                 files = data.get("files", [])
                 messages = data.get("messages", [])
 
-                # Отримуємо інформацію про замовлення
-                order = await database_service.get_by_id('order_request', 'ID_order', order_id)
-
-                if not order:
-                    await callback.answer("Замовлення не знайдено", show_alert=True)
-                    await state.clear()
-                    return
-
                 client_id = order['ID_user']
                 worker_id = order["ID_worker"]
-                send_errors = []
-
-                # Надсилаємо повідомлення клієнту про виконану роботу
-                try:
-                    await callback.bot.send_message(
-                        worker_id,
-                        f"Замовлення #{order_id} успішно відправлено, очікуйте на підтвердження зі сторони клієнта."
-                    )
-                    await callback.bot.send_message(
-                        client_id,
+
+                keyboard = InlineKeyboardBuilder()
+                keyboard.button(text="✅ Все ОК", callback_data=OrderCallback(action=OrderAction.COMPLETE, order_id=order_id).pack())
+                keyboard.button(text="❌ Потрібні правки", callback_data=OrderCallback(action=OrderAction.FIX, order_id=order_id).pack())
+
+                # Повідомлення виконавцю, клієнту про виконану роботу, матеріали альбомами та підтвердження
+                await outbox.enqueue(
+                    dict(chat_id=worker_id, text=(
+                        f"Замовлення #{order_id} успішно відправлено, очікуйте на підтвердження зі сторони клієнта.")),
+                    dict(chat_id=client_id, text=(
                         f"✅ Ваше замовлення #{order_id} виконано!\n\n"
-                        f"Нижче ви отримаєте всі матеріали від виконавця."
-                    )
-                except Exception as e:
-                    logger.exception(f"Помилка при надсиланні початкового повідомлення: ")
-                    send_errors.append("початкове повідомлення")
-
-                    await callback.bot.send_message(
-                        worker_id,
-                        f"Замовлення #{order_id} не відправлено спробуйте ще раз трохи пізніше або зверніться до служби підтримки /support .")
-
-                # Надсилаємо текстові повідомлення
-                for i, msg in enumerate(messages):
-                    if msg["type"] == "text":
-                        try:
-                            await callback.bot.send_message(client_id, msg["content"])
-                        except Exception as e:
-                            logger.exception(f"Помилка при надсиланні текстового повідомлення #{i+1}: ")
-                            send_errors.append(f"текстове повідомлення #{i+1}")
-
-                # Надсилаємо файли
-                for i, file in enumerate(files):
-                    try:
-                        if file["type"] == "photo":
-                            await callback.bot.send_photo(
-                                client_id, 
-                                file["file_id"],
-                                caption=file["caption"] if file["caption"] else None
-                            )
-                        elif file["type"] == "document":
-                            await callback.bot.send_document(
-                                client_id, 
-                                file["file_id"],
-                                caption=file["caption"] if file["caption"] else None
-                            )
-                        elif file["type"] == "video":
-                            await callback.bot.send_video(
-                                client_id, 
-                                file["file_id"],
-                                caption=file["caption"] if file["caption"] else None
-                            )
-                        elif file["type"] == "voice":
-                            await callback.bot.send_voice(client_id, file["file_id"])
-                    except Exception as e:
-                        logger.exception(f"Помилка при надсиланні файлу #{i+1} типу {file['type']}: ")
-                        send_errors.append(f"файл #{i+1} ({file['type']})")
-
-                try:
-                    keyboard = InlineKeyboardBuilder()
-                    keyboard.button(text="✅ Все ОК", callback_data=f"complete_order_{order_id}")
-                    keyboard.button(text="❌ Потрібні правки", callback_data=f"fix_work_{order_id}")
-
-                    await callback.bot.send_message(
-                        client_id,
-                        "Підтвердіть виконання роботи.",
-                        reply_markup=keyboard.as_markup()
-                    )
-                except Exception as e:
-                    logger.exception(f"Помилка при надсиланні повідомлення підтвердження виконання роботи (443): ")
-                    await callback.answer("Помилка при надсиланні повідомлення підтвердження виконання роботи", show_alert=True)
+                        f"Нижче ви отримаєте всі матеріали від виконавця.")),
+                    dict(chat_id=client_id, files=files, messages=messages),
+                    dict(chat_id=client_id, text="Підтвердіть виконання роботи.", reply_markup=keyboard.as_markup()),
+                )
+                # Далі чекаємо підтвердження клієнта (з нагадуванням)
+                await reminder_service.work_sent(order_id)
 
                 # Очищаємо стан
                 await state.clear()
 
             except Exception as e:
+                # Стан не очищаємо: матеріали залишаються, відправку можна повторити
                 logger.exception(f"Помилка при завершенні відправки роботи: ")
-                await callback.answer("Помилка при відправці матеріалів клієнту", show_alert=True)
-                await state.clear()
+                await callback.answer(
+                    f"Замовлення #{order_id} не відправлено спробуйте ще раз трохи пізніше або зверніться до служби підтримки /support .",
+                    show_alert=True)
 
     except Exception as e:
         logger.exception(f"Помилка при відправленні виконаної роботу клієнту: ")
 
     
 
-@admin_orders_router.callback_query(F.data.startswith("cancel_send_"))
-@require_admin
-async def cancel_sending_work(callback: CallbackQuery, state: FSMContext) -> None:
+@admin_callbacks(OrderCallback, OrderAction.CANCEL_SEND)
+async def cancel_sending_work(callback: CallbackQuery, callback_data: OrderCallback, state: FSMContext) -> None:
     """Скасовує процес відправки роботи."""
     try:
-        order_id = callback.data.split("_")[2]
+        order_id = callback_data.order_id
         
         await callback.message.edit_text(
             f"❌ Відправку матеріалів для замовлення #{order_id} скасовано."
@@ -520,57 +443,38 @@ async def cancel_sending_work(callback: CallbackQuery, state: FSMContext) -> Non
         await callback.answer("Помилка при скасуванні відправки", show_alert=True)
         await state.clear()
         
-@user_orders_router.callback_query(F.data.startswith("complete_order_"))
-async def complete_order(callback: CallbackQuery, state: FSMContext) -> None:
+@user_callbacks(OrderCallback, OrderAction.COMPLETE)
+async def complete_order(callback: CallbackQuery, callback_data: OrderCallback, state: FSMContext) -> None:
     """Позначає замовлення як виконане."""
     try:
-        order_id = str(callback.data.split("_")[2])
-        
-        # Отримуємо інформацію про замовлення
-        order = await database_service.get_by_id('order_request', 'ID_order', order_id)
-
-        worker_id = order['ID_worker']
-        client_id = order['ID_user']
-
-        await order_service.complete_order(order_id)
+        order_id = callback_data.order_id
         
-        keyboard = InlineKeyboardBuilder()
-        keyboard.button(text="📋 Мої активні замовлення", callback_data="my_orders")
-        keyboard.button(text="🔙 Назад", callback_data="back_to_admin")
-        keyboard.adjust(1)
+        # IN_PROGRESS -> COMPLETED одним запитом і лише для замовника цього замовлення
+        order = await order_service.complete_order(order_id, callback.from_user.id)
+        if not order:
+            await callback.answer("Замовлення вже позначено як виконане або недоступне.", show_alert=True)
+            return
 
-        await callback.bot.send_message(
-            worker_id,
-            f"✅ Замовлення виконано!",
-            reply_markup=keyboard.as_markup()
-        )
+        # Сповіщення виконавцю та клієнту вже записані в outbox разом із переходом
         await callback.answer("Замовлення позначено як виконане!", show_alert=True)
 
-        await callback.bot.send_message(
-            client_id,
-            text = (
-                f"✅ Замовлення #{order_id} позначено як виконане."
-                f" Дякуємо що обираєте нас!"
-            )
-        )
-
         await state.clear()
 
     except Exception as e:
         logger.exception(f"Помилка при завершенні замовлення: ")
         await callback.answer("Помилка при завершенні замовлення", show_alert=True)
 
-@user_orders_router.callback_query(F.data.startswith("fix_work_"))
-async def fix_work(callback: CallbackQuery, state: FSMContext) -> None:
+@user_callbacks(OrderCallback, OrderAction.FIX)
+async def fix_work(callback: CallbackQuery, callback_data: OrderCallback, state: FSMContext) -> None:
     """Ініціює процес відправки правок воркеру."""
     try:
-        order_id = str(callback.data.split("_")[2])
+        order_id = callback_data.order_id
         await state.set_state(OrderStates.AWAITING_CORRECT)
         await state.update_data(order_id=order_id, files=[], messages=[])
         
         keyboard = InlineKeyboardBuilder()
-        keyboard.button(text="✅ Завершити відправку", callback_data=f"finish_correct_{order_id}")
-        keyboard.button(text="❌ Скасувати", callback_data=f"cancel_correct_{order_id}")
+        keyboard.button(text="✅ Завершити відправку", callback_data=OrderCallback(action=OrderAction.FINISH_CORRECT, order_id=order_id).pack())
+        keyboard.button(text="❌ Скасувати", callback_data=OrderCallback(action=OrderAction.CANCEL_CORRECT, order_id=order_id).pack())
         
         await callback.message.edit_text(
             "📤 Надішліть файли, фото, відео або текстові повідомлення, що стосуються правок данного замовлення.\n"
@@ -582,98 +486,42 @@ async def fix_work(callback: CallbackQuery, state: FSMContext) -> None:
         logger.exception(f"Помилка при ініціації відправки правок: ")
         await callback.answer("Помилка при початку процесу відправки", show_alert=True)
 
+@user_callbacks(OrderCallback, OrderAction.CANCEL_CORRECT)
+async def cancel_sending_correct(callback: CallbackQuery, callback_data: OrderCallback, state: FSMContext) -> None:
+    """Скасовує процес відправки правок."""
+    try:
+        await callback.message.edit_text(
+            f"❌ Відправку правок для замовлення #{callback_data.order_id} скасовано."
+        )
+        
+        await state.clear()
+        
+    except Exception as e:
+        logger.exception(f"Помилка при скасуванні відправки правок: ")
+        await callback.answer("Помилка при скасуванні відправки", show_alert=True)
+        await state.clear()
+
 @user_orders_router.message(OrderStates.AWAITING_CORRECT, F.text)
 async def handle_text_for_worker_correct(message: Message, state: FSMContext) -> None:
     """Обробляє текстові повідомлення для відправки воркеру."""
     try:
-        data = await state.get_data()
-        messages = data.get("messages", [])
-        messages.append({"type": "text", "content": message.text})
-        await state.update_data(messages=messages)
+        await append_to_state(state, "messages", [{"type": "text", "content": message.text}])
         
         await message.answer("✅ Текстове повідомлення додано до черги відправки")
     except Exception as e:
         logger.exception(f"Помилка при обробці текстового повідомлення: ")
         await message.answer("❌ Помилка при додаванні повідомлення")
 
-@admin_orders_router.message(OrderStates.AWAITING_CORRECT, F.photo)
-async def handle_photo_for_worker_correct(message: Message, state: FSMContext) -> None:
-    """Обробляє фото для відправки воркеру."""
-    try:
-        data = await state.get_data()
-        files = data.get("files", [])
-        
-        photo = message.photo[-1]  # Беремо найбільшу версію фото
-        file_id = photo.file_id
-        
-        caption = message.caption if message.caption else ""
-        
-        files.append({"type": "photo", "file_id": file_id, "caption": caption})
-        await state.update_data(files=files)
-        
-        await message.answer("✅ Фото додано до черги відправки")
-    except Exception as e:
-        logger.exception(f"Помилка при обробці фото: ")
-        await message.answer("❌ Помилка при додаванні фото")
-
-@admin_orders_router.message(OrderStates.AWAITING_CORRECT, F.document)
-async def handle_document_for_worker_correct(message: Message, state: FSMContext) -> None:
-    """Обробляє документи для відправки воркеру."""
-    try:
-        data = await state.get_data()
-        files = data.get("files", [])
-        
-        file_id = message.document.file_id
-        caption = message.caption if message.caption else ""
-        
-        files.append({"type": "document", "file_id": file_id, "caption": caption})
-        await state.update_data(files=files)
-        
-        await message.answer("✅ Документ додано до черги відправки")
-    except Exception as e:
-        logger.exception(f"Помилка при обробці документа: ")
-        await message.answer("❌ Помилка при додаванні документа")
-
-@admin_orders_router.message(OrderStates.AWAITING_CORRECT, F.video)
-async def handle_video_for_worker_correct(message: Message, state: FSMContext) -> None:
-    """Обробляє відео для відправки воркеру."""
-    try:
-        data = await state.get_data()
-        files = data.get("files", [])
-        
-        file_id = message.video.file_id
-        caption = message.caption if message.caption else ""
-        
-        files.append({"type": "video", "file_id": file_id, "caption": caption})
-        await state.update_data(files=files)
-        
-        await message.answer("✅ Відео додано до черги відправки")
-    except Exception as e:
-        logger.exception(f"Помилка при обробці відео: ")
-        await message.answer("❌ Помилка при додаванні відео")
-
-@admin_orders_router.message(OrderStates.AWAITING_CORRECT, F.voice)
-async def handle_voice_for_worker_correct(message: Message, state: FSMContext) -> None:
-    """Обробляє голосові повідомлення для відправки воркеру."""
-    try:
-        data = await state.get_data()
-        files = data.get("files", [])
-        
-        file_id = message.voice.file_id
-        
-        files.append({"type": "voice", "file_id": file_id})
-        await state.update_data(files=files)
-        
-        await message.answer("✅ Голосове повідомлення додано до черги відправки")
-    except Exception as e:
-        logger.exception(f"Помилка при обробці голосового повідомлення: ")
-        await message.answer("❌ Помилка при додаванні голосового повідомлення")
+@user_orders_router.message(OrderStates.AWAITING_CORRECT, F.photo | F.document | F.video | F.voice)
+async def handle_file_for_worker_correct(message: Message, state: FSMContext, album: Optional[List[Message]] = None) -> None:
+    """Обробляє фото, документи, відео та голосові (в тому числі альбоми) для відправки воркеру."""
+    await _collect_files(message, state, album)
         
-@user_orders_router.callback_query(F.data.startswith("finish_correct_"))
-async def finish_sending_correct_work(callback: CallbackQuery, state: FSMContext) -> None:
+@user_callbacks(OrderCallback, OrderAction.FINISH_CORRECT)
+async def finish_sending_correct_work(callback: CallbackQuery, callback_data: OrderCallback, state: FSMContext) -> None:
     """Завершує процес відправки роботи та надсилає всі файли клієнту."""
     try:
-        order_id = callback.data.split("_")[2]
+        order_id = callback_data.order_id
         data = await state.get_data()
         files = data.get("files", [])
         messages = data.get("messages", [])
@@ -688,80 +536,35 @@ async def finish_sending_correct_work(callback: CallbackQuery, state: FSMContext
         
         client_id = order['ID_user']
         worker_id = order["ID_worker"]
-        send_errors = []
-        
-        # Надсилаємо повідомлення клієнту про виконану роботу
-        try:
-            await callback.bot.send_message(
-                worker_id,
-                f"⚠️⚠️⚠️ Замовлення #{order_id} знову правки!\n\n"
-                f"Нижче ви отримаєте всі коментарі від клієнта."
-            )
-        except Exception as e:
-            logger.exception(f"Помилка при надсиланні початкового повідомлення: ")
-            send_errors.append("початкове повідомлення")
 
-            await callback.bot.send_message(
-                client_id,
-                f"Правки до замовлення #{order_id} не відправлено спробуйте ще раз трохи пізніше. \n"
-                f"Або зверніться до служби підтримки /support .")
-        
-        # Надсилаємо текстові повідомлення
-        for i, msg in enumerate(messages):
-            if msg["type"] == "text":
-                try:
-                    await callback.bot.send_message(worker_id, msg["content"])
-                except Exception as e:
-                    logger.exception(f"Помилка при надсиланні текстового повідомлення #{i+1}: ")
-                    send_errors.append(f"текстове повідомлення #{i+1}")
-        
-        # Надсилаємо файли
-        for i, file in enumerate(files):
-            try:
-                if file["type"] == "photo":
-                    await callback.bot.send_photo(
-                        worker_id, 
-                        file["file_id"],
-                        caption=file["caption"] if file["caption"] else None
-                    )
-                elif file["type"] == "document":
-                    await callback.bot.send_document(
-                        worker_id, 
-                        file["file_id"],
-                        caption=file["caption"] if file["caption"] else None
-                    )
-                elif file["type"] == "video":
-                    await callback.bot.send_video(
-                        worker_id, 
-                        file["file_id"],
-                        caption=file["caption"] if file["caption"] else None
-                    )
-                elif file["type"] == "voice":
-                    await callback.bot.send_voice(worker_id, file["file_id"])
-            except Exception as e:
-                logger.exception(f"Помилка при надсиланні файлу #{i+1} типу {file['type']}: ")
-                send_errors.append(f"файл #{i+1} ({file['type']})")
+        keyboard = InlineKeyboardBuilder()
+        keyboard.button(text=" Відправити роботу ", callback_data=OrderCallback(action=OrderAction.SEND_WORK, order_id=order_id).pack())
 
+        # Правки виконавцю та підтвердження клієнту записуються в outbox однією транзакцією
         try:
-            keyboard = InlineKeyboardBuilder()
-            keyboard.button(text=" Відправити роботу ", callback_data=f"send_work_{order_id}")
-
-            await callback.bot.send_message(
-                client_id,
-                f"Правки до замовлення #{order_id} успішно відправлено.\n"
-                f"Трохи почекайте поки адміністратор виправить вашу роботу."
+            await outbox.enqueue(
+                dict(chat_id=worker_id, text=(
+                    f"⚠️⚠️⚠️ Замовлення #{order_id} знову правки!\n\n"
+                    f"Нижче ви отримаєте всі коментарі від клієнта.")),
+                dict(chat_id=worker_id, files=files, messages=messages),
+                dict(chat_id=client_id, text=(
+                    f"Правки до замовлення #{order_id} успішно відправлено.\n"
+                    f"Трохи почекайте поки адміністратор виправить вашу роботу.")),
+                dict(chat_id=worker_id, text=f"Відправити зкоректовану роботу до замовлення #{order_id}",
+                     reply_markup=keyboard.as_markup()),
             )
+        except Exception as e:
+            # Стан не очищаємо: правки залишаються, відправку можна повторити
+            logger.exception(f"Помилка при записі правок в outbox: ")
+            await callback.answer(
+                f"Правки до замовлення #{order_id} не відправлено спробуйте ще раз трохи пізніше. \n"
+                f"Або зверніться до служби підтримки /support .",
+                show_alert=True)
+            return
 
-            await callback.bot.send_message(
-                worker_id,
-                f"Відправити зкоректовану роботу до замовлення #{order_id}",
-                reply_markup=keyboard.as_markup()
-            )
+        # Робота знову у виконавця (з нагадуванням)
+        await reminder_service.corrections_sent(order_id)
 
-        except Exception as e:
-            logger.exception(f"Помилка при надсиланні повідомлення підтвердження виконання роботи (711): ")
-            await callback.answer("Помилка при надсиланні повідомлення підтвердження виконання роботи", show_alert=True)
-        
         # Очищаємо стан
         await state.clear()
         
@@ -775,69 +578,15 @@ async def finish_sending_correct_work(callback: CallbackQuery, state: FSMContext
 async def show_worker_orders_handler(callback: CallbackQuery) -> None:
         """Показує всі замовлення працівника."""
         try:
-            worker_id = callback.from_user.id
-            orders = await OrderService.get_worker_orders(worker_id)
-
-            # Створюємо клавіатуру для повідомлення
-            keyboard = InlineKeyboardBuilder()
-            keyboard.button(text="🔄 Оновити", callback_data="refresh_worker_orders")
-            keyboard.button(text="🔙 Назад", callback_data="back_to_admin")
-            keyboard.adjust(1)
-
-            if not orders:
-                try:
-                    # Спробуємо оновити існуюче повідомлення
-                    await callback.message.edit_text(
-                        "У вас немає активних замовлень.",
-                        reply_markup=keyboard.as_markup()
-                    )
-                except TelegramBadRequest as e:
-                    # Якщо повідомлення не змінилося, просто відповідаємо користувачу
-                    if "message is not modified" in str(e):
-                        await callback.answer("У вас немає активних замовлень", show_alert=True)
-                    else:
-                        # Якщо інша помилка, пробуємо видалити і відправити нове
-                        await callback.message.delete()
-                        await callback.message.answer(
-                            "У вас немає активних замовлень.",
-                            reply_markup=keyboard.as_markup()
-                        )
-                return
-
-            # Видаляємо поточне повідомлення перед відправкою нових
-            try:
-                await callback.message.delete()
-            except Exception as e:
-                logger.warning(f"Не вдалося видалити повідомлення: ")
-
-            # Відправляємо нові повідомлення для кожного замовлення
-            for order in orders:
-                order_text = (
-                    f"📌 Замовлення #{order['ID_order']}\n"
-                    f"📚 Предмет: {work_dict.subjects.get(order['subject'], order['subject'])}\n"
-                    f"📝 Тип роботи: {work_dict.type_work.get(order['type_work'], order['type_work'])}\n"
-                    f"👤 Замовник: @{order['user_link']}\n"
-                    f"📅 Створено: {order['created_at']}\n"
-                    f"📋 Деталі: {order['order_details']}\n"
-                    f"Статус: {work_dict.status_order.get(order['status'], order['status'])}"
-                )
-
-                order_keyboard = get_worker_order_keyboard(order['ID_order'])
-                order_keyboard.button(text="🔄 Оновити", callback_data="refresh_worker_orders")
-                order_keyboard.button(text="🔙 Назад", callback_data="back_to_admin")
-                order_keyboard.adjust(1)
-
-                await callback.message.answer(
-                    order_text,
-                    reply_markup=order_keyboard.as_markup()
-                )
+            await _edit_order_list(callback, 'my')
+            await callback.answer()
 
         except Exception as e:
             logger.exception(f"Помилка відображення замовлень воркера: ", exc_info=True)
         
             try:
                 keyboard = InlineKeyboardBuilder()
-                keyboard.button(text="🔙 Назад", callback_data="back_to_admin")
+                keyboard.button(text="🔙 Назад", callback_data=MenuCallback(action=MenuAction.BACK_TO_ADMIN).pack())
                 await callback.message.edit_text(
                     "Сталася помилка при отриманні замовлень.",
                     reply_markup=keyboard.as_markup()
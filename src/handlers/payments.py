@@ -1,15 +1,16 @@
 from datetime import datetime
 
-from aiogram import Router, types, F
+from aiogram import Router, types
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, CallbackQuery
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from services.database_service import DatabaseService
+from services.outbox import outbox
 from services.payment_service import PaymentService
 from states.payments_state import PaymentStates
-from utils.decorators import require_admin
+from utils.callbacks import CallbackTable, MenuAction, MenuCallback, PaymentAction, PaymentCallback
 from utils.dict import work_dict
 from utils.keyboards import get_user_pay_keyboard
 from utils.logging import get_logger
@@ -18,8 +19,11 @@ from config import Config
 from text import help_text
 
 # Створюємо роутер
-user_payments_router = Router()
-admin_payments_router = Router()
+user_payments_router = Router(name='user_payments')
+admin_payments_router = Router(name='admin_payments')
+
+user_callbacks = CallbackTable(user_payments_router)
+admin_callbacks = CallbackTable(admin_payments_router)
 
 logger = get_logger("handlers/payments")
 
@@ -38,18 +42,21 @@ async def user_pay_command(message: types.Message):
         reply_markup=get_user_pay_keyboard().as_markup()
     )
 
-@user_payments_router.callback_query(F.data == "unpaid_order")
+@user_callbacks(MenuCallback, MenuAction.UNPAID)
 async def show_unpaid_order(callback: CallbackQuery) -> None:
     """Показує список не оплачених замовлень."""
     try:
         client_id = callback.from_user.id
 
-        unpaid_payments = await payment_service.get_unpaid_orders(client_id, 0)
-         
+        # Неоплачені замовлення разом з даними замовлення одним запитом
+        unpaid_payments = await database_service.get_order_views([
+            ('payments', 'client_id', str(client_id)),
+            ('payments', 'status', 0)
+        ])
 
         if not unpaid_payments:
             keyboard = InlineKeyboardBuilder()
-            keyboard.button(text="🔙 Назад", callback_data="back_to_home")
+            keyboard.button(text="🔙 Назад", callback_data=MenuCallback(action=MenuAction.BACK_HOME).pack())
             await callback.message.edit_text(
                 "У вас немає не оплачених замовлень.",
                 reply_markup=keyboard.as_markup()
@@ -59,21 +66,20 @@ async def show_unpaid_order(callback: CallbackQuery) -> None:
         await callback.message.delete()
         
         # Проходимо по кожному платежу і відправляємо окреме повідомлення
-        for payment in unpaid_payments:
+        for order in unpaid_payments:
             keyboard = InlineKeyboardBuilder()
-            keyboard.button(text="💰 Оплатити", callback_data=f"pay_order_{payment.ID_order}")
-            keyboard.button(text="🔙 Назад", callback_data="back_to_home")
+            keyboard.button(text="💰 Оплатити", callback_data=PaymentCallback(action=PaymentAction.PAY, order_id=order['ID_order']).pack())
+            keyboard.button(text="🔙 Назад", callback_data=MenuCallback(action=MenuAction.BACK_HOME).pack())
             keyboard.adjust(2, 1)
 
             # Визначаємо статус оплати для кожного платежу
-            payment_status = "❌ Не оплачено" if int(payment.status) == 0 else "✅ Оплачено"
-            order = await database_service.get_by_id('order_request', 'ID_order', payment.ID_order)
+            payment_status = "❌ Не оплачено" if int(order['pay_status']) == 0 else "✅ Оплачено"
 
             payment_text = (
-                f"📌 Замовлення #{payment.ID_order}\n"
+                f"📌 Замовлення #{order['ID_order']}\n"
                 f"📚 Предмет: {work_dict.subjects.get(order['subject'], order['subject'])}\n"
                 f"📝 Тип роботи: {work_dict.type_work.get(order['type_work'], order['type_work'])}\n"
-                f"💰 Ціна: {payment.price} грн\n"
+                f"💰 Ціна: {order['price']} грн\n"
                 f"💳 Статус оплати: {payment_status}\n"
                 f"📅 Створено: {order['created_at']}\n"
             )
@@ -90,7 +96,7 @@ async def show_unpaid_order(callback: CallbackQuery) -> None:
             reply_markup=get_user_pay_keyboard().as_markup()
         )
 
-@user_payments_router.callback_query(F.data == "back_to_home")
+@user_callbacks(MenuCallback, MenuAction.BACK_HOME)
 async def back_home (callback: CallbackQuery) -> None:
     """Повертає користувача в головне меню (/help)"""
     try:
@@ -100,13 +106,13 @@ async def back_home (callback: CallbackQuery) -> None:
         logger.exception(f"Помилка при переході до головного меню юзера: ")
         await callback.message.answer("Виникла помилка при переході назад. Будь ласка, введіть команду /help.")
 
-@user_payments_router.callback_query(F.data.startswith("pay_order_"))
-async def pay_order(callback: CallbackQuery) -> None:
+@user_callbacks(PaymentCallback, PaymentAction.PAY)
+async def pay_order(callback: CallbackQuery, callback_data: PaymentCallback) -> None:
     """Процес оплати"""
     try:
         await callback.answer()
 
-        order_id = str(callback.data.split('_', 2)[2])  # Витяг номера замовлення для оплати
+        order_id = callback_data.order_id
         
 
         # Отримуємо всі поля БД за ключем order_id
@@ -125,7 +131,7 @@ async def pay_order(callback: CallbackQuery) -> None:
             
         try:
             keyboard = InlineKeyboardBuilder()
-            keyboard.button(text="Оплатити", callback_data=f"paid_{payment['ID_order']}")
+            keyboard.button(text="Оплатити", callback_data=PaymentCallback(action=PaymentAction.PAID, order_id=payment['ID_order']).pack())
 
             money = payment['price']
             
@@ -152,12 +158,12 @@ async def pay_order(callback: CallbackQuery) -> None:
         logger.exception(f"Помилка при обробці оплати: ")
         await callback.answer("Виникла помилка при обробці оплати.", show_alert=True)
 
-@user_payments_router.callback_query(F.data.startswith("paid_"))
-async def notify_admin_about_payment(callback: CallbackQuery) -> None:
+@user_callbacks(PaymentCallback, PaymentAction.PAID)
+async def notify_admin_about_payment(callback: CallbackQuery, callback_data: PaymentCallback) -> None:
     """Відправлення повідомлення адміністратору про виконану оплату"""
     try:
         user_id = callback.from_user.id
-        order_id = str(callback.data.split('_', 1)[1])  # Витяг номера замовлення для оплати
+        order_id = callback_data.order_id
 
         await callback.message.delete()
 
@@ -170,8 +176,8 @@ async def notify_admin_about_payment(callback: CallbackQuery) -> None:
         money = payment['price']
 
         keyboard = InlineKeyboardBuilder()
-        keyboard.button(text="Підтвердити", callback_data=f"confirm_pay_{order_id}")
-        keyboard.button(text="Відхилити", callback_data=f"reject_{order_id}")
+        keyboard.button(text="Підтвердити", callback_data=PaymentCallback(action=PaymentAction.CONFIRM, order_id=order_id).pack())
+        keyboard.button(text="Відхилити", callback_data=PaymentCallback(action=PaymentAction.REJECT, order_id=order_id).pack())
         
         # Відправляємо повідомлення адміністратору
         await callback.answer()
@@ -191,60 +197,51 @@ async def notify_admin_about_payment(callback: CallbackQuery) -> None:
         logger.exception(f"Помилка при відправці повідомлення адміністратору для підтвердження оплати: ")
         await callback.answer("Щось пішло не так. Спробуйте ще раз або зверніться в підтримку командою /support.", show_alert=True)
 
-@admin_payments_router.callback_query(F.data.startswith("reject_"))
-async def reject_pay(callback: CallbackQuery) -> None:
+@admin_callbacks(PaymentCallback, PaymentAction.REJECT)
+async def reject_pay(callback: CallbackQuery, callback_data: PaymentCallback) -> None:
     try:
         await callback.answer()
         await callback.message.delete()
 
-        order_id = callback.data.split('_', 1)[1]
+        order_id = callback_data.order_id
         order = await database_service.get_by_id('order_request', 'ID_order', order_id)
 
-        await callback.bot.send_message(chat_id=order['ID_user'],
-                                        text=(
-                                            f"Схоже що адміністратор відхилив ваш запрос на підтвердження оплати.\n"
-                                            f"Будь ласка, перевірте чи ви перевели повну суму роботи.\n"
-                                            f"Якщо адміністратор вже декілька разів відхилив вашу заявку, будь ласка, напишіть нам в підтримку /support ."
-                                        ), reply_markup=get_user_pay_keyboard().as_markup())
-        
-        await callback.bot.send_message(chat_id=order['ID_worker'], text="Заявка успішно відхилина.")
+        # Обидва повідомлення записуються в outbox однією транзакцією
+        await outbox.enqueue(
+            dict(chat_id=order['ID_user'],
+                 text=(
+                     f"Схоже що адміністратор відхилив ваш запрос на підтвердження оплати.\n"
+                     f"Будь ласка, перевірте чи ви перевели повну суму роботи.\n"
+                     f"Якщо адміністратор вже декілька разів відхилив вашу заявку, будь ласка, напишіть нам в підтримку /support ."
+                 ), reply_markup=get_user_pay_keyboard().as_markup()),
+            dict(chat_id=order['ID_worker'], text="Заявка успішно відхилина."),
+        )
     except Exception as e:
         logger.exception(f"Помилка при відхилені заяіки на оплату reject_pay(): ")
         raise
 
-@user_payments_router.callback_query(F.data.startswith("confirm_pay_"))
-async def confirm_pay(callback: CallbackQuery) -> None:
+@admin_callbacks(PaymentCallback, PaymentAction.CONFIRM)
+async def confirm_pay(callback: CallbackQuery, callback_data: PaymentCallback) -> None:
     """Підтвердження від адміністратора про сплату"""
     try:
         await callback.answer()
 
-        # Витяг id замовлення з callback запиту  
-        order_id = callback.data.split('_', 2)[2]
+        order_id = callback_data.order_id
 
-        # Отримання замовлення
-        payment = await database_service.get_by_id('payments', 'ID_order', order_id)
-        order = await database_service.get_by_id('order_request', 'ID_order', order_id)
+        # Позначення як оплачене: 0 -> 1 одним запитом, повторне натискання не проходить.
+        # Повідомлення користувачу записується в outbox в тій самій транзакції
+        payment = await payment_service.mark_confirm_pay(order_id, callback.from_user.id)
 
-        if not payment and not order:
-            await callback.message.answer(f"Замовлення {order_id} не знайдено")
-            return
-        
-        if int(payment['status']) != 0:
-            logger.info(payment['status'])
-            await callback.message.answer(f"Замовлення {order_id} вже оплачено")
-            return
-
-        # Позначення як оплачене
-        success = await payment_service.mark_confirm_pay(order_id)
-
-        if success == True:
+        if payment:
             logger.info(f"Замовлення {order_id} оплачено.")
             await callback.message.answer(f"Замовлення {order_id} оплачено.")  # Повідомлення адміну
-            
-            await callback.bot.send_message(
-                chat_id=order['ID_user'], 
-                text=f"Ваше замовлення {order_id} було успішно оплачено."  # Повідомлення користувачу
-            )
+            return
+
+        payment = await database_service.get_by_id('payments', 'ID_order', order_id)
+        if not payment:
+            await callback.message.answer(f"Замовлення {order_id} не знайдено")
+        elif int(payment['status']) != 0:
+            await callback.message.answer(f"Замовлення {order_id} вже оплачено")
         else:
             await callback.message.answer(f"Не вдалося оновити статус замовлення {order_id}.")
 
@@ -252,14 +249,12 @@ async def confirm_pay(callback: CallbackQuery) -> None:
         logger.exception(f"Помилка при підтвердженні оплати замовлення {order_id}: ")
         await callback.message.answer("Сталася помилка під час обробки платежу.")
 
-@admin_payments_router.callback_query(F.data.startswith("put_price_"))
-@require_admin
-async def put_price(callback: CallbackQuery, state: FSMContext) -> None:
+@admin_callbacks(PaymentCallback, PaymentAction.PUT_PRICE)
+async def put_price(callback: CallbackQuery, callback_data: PaymentCallback, state: FSMContext) -> None:
     try:
         await callback.answer()
 
-        # Витяг id замовлення з callback запиту  
-        order_id = callback.data.split('_', 2)[2]
+        order_id = callback_data.order_id
 
         await callback.message.answer(f"В наступному повідомленні надайте повну ціну данного замовлення (#{order_id}).\n Повідомлення повинне бути в числовому форматі та округлено до сотих. Наприклад 12.34")
 
@@ -292,7 +287,7 @@ async def await_price(message: Message, state: FSMContext) -> None:
             await message.answer("Все ОК) Дані додані до бази данних.")
 
             keyboard = InlineKeyboardBuilder()
-            keyboard.button(text="Оплатити", callback_data=f"pay_order_{payment_detail['order_id']}")
+            keyboard.button(text="Оплатити", callback_data=PaymentCallback(action=PaymentAction.PAY, order_id=payment_detail['order_id']).pack())
             keyboard.adjust(1)
 
             order = await database_service.get_by_id("order_request", "ID_order", payment_detail["order_id"])
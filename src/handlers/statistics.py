@@ -1,24 +1,26 @@
 from aiogram import Router
-from aiogram.types import CallbackQuery
+from aiogram.filters import Command
+from aiogram.types import CallbackQuery, Message
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from services.database_service import DatabaseService
-from utils.decorators import require_admin
+from utils.callbacks import CallbackTable, MenuAction, MenuCallback
 from utils.keyboards import get_admin_keyboard
 from utils.logging import get_logger
+from utils.metrics import metrics
 
 from config import Config
 
 # Створення роутерів
 statistics_router = Router(name='statistics')
+callbacks = CallbackTable(statistics_router)
 
 logger = get_logger("handlers/statics")
 
 # Створення об'єктів сервісів
 database_service = DatabaseService()
 
-@statistics_router.callback_query(lambda c: c.data == "my_statistics")
-@require_admin
+@callbacks(MenuCallback, MenuAction.STATISTICS)
 async def show_statistics(callback: CallbackQuery) -> None:
     """
     Показує статистику для адміністратора.
@@ -40,7 +42,7 @@ async def show_statistics(callback: CallbackQuery) -> None:
             stats_text += f"- {subject}: {count} замовлень\n"
 
         keyboard = InlineKeyboardBuilder()
-        keyboard.button(text="🔙 Назад", callback_data="back_to_admin")
+        keyboard.button(text="🔙 Назад", callback_data=MenuCallback(action=MenuAction.BACK_TO_ADMIN).pack())
 
         await callback.message.edit_text(
             stats_text,
@@ -54,6 +56,29 @@ async def show_statistics(callback: CallbackQuery) -> None:
             reply_markup=get_admin_keyboard().as_markup()
         )
 
+@statistics_router.message(Command("rebuild_stats"))
+async def rebuild_statistics(message: Message) -> None:
+    """
+    Перераховує статистику воркерів з таблиці замовлень.
+    """
+    try:
+        await database_service.rebuild_worker_stats()
+        await message.answer("✅ Статистику перераховано.")
+    except Exception as e:
+        logger.exception(f"Помилка при перерахунку статистики: ")
+        await message.answer("Сталася помилка при перерахунку статистики. Спробуйте пізніше.")
+
+@statistics_router.message(Command("metrics"))
+async def show_metrics(message: Message) -> None:
+    """
+    Показує зведенку метрик бота (час обробки, БД, Bot API, найповільніші обробники).
+    """
+    try:
+        await message.answer(metrics.summary())
+    except Exception as e:
+        logger.exception(f"Помилка при показі метрик: ")
+        await message.answer("Сталася помилка при отриманні метрик. Спробуйте пізніше.")
+
 class OrderServicePayments:
     def __init__(self):
         self.db_path = Config.DATABASE_PATH
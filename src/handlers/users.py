@@ -20,7 +20,7 @@ MAX_COMMENT_LENGTH = 500
 MAX_GROUP_LENGTH = 10
 ALLOWED_COURSES = ['1', '2', '3', '4']
 
-user_router = Router()
+user_router = Router(name='users')
 
 logger = get_logger("handlers/users")
 
@@ -59,7 +59,8 @@ async def handle_contact(message: types.Message, state: FSMContext):
             )
             return
 
-        await state.update_data(contact=contact, user=user)
+        # В FSM зберігаємо тільки прості значення (стан серіалізується в БД)
+        await state.update_data(phone_number=contact.phone_number, language_code=user.language_code)
         await message.answer("Будь ласка, введіть своє ім'я та по батькові.")
         await state.set_state(UserState.waiting_for_real_full_name)
     except Exception as e:
@@ -196,26 +197,18 @@ async def get_group(message: Message, state: FSMContext):
         user_data = await state.get_data()
         user = message.from_user
         
-        async with aiosqlite.connect(Config.DATABASE_PATH) as db:
-            await db.execute(
-                '''INSERT INTO user_data (
-                    ID, user_name, user_link, real_full_name, for_father,
-                    education, course, edu_group, phone_number, language_code
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                (
-                    user.id,
-                    f"{user.first_name} {user.last_name or ''}".strip() or user.username or "Unknown",
-                    user.username,
-                    user_data['full_name'],
-                    user_data['patronymic'],
-                    user_data['education_place'],
-                    user_data['course'],
-                    group,
-                    user_data['contact'].phone_number,
-                    user_data['user'].language_code
-                )
-            )
-            await db.commit()
+        await database_service.add_user({
+            'ID': user.id,
+            'user_name': f"{user.first_name} {user.last_name or ''}".strip() or user.username or "Unknown",
+            'user_link': user.username,
+            'real_full_name': user_data['full_name'],
+            'for_father': user_data['patronymic'],
+            'education': user_data['education_place'],
+            'course': user_data['course'],
+            'edu_group': group,
+            'phone_number': user_data['phone_number'],
+            'language_code': user_data.get('language_code')
+        })
         
         await message.answer(
             "Ваші дані успішно збережено.",
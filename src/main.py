@@ -2,20 +2,36 @@ import asyncio
 import signal
 from contextlib import suppress
 from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.enums import ParseMode
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
 
 # Абсолютні імпорти роутерів
 from handlers.admin import admin_router
 from handlers.basic import basic_router
-from handlers.comunication import comunication_router
+from handlers.comunication import user_comunication_router, admin_comunication_router
 from handlers.orders import user_orders_router, admin_orders_router
 from handlers.payments import user_payments_router, admin_payments_router
 from handlers.statistics import statistics_router
 from handlers.users import user_router
 
-from services.database_service import DBCreator
+from services.db_pool import db_pool
+from services.fsm_storage import SQLiteStorage
+from services.migrations import Migrator
+from services.outbox import outbox
+from services.scheduler import scheduler
+from services.shared_state import shared_state
+from services.write_queue import write_queue
+from utils.concurrency import UpdateConcurrencyMiddleware
 from utils.logging import get_logger
+from utils.metrics import metrics
+from utils.rate_limiter import outbound_limiter
+from utils.roles import admin_only, role_middleware
 from config import Config
 
 logger = get_logger("MAIN")
@@ -25,6 +41,8 @@ class BotRunner:
         self.shutdown_event = asyncio.Event()
         self.bot = None
         self.dp = None
+        self.storage = None
+        self.concurrency = UpdateConcurrencyMiddleware()
         
     def handle_shutdown(self, signum, frame):
         """Обробник сигналу завершення."""
@@ -33,14 +51,22 @@ class BotRunner:
 
     async def register_routers(self):
         """Реєстрація всіх роутерів."""
-        # Адмін роутери
-        self.dp.include_router(admin_router)
-        self.dp.include_router(admin_orders_router)
-        self.dp.include_router(admin_payments_router)
-        self.dp.include_router(statistics_router)
-        self.dp.include_router(comunication_router)
+        # Метрики оновлень та обробників (inner middleware диспетчера діє на всі роутери)
+        self.dp.update.outer_middleware(metrics.update_middleware)
+        self.dp.message.middleware(metrics.handler_middleware)
+        self.dp.callback_query.middleware(metrics.handler_middleware)
+
+        # Роль відправника (data['role']) визначається один раз на оновлення
+        self.dp.update.outer_middleware(role_middleware)
+
+        # Адмін роутери: оновлення інших користувачів відсікаються до перевірки фільтрів
+        for router in (admin_router, admin_orders_router, admin_payments_router,
+                       statistics_router, admin_comunication_router):
+            admin_only.protect(router)
+            self.dp.include_router(router)
         
         # Користувацькі роутери
+        self.dp.include_router(user_comunication_router)
         self.dp.include_router(basic_router)
         self.dp.include_router(user_orders_router)
         self.dp.include_router(user_payments_router)
@@ -48,60 +74,176 @@ class BotRunner:
         
         logger.info("Всі роутери успішно зареєстровані")
 
+    def create_bot(self) -> Bot:
+        """Створення бота (з Config.TELEGRAM_API_URL - через інший сервер Bot API)."""
+        session = None
+        if Config.TELEGRAM_API_URL:
+            session = AiohttpSession(api=TelegramAPIServer.from_base(Config.TELEGRAM_API_URL))
+            logger.info(f"Bot API: {Config.TELEGRAM_API_URL}")
+
+        return Bot(
+            token=Config.BOT_TOKEN,
+            session=session,
+            default=DefaultBotProperties(parse_mode=ParseMode.HTML)
+        )
+
+    def create_storage(self) -> BaseStorage:
+        """Створення FSM-сховища згідно з Config.FSM_STORAGE."""
+        if Config.FSM_STORAGE == "memory":
+            return MemoryStorage()
+        if Config.FSM_STORAGE == "redis":
+            return shared_state.create_fsm_storage()
+        return SQLiteStorage()
+
     async def init_services(self):
         """Ініціалізація всіх сервісів."""
         try:
-            if await DBCreator.create_tables() == True:
-                logger.info("Таблиці бази даних успішно створені")
-            else:
-                logger.exception(f"Помилка при створені створені БД")
+            # Відкриваємо пул з'єднань, яким користуються всі сервіси
+            await db_pool.open(Config.DATABASE_PATH, Config.DB_POOL_SIZE)
+
+            # Приводимо схему БД до актуальної версії
+            version = await Migrator.migrate()
+            logger.info(f"База даних готова (версія схеми {version})")
+
+            # Всі зміни в БД проходять через єдиний writer
+            await write_queue.start()
+
+            # Сповіщення з outbox (зокрема незавершені до перезапуску) надсилає фонова задача
+            await outbox.start(self.bot)
+
+            # Відкладені задачі (нагадування) з БД
+            await scheduler.start()
+
+            if isinstance(self.storage, SQLiteStorage):
+                await self.storage.start()
+
+            # Підписка на інвалідацію кешу від інших процесів
+            await shared_state.start()
+
+            await metrics.start_server()
         except Exception as e:
             logger.exception(f"Помилка ініціалізації сервісів: ")
             raise
 
+    async def run_polling(self):
+        """Отримання оновлень через long polling до сигналу завершення."""
+        polling_task = asyncio.create_task(self.dp.start_polling(
+            self.bot,
+            handle_signals=False,
+            close_bot_session=False
+        ))
+        
+        # Очікуємо сигнал завершення
+        await self.shutdown_event.wait()
+        
+        # Припиняємо отримувати нові оновлення і дочікуємось вже прийнятих
+        with suppress(RuntimeError):
+            await self.dp.stop_polling()
+        await self.concurrency.drain()
+
+        polling_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await polling_task
+
+    async def run_webhook(self):
+        """Приймання оновлень через aiohttp-сервер webhook до сигналу завершення."""
+        app = web.Application()
+        SimpleRequestHandler(
+            dispatcher=self.dp,
+            bot=self.bot,
+            secret_token=Config.WEBHOOK_SECRET,
+            handle_in_background=True
+        ).register(app, path=Config.WEBHOOK_PATH)
+        setup_application(app, self.dp, bot=self.bot)
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, Config.WEBHOOK_HOST, Config.WEBHOOK_PORT)
+        await site.start()
+        logger.info(f"Webhook слухає {Config.WEBHOOK_HOST}:{Config.WEBHOOK_PORT}{Config.WEBHOOK_PATH}")
+
+        try:
+            if Config.WEBHOOK_URL:
+                await self.bot.set_webhook(
+                    url=f"{Config.WEBHOOK_URL.rstrip('/')}{Config.WEBHOOK_PATH}",
+                    secret_token=Config.WEBHOOK_SECRET,
+                    allowed_updates=self.dp.resolve_used_update_types()
+                )
+
+            # Очікуємо сигнал завершення
+            await self.shutdown_event.wait()
+        finally:
+            # Не приймаємо нові запити, дочікуємось обробки вже прийнятих оновлень.
+            # Webhook не видаляємо: його можуть обслуговувати інші екземпляри бота
+            await site.stop()
+            await self.concurrency.drain()
+            await runner.cleanup()
+
+    async def setup(self):
+        """Створення бота, диспетчера та сервісів (без отримання оновлень)."""
+        self.bot = self.create_bot()
+        # Спільний стан потрібен до створення FSM-сховища (FSM_STORAGE=redis)
+        shared_state.connect()
+        self.storage = self.create_storage()
+        self.dp = Dispatcher(storage=self.storage)
+
+        # Всі вихідні повідомлення проходять через ліміти Telegram
+        self.bot.session.middleware(outbound_limiter)
+        # Час самих запитів до Bot API (після черги лімітів)
+        self.bot.session.middleware(metrics.api_middleware)
+
+        # Обмеження одночасної обробки оновлень та очікування їх завершення при зупинці
+        self.dp.update.outer_middleware(self.concurrency)
+
+        # Ініціалізуємо сервіси
+        await self.init_services()
+        
+        # Реєструємо роутери
+        await self.register_routers()
+
+    async def shutdown(self):
+        """Закриття сервісів та сесії бота."""
+        await metrics.stop_server()
+        # Незбережені FSM-стани записуються через write_queue, тому закриваємо їх першими
+        if self.storage:
+            await self.storage.close()
+        # Планувальник та відправка outbox записують через write_queue
+        await scheduler.stop()
+        await outbox.stop()
+        await write_queue.stop()
+        await db_pool.close()
+        await shared_state.close()
+        if self.bot:
+            await self.bot.session.close()
+            logger.info("Бот успішно зупинений")
+
     async def start(self):
         """Запуск бота."""
         try:
             logger.info("Бот запускається...")
             
-            # Налаштовуємо обробники сигналів
-            signal.signal(signal.SIGINT, self.handle_shutdown)
-            signal.signal(signal.SIGTERM, self.handle_shutdown)
-            
-            # Ініціалізуємо бота та диспетчер
-            self.bot = Bot(
-                token=Config.BOT_TOKEN,
-                default=DefaultBotProperties(parse_mode=ParseMode.HTML)
-            )
-            self.dp = Dispatcher()
-
-            # Ініціалізуємо сервіси
-            await self.init_services()
+            # Налаштовуємо обробники сигналів (через цикл подій, щоб він прокинувся одразу)
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    loop.add_signal_handler(sig, self.handle_shutdown, sig, None)
+                except NotImplementedError:
+                    signal.signal(sig, self.handle_shutdown)
             
-            # Реєструємо роутери
-            await self.register_routers()
+            await self.setup()
             
-            logger.info('Бот активний')
+            logger.info(f'Бот активний (режим {Config.BOT_MODE})')
 
-            # Запускаємо поллінг
-            polling_task = asyncio.create_task(self.dp.start_polling(self.bot))
-            
-            # Очікуємо сигнал завершення
-            await self.shutdown_event.wait()
-            
-            # Скасовуємо поллінг
-            polling_task.cancel()
-            
-            with suppress(asyncio.CancelledError):
-                await polling_task
+            if Config.BOT_MODE == "webhook":
+                await self.run_webhook()
+            else:
+                await self.run_polling()
                 
         except Exception as e:
             logger.exception(f"Помилка запуску бота: ")
             raise
         finally:
-            if self.bot:
-                await self.bot.session.close()
-                logger.info("Бот успішно зупинений")
+            await self.shutdown()
 
 def run_bot():
     """Головна функція запуску бота."""
@@ -1,6 +1,6 @@
 from .base import BaseModel
-from .order import Order, OrderStatus
-from .payments import Payments
-from .user import UserModel
+from .order import OrderStatus
+from .records import OrderRecord, OrderViewRecord, PaymentRecord, Record, UserRecord, record_factory
 
-__all__ = ['BaseModel', 'Order', 'OrderStatus', 'Payments', 'UserModel']
\ No newline at end of file
+__all__ = ['BaseModel', 'OrderStatus', 'OrderRecord', 'OrderViewRecord', 'PaymentRecord',
+           'Record', 'UserRecord', 'record_factory']
\ No newline at end of file
@@ -1,23 +1,11 @@
 from datetime import datetime
-from pydantic import BaseModel, validator
-from dataclasses import dataclass
+from pydantic import BaseModel, Field, field_validator
 
 class BaseDBModel(BaseModel):
-    created_at: datetime = datetime.now()
-    updated_at: datetime = datetime.now()
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
     
-    @validator('updated_at', always=True)
+    @field_validator('updated_at')
+    @classmethod
     def set_updated_at(cls, v):
         return datetime.now()
-    
-@dataclass
-class Model:
-        # Info user
-    ID: int
-    user_name: str
-    user_link: str
-    real_full_name: str
-    for_father: str
-    education: str
-    course: int
-    edu_group: int
\ No newline at end of file
@@ -0,0 +1,191 @@
+import sqlite3
+
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+
+from model.order import OrderStatus
+
+class Record:
+    """
+    Рядок результату запиту: значення зберігаються кортежем, імена колонок - у класі.
+
+    Підтримує інтерфейс словника тільки для читання (record['status'], get(), keys(),
+    items(), dict(record)) та доступ за номером колонки (record[0]), тому замінює
+    aiosqlite.Row / dict(row) без змін у коді, що читає результати. Колонки доступні
+    й атрибутами (record.status); атрибути колонок *_at повертають datetime, який
+    розбирається з рядка лише при першому зверненні (record['created_at'] - сирий рядок).
+    Записи не змінюються, тому один об'єкт можна віддавати з кешу кільком обробникам.
+    """
+    __slots__ = ("_values", "_parsed")
+
+    _fields: Tuple[str, ...] = ()
+    _keys: Tuple[str, ...] = ()
+    _index: Dict[str, int] = {}
+
+    def __init__(self, values: Tuple[Any, ...]):
+        self._values = values
+        self._parsed: Optional[Dict[str, Optional[datetime]]] = None
+
+    def __getitem__(self, key: Any) -> Any:
+        if isinstance(key, (int, slice)):
+            return self._values[key]
+        try:
+            return self._values[self._index[key]]
+        except KeyError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        index = self._index.get(key)
+        return default if index is None else self._values[index]
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._keys
+
+    def values(self) -> List[Any]:
+        return [self._values[self._index[key]] for key in self._keys]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, self._values[self._index[key]]) for key in self._keys]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (Record, dict)):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def timestamp(self, key: str) -> Optional[datetime]:
+        """
+        Значення колонки з датою як datetime (розбирається один раз і кешується)
+
+        Return:
+            Optional[datetime] - None якщо значення порожнє або не є датою
+        """
+        if self._parsed is None:
+            self._parsed = {}
+        elif key in self._parsed:
+            return self._parsed[key]
+
+        value = self.get(key)
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                value = None
+        elif not isinstance(value, datetime):
+            value = None
+
+        self._parsed[key] = value
+        return value
+
+def _column_property(index: int) -> property:
+    return property(lambda self: self._values[index])
+
+def _timestamp_property(key: str) -> property:
+    return property(lambda self: self.timestamp(key))
+
+def _bind(cls: Type[Record], fields: Tuple[str, ...]) -> Type[Record]:
+    """Прив'язує до класу запису набір колонок (порядок як у cursor.description)."""
+    # Для однакових імен (o.status і p.status у JOIN) діє останнє значення, як у dict(row)
+    index = {field: i for i, field in enumerate(fields)}
+    cls._fields = fields
+    cls._keys = tuple(dict.fromkeys(fields))
+    cls._index = index
+
+    for key, i in index.items():
+        if not key.isidentifier() or hasattr(Record, key) or key in cls.__dict__:
+            continue
+        setattr(cls, key, _timestamp_property(key) if key.endswith("_at") else _column_property(i))
+    return cls
+
+class UserRecord(Record):
+    """Рядок user_data."""
+    __slots__ = ()
+
+class OrderRecord(Record):
+    """Рядок order_request."""
+    __slots__ = ()
+
+    @property
+    def order_status(self) -> Optional[OrderStatus]:
+        try:
+            return OrderStatus(self['status'])
+        except ValueError:
+            return None
+
+class PaymentRecord(Record):
+    """Рядок payments."""
+    __slots__ = ()
+
+    @property
+    def is_paid(self) -> bool:
+        return str(self['status']) == '1'
+
+class OrderViewRecord(OrderRecord):
+    """Замовлення з платежем та замовником (DatabaseService.ORDER_VIEW_QUERY)."""
+    __slots__ = ()
+
+    @property
+    def is_paid(self) -> bool:
+        return str(self['pay_status']) == '1'
+
+USER_FIELDS = (
+    'ID', 'user_name', 'user_link', 'real_full_name', 'for_father', 'education',
+    'course', 'edu_group', 'phone_number', 'language_code', 'created_at',
+)
+ORDER_FIELDS = (
+    'ID_order', 'ID_user', 'ID_worker', 'subject', 'type_work', 'order_details',
+    'status', 'created_at', 'taken_at', 'completed_at', 'updated_at',
+)
+PAYMENT_FIELDS = (
+    'id_operation', 'ID_order', 'client_id', 'status', 'price', 'paid', 'created_at', 'paid_at',
+)
+ORDER_VIEW_FIELDS = ORDER_FIELDS + (
+    'id_operation', 'client_id', 'price', 'paid', 'pay_status', 'paid_at', 'user_name', 'user_link',
+)
+
+# Класи записів за набором колонок результату; нові набори (інші SELECT) додаються при першій появі
+_record_classes: Dict[Tuple[str, ...], Type[Record]] = {
+    USER_FIELDS: _bind(UserRecord, USER_FIELDS),
+    ORDER_FIELDS: _bind(OrderRecord, ORDER_FIELDS),
+    PAYMENT_FIELDS: _bind(PaymentRecord, PAYMENT_FIELDS),
+    ORDER_VIEW_FIELDS: _bind(OrderViewRecord, ORDER_VIEW_FIELDS),
+}
+
+def record_class(fields: Tuple[str, ...]) -> Type[Record]:
+    """Клас запису для набору колонок (створюється один раз на кожен набір)."""
+    cls = _record_classes.get(fields)
+    if cls is None:
+        cls = _record_classes[fields] = _bind(type("Row", (Record,), {"__slots__": ()}), fields)
+    return cls
+
+# (cursor.description, клас) останнього запиту: description - один об'єкт на весь результат,
+# тому для кожного наступного рядка клас не шукається. Кортеж замінюється атомарно,
+# тож фабрику можуть викликати потоки кількох з'єднань одночасно
+_last_shape: Tuple[Any, Type[Record]] = (None, Record)
+
+def record_factory(cursor: sqlite3.Cursor, row: Tuple[Any, ...]) -> Record:
+    """row_factory для з'єднань aiosqlite: повертає Record замість sqlite3.Row."""
+    global _last_shape
+
+    description, cls = _last_shape
+    if cursor.description is not description:
+        description = cursor.description
+        cls = record_class(tuple(column[0] for column in description))
+        _last_shape = (description, cls)
+    return cls(row)
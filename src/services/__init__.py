@@ -1,16 +1,36 @@
 from .admin_service import AdminService
-from .database_service import DatabaseService, DBCreator
+from .database_service import DatabaseService
+from .db_pool import DBPool, db_pool
+from .fsm_storage import SQLiteStorage
+from .migrations import Migrator
+from .outbox import Outbox, outbox
+from .scheduler import Scheduler, scheduler
+from .write_queue import WriteQueue, write_queue
+from .order_list_service import OrderListService
 from .order_service import OrderService
-from .user_service import UserService
 from .file_service import FileService
 from .payment_service import PaymentService
+from .reminder_service import ReminderService
+from .shared_state import SharedState, shared_state
 
 __all__ = [
     'AdminService',
     'DatabaseService',
-    'DBCreator',
+    'DBPool',
+    'db_pool',
+    'SQLiteStorage',
+    'Migrator',
+    'Outbox',
+    'outbox',
+    'Scheduler',
+    'scheduler',
+    'WriteQueue',
+    'write_queue',
+    'OrderListService',
     'OrderService', 
-    'UserService', 
     'FileService',
-    'PaymentService'
+    'PaymentService',
+    'ReminderService',
+    'SharedState',
+    'shared_state'
 ]
\ No newline at end of file
@@ -1,8 +1,13 @@
 import aiosqlite
 
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple
 
-from model.order import OrderStatus
+from model.records import OrderViewRecord, Record
+from services.db_pool import db_pool
+from services.migrations import WORKER_STATS_REBUILD
+from services.shared_state import shared_state
+from services.write_queue import write_queue
+from utils.cache import LRUCache, MISSING
 from utils.logging import get_logger
 from utils.validators import _validate_table_column
 
@@ -10,92 +15,64 @@ from config import Config
 
 logger = get_logger("services/database_service")
 
-class DBCreator:
-    @staticmethod
-    async def create_tables() -> bool:
+# Замовлення + платіж + замовник одним запитом (замість N+1 викликів get_by_id)
+ORDER_VIEW_QUERY = """
+    SELECT
+        o.*,
+        p.id_operation,
+        p.client_id,
+        p.price,
+        p.paid,
+        p.status AS pay_status,
+        p.paid_at,
+        u.user_name,
+        u.user_link
+    FROM order_request o
+    LEFT JOIN payments p ON p.ID_order = o.ID_order
+    LEFT JOIN user_data u ON u.ID = o.ID_user
+"""
+
+USER_COLUMNS = (
+    'ID', 'user_name', 'user_link', 'real_full_name', 'for_father',
+    'education', 'course', 'edu_group', 'phone_number', 'language_code'
+)
+
+VIEW_TABLE_ALIASES = {
+    'order_request': 'o',
+    'payments': 'p',
+    'user_data': 'u',
+}
+
+# Кеш рядків user_data (ключі ('ID', int) та ('user_link', str)), спільний для всіх DatabaseService
+user_cache = LRUCache(Config.USER_CACHE_SIZE, Config.USER_CACHE_TTL)
+
+def _user_cache_key(column: str, value: Any) -> Optional[Tuple[str, Any]]:
+    """Нормалізований ключ кешу для пошуку в user_data, або None якщо колонка не кешується."""
+    if value is None:
+        return None
+    if column == 'ID':
         try:
-            async with aiosqlite.connect(Config.DATABASE_PATH) as db:
-                try:
-                    await db.execute("""
-                        CREATE TABLE IF NOT EXISTS user_data (
-                            ID INTEGER PRIMARY KEY,
-                            user_name TEXT NOT NULL,
-                            user_link TEXT,
-                            real_full_name TEXT NOT NULL,
-                            for_father TEXT NOT NULL,
-                            education TEXT NOT NULL,
-                            course TEXT NOT NULL,
-                            edu_group TEXT NOT NULL,
-                            phone_number TEXT NOT NULL,
-                            language_code TEXT,
-                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                        )
-                    """)
-                    await db.commit()
-                except aiosqlite.Error as e:
-                    logger.exception(f"Error create table user_data: ")
-
-            try:
-                async with aiosqlite.connect(Config.DATABASE_PATH) as db:
-                    await db.execute("""
-                        CREATE TABLE IF NOT EXISTS order_request (
-                            ID_order TEXT PRIMARY KEY,
-                            ID_user INTEGER NOT NULL,
-                            ID_worker INTEGER,
-                            subject TEXT NOT NULL,
-                            type_work TEXT NOT NULL,
-                            order_details TEXT NOT NULL,
-                            status INTEGER NOT NULL,
-                            created_at TEXT NOT NULL,
-                            taken_at TEXT,
-                            completed_at TEXT,
-                            updated_at TEXT,
-                            FOREIGN KEY (ID_user) REFERENCES user_data(ID)
-                        )
-                    """)
-                    await db.commit()
-            except aiosqlite.Error as e:
-                    logger.exception(f"Error create table order_request: ")
-
-            try:
-                # Таблиця платежів
-                async with aiosqlite.connect(Config.DATABASE_PATH) as db:
-                    await db.execute("""
-                    CREATE TABLE IF NOT EXISTS payments (
-                        id_operation INTEGER PRIMARY KEY AUTOINCREMENT,
-                        ID_order TEXT,
-                        client_id TEXT,
-                        status INT,
-                        price REAL,
-                        paid REAL,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        paid_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                        )
-                    """)
-                
-                    await db.commit()
-                return True
-            except aiosqlite.Error as e:
-                    logger.exception(f"Error create table payments: ")
-        
-        except aiosqlite.Error as e:
-            logger.exception(f"Database error during table creation: ")
-            raise
+            return ('ID', int(value))
+        except (TypeError, ValueError):
+            return None
+    if column == 'user_link':
+        return ('user_link', str(value))
+    return None
+
+def _cache_user(row: Record, generation: int) -> None:
+    # Під час читання запис могли змінити та інвалідувати: старий рядок не повертаємо в кеш
+    if user_cache.generation != generation:
+        return
+    for column in ('ID', 'user_link'):
+        key = _user_cache_key(column, row.get(column))
+        if key:
+            user_cache.set(key, row)
 
 class DatabaseService:
     def __init__(self):
         self.db_path = Config.DATABASE_PATH
-
-    async def _get_db_connection(self):
-        try:
-            db = await aiosqlite.connect(self.db_path)
-            db.row_factory = aiosqlite.Row # Для повернення інформації у вигляді (id = '1234', name = 'John', ...)
-            return db
-        except Exception as e:
-            logger.exception(f"Помилка підключення до БД: ")
-            raise
     
-    async def get_by_id(self, table: str, column: str, id_value: Any) -> Optional[Dict]:
+    async def get_by_id(self, table: str, column: str, id_value: Any) -> Optional[Record]:
         """
         Отримання одного запису по ID
 
@@ -105,27 +82,35 @@ class DatabaseService:
             id_value: Any - значення ID (може бути str "001234" або int 123)
         
         Return:
-            Optional[Dict] - словник зі всіма знайденими значеннями, або None якщо не знайдено
+            Optional[Record] - запис зі всіма знайденими значеннями (читається як словник), або None якщо не знайдено
         """
-        db = None
-
         try:
-           db = await self._get_db_connection()
-           _validate_table_column(table, column) # Валідація table and column
-           async with db.execute(f"SELECT * FROM {table} WHERE {column} = ?", (id_value,)) as cursor:
-                row = await cursor.fetchone()
-                return dict(row) if row else None
+            _validate_table_column(table, column) # Валідація table and column
+
+            cache_key = _user_cache_key(column, id_value) if table == 'user_data' else None
+            if cache_key:
+                cached = user_cache.get(cache_key)
+                if cached is not MISSING:
+                    return cached # Записи незмінні, копія не потрібна
+                generation = user_cache.generation
+
+            async with db_pool.reader() as db:
+                async with db.execute(f"SELECT * FROM {table} WHERE {column} = ?", (id_value,)) as cursor:
+                    row = await cursor.fetchone()
+                    if not row:
+                        return None
+
+            if cache_key:
+                _cache_user(row, generation)
+            return row
         except aiosqlite.Error as e:
             logger.exception(f"Помилка отримання данних з бд: ")
             raise
         except ValueError as e:
             logger.exception(f"Помилка валідації: ")
             raise
-        finally:
-            if db:
-                await db.close()
     
-    async def get_all_by_field(self, table: str, column: str, field_value: Any) -> List[Dict]:
+    async def get_all_by_field(self, table: str, column: str, field_value: Any) -> List[Record]:
         """
         Отримання всіх записів по фільтру (field_value)
 
@@ -135,16 +120,13 @@ class DatabaseService:
             field_value - значення фільтру за яким будуть відображатися знайдені рядки (наприклад 'pending')
 
         Return:
-            List[Dict] - список усіх знайдених збігів, або [] якщо нічого не знайдено
+            List[Record] - список усіх знайдених збігів, або [] якщо нічого не знайдено
         """
-        db = None
-
         try:
-            db = await self._get_db_connection()
             _validate_table_column(table, column) # Валідація table and column
-            async with db.execute(f"SELECT * FROM {table} WHERE {column} = ?", (field_value,)) as cursor:
-                rows = await cursor.fetchall()
-                return [dict(row) for row in rows]
+            async with db_pool.reader() as db:
+                async with db.execute(f"SELECT * FROM {table} WHERE {column} = ?", (field_value,)) as cursor:
+                    return await cursor.fetchall()
 
         except aiosqlite.Error as e:
             logger.exception(f"Помилка отримання данних з бд (get_all_by_field()): ")
@@ -152,13 +134,191 @@ class DatabaseService:
         except ValueError as e:
             logger.exception(f"Помилка валідації: ")
             raise
-        finally:
-            if db:
-                await db.close()
     
+    async def add_user(self, user_data: Dict[str, Any]) -> None:
+        """
+        Запис нового користувача в user_data
+
+        Args:
+            user_data: Dict[str, Any] - значення колонок user_data
+                (ID, user_name, user_link, real_full_name, for_father, education,
+                course, edu_group, phone_number, language_code)
+        """
+        columns = [column for column in USER_COLUMNS if column in user_data]
+        query = f"""
+            INSERT INTO user_data ({', '.join(columns)})
+            VALUES ({', '.join('?' for _ in columns)})
+        """
+        params = tuple(user_data[column] for column in columns)
+
+        try:
+            await write_queue.submit(lambda db: db.execute(query, params))
+        except aiosqlite.Error as e:
+            logger.exception(f"Помилка запису користувача {user_data.get('ID')}: ")
+            raise
+        finally:
+            self.invalidate_user(user_data.get('ID'), user_data.get('user_link'))
+            shared_state.notify_invalidation('user', user_id=user_data.get('ID'), user_link=user_data.get('user_link'))
+
+    @staticmethod
+    def invalidate_user(user_id: Any, user_link: Optional[str] = None) -> None:
+        """Видаляє користувача з кешу (за ID, попереднім та новим user_link)."""
+        id_key = _user_cache_key('ID', user_id)
+        cached = user_cache.peek(id_key) if id_key else MISSING
+        if cached is not MISSING:
+            user_cache.invalidate(_user_cache_key('user_link', cached.get('user_link')))
+
+        for key in (id_key, _user_cache_key('user_link', user_link)):
+            if key:
+                user_cache.invalidate(key)
+
+    @staticmethod
+    def _build_view_filters(filters: List[Tuple[str, str, Any]]) -> Tuple[str, List[Any]]:
+        """Перетворює список фільтрів (table, column, value) на WHERE-умову для ORDER_VIEW_QUERY."""
+        conditions = []
+        params = []
+        for table, column, value in filters:
+            _validate_table_column(table, column) # Валідація table and column
+            field = f"{VIEW_TABLE_ALIASES[table]}.{column}"
+            if isinstance(value, (list, tuple, set)):
+                conditions.append(f"{field} IN ({', '.join('?' for _ in value)})")
+                params.extend(value)
+            else:
+                conditions.append(f"{field} = ?")
+                params.append(value)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
+
+    async def get_order_views(self, filters: List[Tuple[str, str, Any]]) -> List[OrderViewRecord]:
+        """
+        Отримання замовлень разом з платежем та даними замовника одним запитом
+
+        Args:
+            filters: List[Tuple[str, str, Any]] - список фільтрів (таблиця, колонка, значення),
+                наприклад [('payments', 'client_id', '123'), ('payments', 'status', 0)].
+                Значення-список перетворюється на умову IN (...)
+
+        Return:
+            List[OrderViewRecord] - список замовлень з полями order_request, а також
+                id_operation, client_id, price, paid, pay_status, paid_at (payments)
+                та user_name, user_link (user_data); [] якщо нічого не знайдено
+        """
+        try:
+            where, params = self._build_view_filters(filters)
+            async with db_pool.reader() as db:
+                async with db.execute(f"{ORDER_VIEW_QUERY} {where} ORDER BY o.ID_order", params) as cursor:
+                    return await cursor.fetchall()
+
+        except aiosqlite.Error as e:
+            logger.exception(f"Помилка отримання данних з бд (get_order_views()): ")
+            raise
+        except ValueError as e:
+            logger.exception(f"Помилка валідації: ")
+            raise
+
+    async def get_order_views_page(self, filters: List[Tuple[str, str, Any]],
+                                   limit: int = None, after: Optional[str] = None) -> Tuple[List[OrderViewRecord], Optional[str]]:
+        """
+        Посторінкове отримання замовлень з платежем та замовником (keyset по ID_order)
+
+        Args:
+            filters: List[Tuple[str, str, Any]] - фільтри, як у get_order_views()
+            limit: int - розмір сторінки (за замовчуванням Config.DB_PAGE_SIZE)
+            after: Optional[str] - ID_order останнього замовлення попередньої сторінки
+
+        Return:
+            Tuple[List[OrderViewRecord], Optional[str]] - замовлення сторінки та курсор наступної сторінки
+                (None якщо сторінка остання)
+        """
+        limit = limit or Config.DB_PAGE_SIZE
+        try:
+            where, params = self._build_view_filters(filters)
+            if after is not None:
+                where = f"{where} AND o.ID_order > ?" if where else "WHERE o.ID_order > ?"
+                params.append(after)
+            params.append(limit)
+
+            async with db_pool.reader() as db:
+                async with db.execute(f"{ORDER_VIEW_QUERY} {where} ORDER BY o.ID_order LIMIT ?", params) as cursor:
+                    rows = await cursor.fetchall()
+
+            next_cursor = rows[-1]['ID_order'] if len(rows) == limit else None
+            return rows, next_cursor
+
+        except aiosqlite.Error as e:
+            logger.exception(f"Помилка отримання данних з бд (get_order_views_page()): ")
+            raise
+        except ValueError as e:
+            logger.exception(f"Помилка валідації: ")
+            raise
+
+    async def get_order_views_slice(self, filters: List[Tuple[str, str, Any]],
+                                    limit: int, offset: int = 0) -> Tuple[List[OrderViewRecord], bool]:
+        """
+        Отримання сторінки замовлень за номером (LIMIT/OFFSET) для списків з кнопками ◀️/▶️
+
+        Args:
+            filters: List[Tuple[str, str, Any]] - фільтри, як у get_order_views()
+            limit: int - розмір сторінки
+            offset: int - кількість пропущених замовлень
+
+        Return:
+            Tuple[List[OrderViewRecord], bool] - замовлення сторінки та ознака наявності наступної сторінки
+        """
+        try:
+            where, params = self._build_view_filters(filters)
+            # Беремо на один запис більше, щоб дізнатися про наступну сторінку без COUNT(*)
+            params.extend((limit + 1, offset))
+
+            async with db_pool.reader() as db:
+                async with db.execute(f"{ORDER_VIEW_QUERY} {where} ORDER BY o.ID_order LIMIT ? OFFSET ?", params) as cursor:
+                    rows = await cursor.fetchall()
+
+            return rows[:limit], len(rows) > limit
+
+        except aiosqlite.Error as e:
+            logger.exception(f"Помилка отримання данних з бд (get_order_views_slice()): ")
+            raise
+        except ValueError as e:
+            logger.exception(f"Помилка валідації: ")
+            raise
+
+    async def iter_order_views(self, filters: List[Tuple[str, str, Any]],
+                               page_size: int = None) -> AsyncIterator[OrderViewRecord]:
+        """
+        Ліниве отримання замовлень сторінками через get_order_views_page()
+
+        З'єднання повертається в пул після кожної сторінки, тому між записами
+        можна надсилати повідомлення без блокування читачів.
+        """
+        after = None
+        while True:
+            orders, after = await self.get_order_views_page(filters, page_size, after)
+            for order in orders:
+                yield order
+            if after is None:
+                break
+
+    async def get_order_view(self, order_id: str) -> Optional[OrderViewRecord]:
+        """
+        Отримання одного замовлення разом з платежем та даними замовника
+
+        Args:
+            order_id: str - ID замовлення (наприклад "000123")
+
+        Return:
+            Optional[OrderViewRecord] - див. get_order_views(), або None якщо не знайдено
+        """
+        views = await self.get_order_views([('order_request', 'ID_order', order_id)])
+        return views[0] if views else None
+
     async def get_worker_statistics(self, worker_id: int) -> Dict:
         """
         Отримує статистику для конкретного працівника.
+
+        Дані читаються з лічильників worker_stats / worker_subject_stats,
+        які підтримуються тригерами при зміні order_request.
         
         Args:
             worker_id (int): ID працівника
@@ -170,45 +330,53 @@ class DatabaseService:
                 - top_subjects: список кортежів (предмет, кількість замовлень)
         """
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
-                
-                # Отримуємо кількість виконаних замовлень
-                async with db.execute("""
-                    SELECT COUNT(*) as count 
-                    FROM order_request 
-                    WHERE ID_worker = ? AND status = ?
-                """, (worker_id, OrderStatus.COMPLETED.value)) as cursor:
-                    completed = await cursor.fetchone()
-                    total_completed = completed['count']
-
-                # Отримуємо кількість активних замовлень
+            async with db_pool.reader() as db:
                 async with db.execute("""
-                    SELECT COUNT(*) as count 
-                    FROM order_request
-                    WHERE ID_worker = ? AND status = ?
-                """, (worker_id, OrderStatus.IN_PROGRESS.value)) as cursor:
-                    active = await cursor.fetchone()
-                    active_orders = active['count']
-
-                # Отримуємо топ предметів
-                async with db.execute("""
-                    SELECT subject, COUNT(*) as count 
-                    FROM order_request
-                    WHERE ID_worker = ? AND status = ?
-                    GROUP BY subject 
-                    ORDER BY count DESC 
+                    SELECT
+                        s.completed AS total_completed,
+                        s.active AS active_orders,
+                        ss.subject,
+                        ss.completed AS count
+                    FROM worker_stats s
+                    LEFT JOIN worker_subject_stats ss
+                        ON ss.ID_worker = s.ID_worker AND ss.completed > 0
+                    WHERE s.ID_worker = ?
+                    ORDER BY ss.completed DESC
                     LIMIT 5
-                """, (worker_id, OrderStatus.COMPLETED.value)) as cursor:
-                    subjects = await cursor.fetchall()
-                    top_subjects = [(row['subject'], row['count']) for row in subjects]
+                """, (worker_id,)) as cursor:
+                    rows = await cursor.fetchall()
 
+            if not rows:
                 return {
-                    'total_completed': total_completed,
-                    'active_orders': active_orders,
-                    'top_subjects': top_subjects
+                    'total_completed': 0,
+                    'active_orders': 0,
+                    'top_subjects': []
                 }
+
+            return {
+                'total_completed': rows[0]['total_completed'],
+                'active_orders': rows[0]['active_orders'],
+                'top_subjects': [(row['subject'], row['count']) for row in rows if row['subject'] is not None]
+            }
                 
         except Exception as e:
             logger.exception(f"Помилка при отриманні статистики для працівника {worker_id}: ")
-            raise
\ No newline at end of file
+            raise
+
+    async def rebuild_worker_stats(self) -> None:
+        """Повний перерахунок статистики воркерів з order_request (backfill)."""
+        async def rebuild(db: aiosqlite.Connection) -> None:
+            for statement in WORKER_STATS_REBUILD:
+                await db.execute(statement)
+
+        try:
+            await write_queue.submit(rebuild)
+            logger.info("Статистику воркерів перераховано")
+        except aiosqlite.Error as e:
+            logger.exception(f"Помилка перерахунку статистики воркерів: ")
+            raise
+
+# Зміни користувачів, зроблені іншими процесами бота
+shared_state.on_invalidate(
+    'user', lambda payload: DatabaseService.invalidate_user(payload.get('user_id'), payload.get('user_link'))
+)
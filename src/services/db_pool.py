@@ -0,0 +1,176 @@
+import asyncio
+import time
+import aiosqlite
+
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, List, Optional
+
+from model.records import record_factory
+from utils.logging import get_logger
+
+from config import Config
+
+logger = get_logger("services/db_pool")
+
+# PRAGMA-и, що застосовуються до кожного з'єднання пулу
+CONNECTION_PRAGMAS = (
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",
+)
+
+class QueryTimer:
+    """
+    Сумарний час операцій (БД, запити до Bot API) в межах одного оновлення.
+
+    Якщо таймер створено всередині іншого (parent), час додається до обох,
+    тому кілька незалежних middleware можуть рахувати час одного оновлення.
+    """
+    __slots__ = ("total", "count", "parent")
+
+    def __init__(self, parent: Optional["QueryTimer"] = None):
+        self.total = 0.0
+        self.count = 0
+        self.parent = parent
+
+    def add(self, seconds: float) -> None:
+        self.total += seconds
+        self.count += 1
+        if self.parent is not None:
+            self.parent.add(seconds)
+
+# Таймер поточного оновлення; встановлюється middleware-ом, None - час не рахується
+db_timer: ContextVar[Optional[QueryTimer]] = ContextVar("db_timer", default=None)
+
+def record_db_time(started_at: float) -> None:
+    """Додає час з started_at (time.perf_counter()) до таймера поточного оновлення."""
+    timer = db_timer.get()
+    if timer is not None:
+        timer.add(time.perf_counter() - started_at)
+
+class DBPool:
+    """
+    Пул довготривалих з'єднань aiosqlite.
+
+    Тримає одне з'єднання для запису (доступ серіалізується через lock)
+    та декілька "теплих" з'єднань для читання. Відкривається в BotRunner.init_services
+    та закривається при завершенні роботи бота.
+    """
+
+    def __init__(self):
+        self.db_path: Optional[str] = None
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._writer_lock = asyncio.Lock()
+        self._readers: List[aiosqlite.Connection] = []
+        self._idle_readers: Optional[asyncio.Queue] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._writer is not None
+
+    async def _connect(self, read_only: bool) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(self.db_path)
+        db.row_factory = record_factory # Рядки як Record: record['status'], record.status, record[0]
+        try:
+            pragmas = CONNECTION_PRAGMAS + (("PRAGMA query_only = ON",) if read_only else ())
+            for pragma in pragmas:
+                async with db.execute(pragma):
+                    pass
+            return db
+        except Exception:
+            await db.close()
+            raise
+
+    async def open(self, db_path: str = None, size: int = None) -> None:
+        """
+        Відкриття з'єднань пулу
+
+        Args:
+            db_path: str - шлях до файлу БД (за замовчуванням Config.DATABASE_PATH)
+            size: int - кількість з'єднань для читання (за замовчуванням Config.DB_POOL_SIZE)
+        """
+        if self.is_open:
+            return
+
+        self.db_path = db_path or Config.DATABASE_PATH
+        size = max(1, size or Config.DB_POOL_SIZE)
+
+        try:
+            # WAL зберігається у файлі БД, тому вмикаємо його один раз через writer,
+            # після чого читачі не блокують запис і навпаки
+            self._writer = await self._connect(read_only=False)
+            async with self._writer.execute("PRAGMA journal_mode = WAL"):
+                pass
+
+            self._idle_readers = asyncio.Queue()
+            for _ in range(size):
+                reader = await self._connect(read_only=True)
+                self._readers.append(reader)
+                self._idle_readers.put_nowait(reader)
+
+            logger.info(f"Пул з'єднань БД відкрито ({size} читачів + 1 writer)")
+        except Exception as e:
+            logger.exception(f"Помилка відкриття пулу з'єднань БД: ")
+            await self.close()
+            raise
+
+    async def close(self) -> None:
+        """Закриття всіх з'єднань пулу."""
+        connections = list(self._readers)
+        if self._writer:
+            connections.append(self._writer)
+
+        self._writer = None
+        self._readers = []
+        self._idle_readers = None
+
+        for db in connections:
+            try:
+                await db.close()
+            except Exception as e:
+                logger.exception(f"Помилка закриття з'єднання БД: ")
+
+        if connections:
+            logger.info("Пул з'єднань БД закрито")
+
+    def _ensure_open(self) -> None:
+        if not self.is_open:
+            raise RuntimeError("Пул з'єднань БД не відкрито. Викличте db_pool.open()")
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Позичає з'єднання для читання і повертає його в пул після використання."""
+        self._ensure_open()
+        started_at = time.perf_counter()
+        queue = self._idle_readers
+        db = await queue.get()
+        try:
+            yield db
+        finally:
+            queue.put_nowait(db)
+            record_db_time(started_at)
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Позичає єдине з'єднання для запису.
+
+        Транзакція комітиться при успішному виході з блоку та відкочується при помилці.
+        """
+        self._ensure_open()
+        started_at = time.perf_counter()
+        try:
+            async with self._writer_lock:
+                db = self._writer
+                try:
+                    yield db
+                    await db.commit()
+                except BaseException:
+                    await db.rollback()
+                    raise
+        finally:
+            record_db_time(started_at)
+
+db_pool = DBPool()
@@ -1,9 +1,26 @@
-from typing import Dict, List
+from aiogram import Bot
+from aiogram.types import InputMediaDocument, InputMediaPhoto, InputMediaVideo, Message
+from typing import Dict, List, Optional, Tuple
 
 from utils.logging import get_logger
 
 logger = get_logger("services/file_service")
 
+# Максимум файлів в одному send_media_group
+MEDIA_GROUP_LIMIT = 10
+
+# Вид пакету для кожного типу файлу: фото та відео можна змішувати в одному альбомі
+MEDIA_GROUP_KINDS = {
+    "photo": "visual",
+    "video": "visual",
+    "document": "document",
+    "voice": "voice",
+}
+
+# Максимальна довжина повідомлення Telegram та роздільник об'єднаних текстів
+TEXT_LIMIT = 4096
+TEXT_SEPARATOR = "\n\n"
+
 class FileService:
     @staticmethod
     def process_file(file_data: Dict) -> Dict:
@@ -35,32 +52,157 @@ class FileService:
             logger.exception(f"Error processing file: ")
             raise
 
+    @staticmethod
+    def file_item(message: Message) -> Optional[Dict]:
+        """
+        Елемент списку files в FSM з повідомлення з фото, документом, відео або голосовим
+
+        Return:
+            Optional[Dict] - {"type", "file_id", "caption"}, None якщо файлу в повідомленні немає
+        """
+        caption = message.caption or ""
+        if message.photo:
+            # Беремо найбільшу версію фото
+            return {"type": "photo", "file_id": message.photo[-1].file_id, "caption": caption}
+        if message.document:
+            return {"type": "document", "file_id": message.document.file_id, "caption": caption}
+        if message.video:
+            return {"type": "video", "file_id": message.video.file_id, "caption": caption}
+        if message.voice:
+            return {"type": "voice", "file_id": message.voice.file_id}
+        return None
+
+    @staticmethod
+    def group_files(files: List[Dict]) -> List[Tuple[str, List[Dict]]]:
+        """
+        Розбиття файлів на пакети для відправки
+
+        Фото та відео йдуть разом (Telegram дозволяє їх змішувати в одному альбомі),
+        документи - окремими альбомами, голосові - поодинці. Пакети не більші за
+        MEDIA_GROUP_LIMIT, порядок файлів всередині виду зберігається.
+
+        Args:
+            files: List[Dict] - файли з FSM ({"type", "file_id", "caption"})
+
+        Return:
+            List[Tuple[str, List[Dict]]] - список (вид пакету, файли пакету)
+        """
+        groups: Dict[str, List[Dict]] = {}
+        for file in files:
+            kind = MEDIA_GROUP_KINDS.get(file["type"])
+            if kind is None:
+                raise ValueError(f"Unsupported file type: {file['type']}")
+            groups.setdefault(kind, []).append(file)
+
+        batches = []
+        for kind, items in groups.items():
+            size = 1 if kind == "voice" else MEDIA_GROUP_LIMIT
+            for i in range(0, len(items), size):
+                batches.append((kind, items[i:i + size]))
+        return batches
+
+    @staticmethod
+    def join_texts(messages: List[Dict]) -> List[str]:
+        """Об'єднання текстових повідомлень в якомога менше повідомлень (до TEXT_LIMIT символів)."""
+        chunks = []
+        current = ""
+        for message in messages:
+            if message.get("type") != "text" or not message.get("content"):
+                continue
+            content = message["content"]
+            if current and len(current) + len(TEXT_SEPARATOR) + len(content) <= TEXT_LIMIT:
+                current += TEXT_SEPARATOR + content
+            else:
+                if current:
+                    chunks.append(current)
+                current = content
+        if current:
+            chunks.append(current)
+        return chunks
+
+    @staticmethod
+    async def send_single(bot: Bot, chat_id: int, file: Dict) -> None:
+        caption = file.get("caption") or None
+        if file["type"] == "photo":
+            await bot.send_photo(chat_id, file["file_id"], caption=caption)
+        elif file["type"] == "document":
+            await bot.send_document(chat_id, file["file_id"], caption=caption)
+        elif file["type"] == "video":
+            await bot.send_video(chat_id, file["file_id"], caption=caption)
+        elif file["type"] == "voice":
+            await bot.send_voice(chat_id, file["file_id"])
+
+    @staticmethod
+    def input_media(file: Dict):
+        caption = file.get("caption") or None
+        if file["type"] == "photo":
+            return InputMediaPhoto(media=file["file_id"], caption=caption)
+        if file["type"] == "video":
+            return InputMediaVideo(media=file["file_id"], caption=caption)
+        return InputMediaDocument(media=file["file_id"], caption=caption)
+
+    @staticmethod
+    async def send_files(bot: Bot, chat_id: int, files: List[Dict],
+                         messages: Optional[List[Dict]] = None) -> List[str]:
+        """
+        Відправка зібраних матеріалів одним набором альбомів
+
+        Текстові повідомлення об'єднуються, фото/відео та документи надсилаються
+        через send_media_group пакетами до 10 файлів (підписи залишаються на своїх файлах),
+        голосові - окремо. Якщо альбом не вдалося надіслати, його файли надсилаються по одному.
+
+        Args:
+            bot: Bot - екземпляр бота
+            chat_id: int - ID отримувача
+            files: List[Dict] - файли з FSM
+            messages: Optional[List[Dict]] - текстові повідомлення з FSM
+
+        Return:
+            List[str] - опис елементів, які не вдалося надіслати ([] якщо все надіслано)
+        """
+        send_errors = []
+
+        for i, text in enumerate(FileService.join_texts(messages or [])):
+            try:
+                await bot.send_message(chat_id, text)
+            except Exception as e:
+                logger.exception(f"Помилка при надсиланні текстового повідомлення #{i+1}: ")
+                send_errors.append(f"текстове повідомлення #{i+1}")
+
+        for kind, batch in FileService.group_files(files):
+            if len(batch) > 1:
+                try:
+                    await bot.send_media_group(chat_id, [FileService.input_media(file) for file in batch])
+                    continue
+                except Exception as e:
+                    logger.exception(f"Помилка при надсиланні альбому ({kind}, {len(batch)} файлів), надсилаємо по одному: ")
+
+            for file in batch:
+                try:
+                    await FileService.send_single(bot, chat_id, file)
+                except Exception as e:
+                    logger.exception(f"Помилка при надсиланні файлу типу {file['type']}: ")
+                    send_errors.append(f"файл {file['type']}")
+
+        return send_errors
+
     @staticmethod
     async def send_files_to_client(bot, client_id: int, files: List[Dict], 
                                  order_id: str, keyboard=None) -> None:
         try:
-            first_message = True
-            for file in files:
-                caption = f"📥 Files for order #{order_id}" if first_message else None
-                reply_markup = keyboard.as_markup() if first_message and keyboard else None
-                
-                if file["type"] == "document":
-                    await bot.send_document(client_id, file["file_id"],
-                                         caption=caption, reply_markup=reply_markup)
-                elif file["type"] == "photo":
-                    await bot.send_photo(client_id, file["file_id"],
-                                      caption=caption, reply_markup=reply_markup)
-                elif file["type"] == "video":
-                    await bot.send_video(client_id, file["file_id"],
-                                      caption=caption, reply_markup=reply_markup)
-                elif file["type"] == "text":
-                    text = f"💬 Message:\n{file['content']}\n\n"
-                    if caption:
-                        text += caption
-                    await bot.send_message(client_id, text, reply_markup=reply_markup)
-                    
-                first_message = False
+            # Альбоми не підтримують клавіатуру, тому підпис з кнопками йде окремим повідомленням
+            await bot.send_message(
+                client_id,
+                f"📥 Files for order #{order_id}",
+                reply_markup=keyboard.as_markup() if keyboard else None
+            )
+
+            text_messages = [file for file in files if file["type"] == "text"]
+            media_files = [file for file in files if file["type"] != "text"]
+            send_errors = await FileService.send_files(bot, client_id, media_files, text_messages)
+            if send_errors:
+                raise RuntimeError(f"Not delivered: {', '.join(send_errors)}")
                 
         except Exception as e:
             logger.exception(f"Error sending files to client: ")
-            raise
\ No newline at end of file
+            raise
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import time
+import aiosqlite
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from services.db_pool import db_pool
+from services.write_queue import write_queue
+from utils.logging import get_logger
+
+from config import Config
+
+logger = get_logger("services/fsm_storage")
+
+class _Entry:
+    __slots__ = ("state", "data", "blob", "touched_at")
+
+    def __init__(self, state: Optional[str], data: Dict[str, Any], blob: str, touched_at: float):
+        self.state = state
+        self.data = data
+        self.blob = blob # data, серіалізована в JSON на момент останнього set_data
+        self.touched_at = touched_at
+
+    @property
+    def is_empty(self) -> bool:
+        return self.state is None and not self.data
+
+class SQLiteStorage(BaseStorage):
+    """
+    FSM-сховище aiogram у таблиці fsm_storage файлу Config.DATABASE_PATH.
+
+    Стан та дані тримаються в пам'яті, а зміни скидаються в БД пакетом через
+    write_queue не частіше ніж раз на flush_interval секунд: кілька змін одного ключа
+    за цей час записуються один раз. Стани, що не змінювались довше за ttl секунд,
+    видаляються фоновою задачею (з пам'яті та з БД).
+    Дані мають бути JSON-серіалізовані (рядки, числа, списки, словники).
+    """
+
+    def __init__(self,
+                 flush_interval: float = None,
+                 ttl: float = None,
+                 sweep_interval: float = None,
+                 key_builder: Optional[KeyBuilder] = None):
+        self.flush_interval = Config.FSM_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.ttl = Config.FSM_STATE_TTL if ttl is None else ttl
+        self.sweep_interval = sweep_interval or Config.FSM_SWEEP_INTERVAL
+        self.key_builder = key_builder or DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+
+        self._entries: Dict[str, _Entry] = {}
+        self._dirty: Set[str] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._sweep_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Запуск фонового очищення застарілих станів (після відкриття db_pool)."""
+        if self.ttl > 0 and (self._sweep_task is None or self._sweep_task.done()):
+            self._sweep_task = asyncio.create_task(self._sweep_loop(), name="fsm-storage-sweep")
+
+    async def _load(self, key: StorageKey) -> Tuple[str, _Entry]:
+        storage_key = self.key_builder.build(key)
+        entry = self._entries.get(storage_key)
+        if entry is not None:
+            return storage_key, entry
+
+        async with db_pool.reader() as db:
+            async with db.execute(
+                "SELECT state, data, updated_at FROM fsm_storage WHERE key = ?", (storage_key,)
+            ) as cursor:
+                row = await cursor.fetchone()
+
+        if row:
+            loaded = _Entry(row['state'], json.loads(row['data']), row['data'], row['updated_at'])
+        else:
+            loaded = _Entry(None, {}, "{}", time.time())
+
+        # Поки читали з БД, ключ міг завантажити або змінити інший обробник
+        return storage_key, self._entries.setdefault(storage_key, loaded)
+
+    def _mark_dirty(self, storage_key: str, entry: _Entry) -> None:
+        entry.touched_at = time.time()
+        self._dirty.add(storage_key)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later(), name="fsm-storage-flush")
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        storage_key, entry = await self._load(key)
+        entry.state = state.state if isinstance(state, State) else state
+        self._mark_dirty(storage_key, entry)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        _, entry = await self._load(key)
+        return entry.state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        # Серіалізуємо одразу, щоб помилка з'явилась в обробнику, а не під час запису
+        blob = json.dumps(data, ensure_ascii=False)
+        storage_key, entry = await self._load(key)
+        entry.data = data.copy()
+        entry.blob = blob
+        self._mark_dirty(storage_key, entry)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, entry = await self._load(key)
+        return entry.data.copy()
+
+    async def _flush_later(self) -> None:
+        if self.flush_interval > 0:
+            await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Запис змінених станів у БД одним пакетом
+
+        Return:
+            int - кількість записаних ключів
+        """
+        if not self._dirty:
+            return 0
+
+        keys, self._dirty = self._dirty, set()
+        upserts: List[Tuple[str, Optional[str], str, float]] = []
+        deletes: List[Tuple[str]] = []
+        for storage_key in keys:
+            entry = self._entries.get(storage_key)
+            if entry is None or entry.is_empty:
+                deletes.append((storage_key,))
+            else:
+                upserts.append((storage_key, entry.state, entry.blob, entry.touched_at))
+
+        async def write(db: aiosqlite.Connection) -> None:
+            if upserts:
+                await db.executemany("""
+                    INSERT INTO fsm_storage (key, state, data, updated_at) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET
+                        state = excluded.state, data = excluded.data, updated_at = excluded.updated_at
+                """, upserts)
+            if deletes:
+                await db.executemany("DELETE FROM fsm_storage WHERE key = ?", deletes)
+
+        try:
+            await write_queue.submit(write)
+        except BaseException as e:
+            logger.exception(f"Помилка запису FSM-станів ({len(keys)} ключів): ")
+            # Повторимо з наступним записом (або при close())
+            self._dirty |= keys
+            raise
+
+        # Завершені сесії (state.clear()) не тримаємо в пам'яті
+        for (storage_key,) in deletes:
+            entry = self._entries.get(storage_key)
+            if entry is not None and entry.is_empty and storage_key not in self._dirty:
+                del self._entries[storage_key]
+
+        logger.debug(f"Записано FSM-станів: {len(upserts)}, видалено: {len(deletes)}")
+        return len(keys)
+
+    async def sweep(self) -> int:
+        """
+        Видалення станів, що не змінювались довше за ttl
+
+        Return:
+            int - кількість записів, видалених з пам'яті
+        """
+        cutoff = time.time() - self.ttl
+        # Порожні записи (користувачі без стану, що лише читали його) теж не тримаємо
+        expired = [
+            storage_key for storage_key, entry in self._entries.items()
+            if storage_key not in self._dirty and (entry.is_empty or entry.touched_at < cutoff)
+        ]
+        for storage_key in expired:
+            del self._entries[storage_key]
+
+        async def delete_expired(db: aiosqlite.Connection) -> None:
+            await db.execute("DELETE FROM fsm_storage WHERE updated_at < ?", (cutoff,))
+
+        await write_queue.submit(delete_expired)
+        if expired:
+            logger.info(f"Видалено застарілих FSM-станів: {len(expired)}")
+        return len(expired)
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Помилка очищення FSM-станів: ")
+            await asyncio.sleep(self.sweep_interval)
+
+    async def close(self) -> None:
+        """Зупинка фонових задач та запис усіх незбережених змін."""
+        for task in (self._sweep_task, self._flush_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._sweep_task = None
+        self._flush_task = None
+
+        if self._dirty and db_pool.is_open:
+            await self.flush()
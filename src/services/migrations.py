@@ -0,0 +1,339 @@
+import aiosqlite
+
+from datetime import datetime
+from typing import Tuple
+
+from services.db_pool import db_pool
+from utils.logging import get_logger
+
+from config import Config
+
+logger = get_logger("services/migrations")
+
+def _worker_stats_delta(row: str, sign: str) -> str:
+    """
+    SQL для додавання (sign='+') або віднімання (sign='-') внеску рядка order_request
+    (NEW або OLD в тригері) у лічильники worker_stats та worker_subject_stats.
+    Статуси: 2 - IN_PROGRESS, 3 - COMPLETED (див. OrderStatus).
+    """
+    return f"""
+        INSERT OR IGNORE INTO worker_stats (ID_worker)
+        SELECT {row}.ID_worker WHERE {row}.ID_worker IS NOT NULL AND {row}.status IN (2, 3);
+        UPDATE worker_stats
+        SET completed = completed {sign} ({row}.status = 3),
+            active = active {sign} ({row}.status = 2)
+        WHERE ID_worker = {row}.ID_worker AND {row}.status IN (2, 3);
+        INSERT OR IGNORE INTO worker_subject_stats (ID_worker, subject)
+        SELECT {row}.ID_worker, {row}.subject WHERE {row}.ID_worker IS NOT NULL AND {row}.status = 3;
+        UPDATE worker_subject_stats
+        SET completed = completed {sign} 1
+        WHERE ID_worker = {row}.ID_worker AND subject = {row}.subject AND {row}.status = 3;
+    """
+
+# Повний перерахунок статистики воркерів з order_request
+WORKER_STATS_REBUILD: Tuple[str, ...] = (
+    "DELETE FROM worker_stats",
+    "DELETE FROM worker_subject_stats",
+    """
+    INSERT INTO worker_stats (ID_worker, completed, active)
+    SELECT ID_worker, SUM(status = 3), SUM(status = 2)
+    FROM order_request
+    WHERE ID_worker IS NOT NULL AND status IN (2, 3)
+    GROUP BY ID_worker
+    """,
+    """
+    INSERT INTO worker_subject_stats (ID_worker, subject, completed)
+    SELECT ID_worker, subject, COUNT(*)
+    FROM order_request
+    WHERE ID_worker IS NOT NULL AND status = 3
+    GROUP BY ID_worker, subject
+    """,
+)
+
+# На скільки секунд розподіляються нагадування, створені міграцією для вже існуючих
+# замовлень, щоб після оновлення вони не надсилалися всім клієнтам одночасно
+BACKFILL_SPREAD = 3600
+
+# Кожна міграція: (версія, опис, SQL-інструкції). Порядок версій не змінювати,
+# нові міграції додаються тільки в кінець списку.
+MIGRATIONS: Tuple[Tuple[int, str, Tuple[str, ...]], ...] = (
+    (1, "base tables", (
+        """
+        CREATE TABLE IF NOT EXISTS user_data (
+            ID INTEGER PRIMARY KEY,
+            user_name TEXT NOT NULL,
+            user_link TEXT,
+            real_full_name TEXT NOT NULL,
+            for_father TEXT NOT NULL,
+            education TEXT NOT NULL,
+            course TEXT NOT NULL,
+            edu_group TEXT NOT NULL,
+            phone_number TEXT NOT NULL,
+            language_code TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS order_request (
+            ID_order TEXT PRIMARY KEY,
+            ID_user INTEGER NOT NULL,
+            ID_worker INTEGER,
+            subject TEXT NOT NULL,
+            type_work TEXT NOT NULL,
+            order_details TEXT NOT NULL,
+            status INTEGER NOT NULL,
+            created_at TEXT NOT NULL,
+            taken_at TEXT,
+            completed_at TEXT,
+            updated_at TEXT,
+            FOREIGN KEY (ID_user) REFERENCES user_data(ID)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS payments (
+            id_operation INTEGER PRIMARY KEY AUTOINCREMENT,
+            ID_order TEXT,
+            client_id TEXT,
+            status INT,
+            price REAL,
+            paid REAL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            paid_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    )),
+    (2, "indexes for order and payment lookups", (
+        # get_all_by_field('order_request', 'status', ...) + сортування за датою
+        "CREATE INDEX IF NOT EXISTS idx_order_request_status ON order_request (status, created_at)",
+        # get_worker_orders та статистика воркера (ID_worker + status, предмет для GROUP BY)
+        "CREATE INDEX IF NOT EXISTS idx_order_request_worker ON order_request (ID_worker, status, subject)",
+        # /status -user
+        "CREATE INDEX IF NOT EXISTS idx_order_request_user ON order_request (ID_user)",
+        # get_unpaid_orders (client_id + status)
+        "CREATE INDEX IF NOT EXISTS idx_payments_client_status ON payments (client_id, status)",
+        # /status -pay_status
+        "CREATE INDEX IF NOT EXISTS idx_payments_status ON payments (status)",
+        # Один платіж на замовлення, пошук payments WHERE ID_order = ?
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_payments_order ON payments (ID_order)",
+        # /search -link та /send_message -link
+        "CREATE INDEX IF NOT EXISTS idx_user_data_link ON user_data (user_link)",
+    )),
+    (3, "order id sequence", (
+        """
+        CREATE TABLE IF NOT EXISTS sequences (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+        """,
+        # Продовжуємо нумерацію з існуючих замовлень
+        """
+        INSERT OR IGNORE INTO sequences (name, value)
+        SELECT 'order_request', COALESCE(MAX(CAST(ID_order AS INTEGER)), 0) FROM order_request
+        """,
+    )),
+    (4, "materialized worker statistics", (
+        """
+        CREATE TABLE IF NOT EXISTS worker_stats (
+            ID_worker INTEGER PRIMARY KEY,
+            completed INTEGER NOT NULL DEFAULT 0,
+            active INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS worker_subject_stats (
+            ID_worker INTEGER NOT NULL,
+            subject TEXT NOT NULL,
+            completed INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (ID_worker, subject)
+        )
+        """,
+        # Лічильники оновлюються тригерами в тій самій транзакції, що й order_request
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_worker_stats_insert
+        AFTER INSERT ON order_request
+        BEGIN
+            {_worker_stats_delta("NEW", "+")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_worker_stats_update
+        AFTER UPDATE OF status, ID_worker, subject ON order_request
+        WHEN OLD.status IS NOT NEW.status
+            OR OLD.ID_worker IS NOT NEW.ID_worker
+            OR OLD.subject IS NOT NEW.subject
+        BEGIN
+            {_worker_stats_delta("OLD", "-")}
+            {_worker_stats_delta("NEW", "+")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_worker_stats_delete
+        AFTER DELETE ON order_request
+        BEGIN
+            {_worker_stats_delta("OLD", "-")}
+        END
+        """,
+    ) + WORKER_STATS_REBUILD),
+    (5, "persistent fsm storage", (
+        """
+        CREATE TABLE IF NOT EXISTS fsm_storage (
+            key TEXT PRIMARY KEY,
+            state TEXT,
+            data TEXT NOT NULL DEFAULT '{}',
+            updated_at REAL NOT NULL
+        )
+        """,
+        # Очищення застарілих станів (SQLiteStorage.sweep)
+        "CREATE INDEX IF NOT EXISTS idx_fsm_storage_updated ON fsm_storage (updated_at)",
+    )),
+    (6, "order events audit log", (
+        # Тільки додавання: кожен успішний перехід статусу замовлення або оплати
+        # (OrderService.transition, PaymentService.mark_confirm_pay)
+        """
+        CREATE TABLE IF NOT EXISTS order_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ID_order TEXT NOT NULL,
+            event TEXT NOT NULL,
+            from_status INTEGER,
+            to_status INTEGER,
+            actor_id INTEGER,
+            created_at TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_order_events_order ON order_events (ID_order, id)",
+    )),
+    (7, "notifications outbox", (
+        # Повідомлення записуються в тій самій транзакції, що й зміна стану (Outbox.add),
+        # і надсилаються фоновою задачею. status: 0 - очікує, 1 - надіслано, 2 - не надіслано.
+        # chat_id без типу: числовий ID зберігається числом, @username каналу - рядком
+        """
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            chat_id NOT NULL,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            claimed_until REAL NOT NULL DEFAULT 0,
+            error TEXT,
+            created_at REAL NOT NULL,
+            sent_at REAL
+        )
+        """,
+        # Вибірка готових до відправки та перевірка черговості в межах чату
+        "CREATE INDEX IF NOT EXISTS idx_outbox_pending ON outbox (next_attempt_at) WHERE status = 0",
+        "CREATE INDEX IF NOT EXISTS idx_outbox_chat ON outbox (chat_id, id) WHERE status = 0",
+        # Очищення надісланих
+        "CREATE INDEX IF NOT EXISTS idx_outbox_sent ON outbox (sent_at) WHERE status = 1",
+    )),
+    (8, "scheduled jobs", (
+        # Відкладені задачі планувальника (Scheduler). done_at - час виконання (або скасування
+        # після вичерпаних спроб); NULL - задача очікує. key - об'єкт задачі (ID замовлення)
+        """
+        CREATE TABLE IF NOT EXISTS scheduled_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            payload TEXT NOT NULL DEFAULT '{}',
+            run_at REAL NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            created_at REAL NOT NULL,
+            done_at REAL
+        )
+        """,
+        # Одна очікуюча задача кожного виду на об'єкт: повторне планування переносить її
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_scheduled_jobs_pending ON scheduled_jobs (kind, key) WHERE done_at IS NULL",
+        "CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_run ON scheduled_jobs (run_at) WHERE done_at IS NULL",
+        "CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_done ON scheduled_jobs (done_at) WHERE done_at IS NOT NULL",
+        # Нагадування для вже існуючих неоплачених платежів з ціною та замовлень в роботі:
+        # як для нових (через Config.*_DELAY від міграції), розподілені на BACKFILL_SPREAD секунд
+        f"""
+        INSERT OR IGNORE INTO scheduled_jobs (kind, key, run_at, created_at)
+        SELECT 'payment_reminder', ID_order,
+               strftime('%s', 'now') + {Config.PAYMENT_REMINDER_DELAY} + rowid % {BACKFILL_SPREAD},
+               strftime('%s', 'now')
+        FROM payments
+        WHERE status = 0 AND price IS NOT NULL AND ID_order IS NOT NULL
+        """,
+        f"""
+        INSERT OR IGNORE INTO scheduled_jobs (kind, key, run_at, created_at)
+        SELECT 'stale_order', ID_order,
+               strftime('%s', 'now') + {Config.STALE_ORDER_DELAY} + rowid % {BACKFILL_SPREAD},
+               strftime('%s', 'now')
+        FROM order_request
+        WHERE status = 2
+        """,
+    )),
+)
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+class Migrator:
+    @staticmethod
+    async def _current_version(db: aiosqlite.Connection) -> int:
+        async with db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+        ) as cursor:
+            if not await cursor.fetchone():
+                return 0
+
+        async with db.execute("SELECT MAX(version) FROM schema_version") as cursor:
+            row = await cursor.fetchone()
+            return row[0] or 0
+
+    @staticmethod
+    async def migrate() -> int:
+        """
+        Приведення схеми БД до останньої версії
+
+        Кожна міграція виконується в окремій транзакції разом із записом у schema_version.
+        Якщо схема вже актуальна, жодних DDL-запитів не виконується.
+
+        Return:
+            int - поточна версія схеми після міграції
+        """
+        try:
+            async with db_pool.writer() as db:
+                version = await Migrator._current_version(db)
+                if version >= LATEST_VERSION:
+                    logger.info(f"Схема БД актуальна (версія {version})")
+                    return version
+
+                if version == 0:
+                    await db.execute("""
+                        CREATE TABLE IF NOT EXISTS schema_version (
+                            version INTEGER PRIMARY KEY,
+                            name TEXT NOT NULL,
+                            applied_at TEXT NOT NULL
+                        )
+                    """)
+                    await db.commit()
+
+                for step_version, name, statements in MIGRATIONS:
+                    if step_version <= version:
+                        continue
+
+                    try:
+                        await db.execute("BEGIN")
+                        for statement in statements:
+                            await db.execute(statement)
+                        await db.execute(
+                            "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                            (step_version, name, datetime.now().isoformat())
+                        )
+                        await db.commit()
+                    except aiosqlite.Error as e:
+                        await db.rollback()
+                        logger.exception(f"Помилка міграції {step_version} ({name}): ")
+                        raise
+
+                    version = step_version
+                    logger.info(f"Застосовано міграцію {step_version}: {name}")
+
+                return version
+
+        except aiosqlite.Error as e:
+            logger.exception(f"Database error during migration: ")
+            raise
@@ -0,0 +1,163 @@
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+from typing import Any, Dict, List, Optional, Tuple
+
+from model.order import OrderStatus
+from services.database_service import DatabaseService
+from utils.callbacks import (MenuAction, MenuCallback, OrderAction, OrderCallback,
+                             OrderListCallback, OrderListTakeCallback)
+from utils.dict import work_dict
+from utils.logging import get_logger
+
+from config import Config
+
+logger = get_logger("services/order_list_service")
+
+# Максимальна довжина деталей замовлення в списку (повідомлення обмежене 4096 символами)
+DETAILS_PREVIEW_LENGTH = 200
+
+# Види списків: назва та таблиця/колонка фільтру для аргументу
+ORDER_LISTS: Dict[str, Dict[str, Any]] = {
+    'new': {'title': "📋 Нові замовлення"},
+    'my': {'title': "📋 Мої замовлення"},
+    'ost': {'title': "📋 Замовлення за статусом виконання", 'filter': ('order_request', 'status')},
+    'pst': {'title': "📋 Замовлення за статусом оплати", 'filter': ('payments', 'status')},
+    'usr': {'title': "📋 Замовлення клієнта", 'filter': ('order_request', 'ID_user')},
+}
+
+class OrderListService:
+    """
+    Посторінковий перегляд замовлень в одному повідомленні.
+
+    Кожна сторінка - один запит до БД (LIMIT/OFFSET) та одне повідомлення,
+    яке редагується кнопками ◀️/▶️ замість надсилання повідомлення на кожне замовлення.
+    """
+
+    def __init__(self):
+        self.database_service = DatabaseService()
+        self.page_size = max(1, Config.ORDER_LIST_PAGE_SIZE)
+
+    @staticmethod
+    def parse_page_callback(callback_data: OrderListCallback) -> Tuple[str, int, str]:
+        """
+        Перевірка callback_data переходу на сторінку
+
+        Args:
+            callback_data: OrderListCallback - розібрана callback_data кнопки списку
+
+        Return:
+            Tuple[str, int, str] - вид списку, номер сторінки, аргумент фільтру
+        """
+        if callback_data.kind not in ORDER_LISTS:
+            raise ValueError(f"Невідомий вид списку замовлень: {callback_data.kind}")
+        return callback_data.kind, max(0, callback_data.page), callback_data.arg
+
+    def _filters(self, kind: str, arg: str, user_id: int) -> List[Tuple[str, str, Any]]:
+        if kind == 'new':
+            return [('order_request', 'status', OrderStatus.NEW.value)]
+        if kind == 'my':
+            # Замовлення працівника завжди беремо з user_id, а не з callback_data
+            return [
+                ('order_request', 'ID_worker', user_id),
+                ('order_request', 'status', (OrderStatus.NEW.value, OrderStatus.IN_PROGRESS.value)),
+            ]
+        table, column = ORDER_LISTS[kind]['filter']
+        return [(table, column, arg)]
+
+    @staticmethod
+    def _format_order(kind: str, order: Dict) -> str:
+        details = order['order_details'] or ''
+        if len(details) > DETAILS_PREVIEW_LENGTH:
+            details = details[:DETAILS_PREVIEW_LENGTH] + "…"
+
+        lines = [
+            f"📌 #{order['ID_order']} · "
+            f"{work_dict.subjects.get(order['subject'], order['subject'])} · "
+            f"{work_dict.type_work.get(order['type_work'], order['type_work'])}",
+            f"👤 @{order['user_link'] or 'Без нікнейма'} · 📅 {order['created_at']}",
+        ]
+        if kind != 'new':
+            status_line = f"Статус: {work_dict.status_order.get(order['status'], order['status'])}"
+            if order['id_operation'] is not None:
+                status_line += (
+                    f" · 💰 {order['price']}"
+                    f" · {work_dict.status_payment.get(order['pay_status'], order['pay_status'])}"
+                )
+            lines.append(status_line)
+        lines.append(f"📋 {details}")
+        return "\n".join(lines)
+
+    def _build_keyboard(self, kind: str, page: int, arg: str, orders: List[Dict],
+                        has_next: bool) -> InlineKeyboardMarkup:
+        builder = InlineKeyboardBuilder()
+
+        # Дії над замовленнями сторінки
+        for order in orders:
+            if kind == 'new':
+                builder.row(InlineKeyboardButton(
+                    text=f"✅ Взяти #{order['ID_order']}",
+                    callback_data=OrderListTakeCallback(page=page, order_id=order['ID_order']).pack()
+                ))
+            elif kind == 'my' and order['status'] == OrderStatus.IN_PROGRESS.value:
+                builder.row(InlineKeyboardButton(
+                    text=f"📤 Відправити роботу #{order['ID_order']}",
+                    callback_data=OrderCallback(action=OrderAction.SEND_WORK, order_id=order['ID_order']).pack()
+                ))
+
+        # Навігація
+        navigation = []
+        if page > 0:
+            navigation.append(InlineKeyboardButton(
+                text="◀️", callback_data=OrderListCallback(kind=kind, page=page - 1, arg=arg).pack()
+            ))
+        if page > 0 or has_next:
+            navigation.append(InlineKeyboardButton(
+                text=f"{page + 1}", callback_data=OrderListCallback(kind=kind, page=page, arg=arg).pack()
+            ))
+        if has_next:
+            navigation.append(InlineKeyboardButton(
+                text="▶️", callback_data=OrderListCallback(kind=kind, page=page + 1, arg=arg).pack()
+            ))
+        if navigation:
+            builder.row(*navigation)
+
+        if kind in ('new', 'my'):
+            builder.row(
+                InlineKeyboardButton(text="🔄 Оновити", callback_data=OrderListCallback(kind=kind, page=page, arg=arg).pack()),
+                InlineKeyboardButton(text="🔙 Назад", callback_data=MenuCallback(action=MenuAction.BACK_TO_ADMIN).pack()),
+            )
+
+        return builder.as_markup()
+
+    async def render_page(self, kind: str, page: int = 0, arg: str = "",
+                          user_id: Optional[int] = None) -> Tuple[str, InlineKeyboardMarkup]:
+        """
+        Формування однієї сторінки списку замовлень
+
+        Args:
+            kind: str - вид списку (ключ ORDER_LISTS)
+            page: int - номер сторінки, починаючи з 0
+            arg: str - значення фільтру для списків /status (статус або ID клієнта)
+            user_id: Optional[int] - ID працівника для списку 'my'
+
+        Return:
+            Tuple[str, InlineKeyboardMarkup] - текст повідомлення та клавіатура
+        """
+        filters = self._filters(kind, arg, user_id)
+        orders, has_next = await self.database_service.get_order_views_slice(
+            filters, self.page_size, page * self.page_size
+        )
+
+        # Сторінка могла спорожніти (наприклад, замовлення взяли) - повертаємось на попередню
+        if not orders and page > 0:
+            return await self.render_page(kind, page - 1, arg, user_id)
+
+        title = ORDER_LISTS[kind]['title']
+        if not orders:
+            text = f"{title}\n\nЗамовлень не знайдено."
+        else:
+            body = "\n\n".join(self._format_order(kind, order) for order in orders)
+            text = f"{title} (сторінка {page + 1})\n\n{body}"
+
+        logger.debug(f"Сторінка {page} списку {kind}: {len(orders)} замовлень")
+        return text, self._build_keyboard(kind, page, arg, orders, has_next)
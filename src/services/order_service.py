@@ -1,146 +1,237 @@
 import aiosqlite
 from datetime import datetime
 
-from aiogram import Bot
+from aiogram.types import InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from typing import Optional, Dict, Any
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
 
 from model.order import OrderStatus
+from model.records import OrderRecord
+from services.db_pool import db_pool
+from services.outbox import outbox
+from services.reminder_service import ReminderService
+from services.write_queue import write_queue
+from utils.callbacks import MenuAction, MenuCallback, OrderAction, OrderCallback
 from utils.dict import work_dict
 from utils.logging import get_logger
+from utils.validators import _validate_table_column
 
 from config import Config
 
 logger = get_logger("services/order_service")
 
+# Назва лічильника в таблиці sequences для ID замовлень
+ORDER_SEQUENCE = "order_request"
+
+# Дія в тій самій задачі write_queue після успішного переходу (наприклад запис сповіщень в outbox)
+TransitionHook = Callable[[aiosqlite.Connection, OrderRecord], Awaitable[None]]
+
 class OrderService:
     
     def __init__(self):
         self.db_path = Config.DATABASE_PATH
 
-    async def _get_db_connection(self):
-        try:
-            db = await aiosqlite.connect(self.db_path)
-            db.row_factory = aiosqlite.Row
-            return db
-        except Exception as e:
-            logger.exception(f"Error creating database connection: ")
-            raise
+    @staticmethod
+    async def _next_order_id(db: aiosqlite.Connection) -> str:
+        """
+        Allocates the next order ID from the sequences table.
+
+        Must be called inside the writer transaction that inserts the order,
+        so a rolled back insert also releases the allocated number.
+        """
+        await db.execute(
+            "UPDATE sequences SET value = value + 1 WHERE name = ?",
+            (ORDER_SEQUENCE,)
+        )
+        async with db.execute("SELECT value FROM sequences WHERE name = ?", (ORDER_SEQUENCE,)) as cursor:
+            row = await cursor.fetchone()
+        return f"{row[0]:06d}"
+
+    async def _insert_order(self, db: aiosqlite.Connection, order_data: Dict[str, Any]) -> str:
+        """Inserts the order with its payment row inside a write_queue job and returns the new ID."""
+        # Generate unique order ID
+        new_id = await self._next_order_id(db)
+        logger.debug(f"new_id --> {new_id}")
+
+        query = """
+            INSERT INTO order_request (
+                ID_order, ID_user, subject, type_work,
+                order_details, status, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """
+        await db.execute(query, (
+            new_id, 
+            order_data["ID_user"],
+            order_data["subject"],
+            order_data["type_work"],
+            order_data["order_details"],
+            1,
+            datetime.now().isoformat()
+        ))
+
+        query = """
+            INSERT INTO payments (
+                ID_order, client_id, status, created_at
+            ) VALUES (?, ?, ?, ?)
+        """
+
+        await db.execute(query, (
+            new_id,
+            order_data["ID_user"],
+            str(0),
+            datetime.now().isoformat()
+        ))
+
+        await self.record_event(db, new_id, 'created', None, OrderStatus.NEW.value, order_data["ID_user"])
+        return new_id
 
     async def create_order(self, order_data: Dict[str, Any]) -> Optional[str]:
         """Creates a new order and returns its ID."""
-        db = None
         try:
-            db = await self._get_db_connection()
-            
-            # Generate unique order ID
-            async with db.execute("SELECT MAX(ID_order) FROM order_request") as cursor:
-                last_id = await cursor.fetchone()
-                new_id = f"{(int(last_id[0] or 0) + 1):06d}"
-                logger.debug(f"new_id --> {new_id}")
-
-            query = """
-                INSERT INTO order_request (
-                    ID_order, ID_user, subject, type_work,
-                    order_details, status, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            """
-            await db.execute(query, (
-                new_id, 
-                order_data["ID_user"],
-                order_data["subject"],
-                order_data["type_work"],
-                order_data["order_details"],
-                1,
-                datetime.now().isoformat()
-            ))
-
-            query = """
-                INSERT INTO payments (
-                    ID_order, client_id, status, created_at
-                ) VALUES (?, ?, ?, ?)
-            """
-
-            await db.execute(query, (
-                new_id,
-                order_data["ID_user"],
-                str(0),
-                datetime.now().isoformat()
-            ))
-
-            await db.commit()
-            return new_id
+            return await write_queue.submit(lambda db: self._insert_order(db, order_data))
         except Exception as e:
             logger.exception(f"Error creating order: ")
             return None
-        finally:
-            if db:
-                await db.close()
 
 
-    async def in_progress_order(self, order_id: str, worker_id: int) -> bool:
-        db = None
-        try:
-            db = await self._get_db_connection()
-            current_time = datetime.now().isoformat()
-            query = """
-                UPDATE order_request
-                SET status = ?, ID_worker = ?, updated_at = ?
-                WHERE ID_order = ?
+    @staticmethod
+    async def record_event(db: aiosqlite.Connection, order_id: str, event: str,
+                           from_status: Optional[int], to_status: Optional[int],
+                           actor_id: Optional[int] = None) -> None:
+        """
+        Запис події в журнал order_events
+
+        Викликається всередині задачі write_queue, що змінює замовлення,
+        тому подія фіксується в тій самій транзакції, що й зміна. from_status та
+        to_status - значення OrderStatus (None, якщо статус замовлення не змінюється).
+        """
+        await db.execute(
             """
+            INSERT INTO order_events (ID_order, event, from_status, to_status, actor_id, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (order_id, event, from_status, to_status, actor_id, datetime.now().isoformat())
+        )
 
-            await db.execute(query, (
-                OrderStatus.IN_PROGRESS.value,
-                worker_id,
-                current_time,
-                order_id
-            ))
-            await db.commit()
-            return True
-        
-        except Exception as e:
-            logger.exception(f"Error update status order {order_id} IN_PROGRESS: ")
-            return False
-        finally:
-            if db:
-                await db.close()
+    async def transition(self, order_id: str, from_status: OrderStatus, to_status: OrderStatus,
+                         event: str, actor_id: Optional[int] = None,
+                         fields: Optional[Dict[str, Any]] = None,
+                         conditions: Optional[Dict[str, Any]] = None,
+                         on_success: Optional[TransitionHook] = None) -> Optional[OrderRecord]:
+        """
+        Атомарна зміна статусу замовлення (compare-and-set) із записом у журнал подій
+
+        Один запит UPDATE ... WHERE ID_order = ? AND status = ?: з кількох одночасних
+        спроб (два адміністратори беруть одне замовлення) виграє рівно одна,
+        решта отримують None без окремого читання та блокувань.
+
+        Args:
+            order_id: str - ID замовлення
+            from_status: OrderStatus - очікуваний поточний статус
+            to_status: OrderStatus - новий статус
+            event: str - назва події для order_events (наприклад 'taken')
+            actor_id: Optional[int] - хто виконав перехід
+            fields: Optional[Dict[str, Any]] - інші колонки order_request, що змінюються разом зі статусом
+            conditions: Optional[Dict[str, Any]] - додаткові умови WHERE (наприклад {'ID_user': user_id})
+            on_success: Optional[TransitionHook] - викликається з замовленням після переходу
+                в тій самій транзакції (сповіщення через outbox.add фіксуються разом зі зміною)
+
+        Return:
+            Optional[OrderRecord] - замовлення після переходу, або None якщо перехід не відбувся
+            (замовлення не знайдено, статус вже інший або не виконано conditions)
+        """
+        fields = dict(fields or {})
+        conditions = conditions or {}
+        for column in (*fields, *conditions):
+            _validate_table_column('order_request', column)
+
+        current_time = datetime.now().isoformat()
+        fields.setdefault('updated_at', current_time)
+
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        where = "".join(f" AND {column} = ?" for column in conditions)
+        query = f"""
+            UPDATE order_request
+            SET status = ?, {assignments}
+            WHERE ID_order = ? AND status = ?{where}
+            RETURNING *
+        """
+        params = (to_status.value, *fields.values(), order_id, from_status.value, *conditions.values())
 
+        async def apply(db: aiosqlite.Connection) -> Optional[OrderRecord]:
+            async with db.execute(query, params) as cursor:
+                order = await cursor.fetchone()
+            if order is not None:
+                await self.record_event(db, order_id, event, from_status.value, to_status.value, actor_id)
+                if on_success is not None:
+                    await on_success(db, order)
+            return order
 
-    async def complete_order(self, order_id: str) -> bool:
-        """Marks an order as completed."""
-        db = None
         try:
-            db = await self._get_db_connection()
-            current_time = datetime.now().isoformat()
-            query = """
-                UPDATE order_request
-                SET status = ?, completed_at = ?, updated_at = ?
-                WHERE ID_order = ?
-            """
-            await db.execute(query, (
-                OrderStatus.COMPLETED.value,
-                current_time,
-                current_time,
-                order_id
-            ))
-            await db.commit()
-            return True
+            order = await write_queue.submit(apply)
         except Exception as e:
-            logger.exception(f"Error update status order {order_id} COMPLETED: ")
-            return False
-        finally:
-            if db:
-                await db.close()
+            logger.exception(f"Помилка переходу замовлення {order_id} {from_status.name} -> {to_status.name}: ")
+            return None
+
+        if order is None:
+            logger.info(f"Перехід замовлення {order_id} {from_status.name} -> {to_status.name} не відбувся")
+        return order
+
+    async def take_order(self, order_id: str, worker_id: int) -> Optional[OrderRecord]:
+        """
+        Взяття нового замовлення в роботу (NEW -> IN_PROGRESS). None - замовлення вже взято або не існує.
+
+        Разом із переходом планується нагадування виконавцю, якщо замовлення довго залишиться в роботі.
+        """
+        return await self.transition(
+            order_id, OrderStatus.NEW, OrderStatus.IN_PROGRESS, 'taken', worker_id,
+            fields={'ID_worker': worker_id, 'taken_at': datetime.now().isoformat()},
+            on_success=lambda db, order: ReminderService.schedule_stale_order(db, order_id)
+        )
+
+    async def complete_order(self, order_id: str, client_id: Optional[int] = None) -> Optional[OrderRecord]:
+        """
+        Підтвердження виконання замовлення (IN_PROGRESS -> COMPLETED)
+
+        Сповіщення виконавцю та замовнику записуються в outbox разом із переходом,
+        нагадування про хід виконання скасовуються.
+
+        Args:
+            client_id: Optional[int] - якщо вказано, перехід дозволено лише замовнику
+        """
+        async def notify(db: aiosqlite.Connection, order: OrderRecord) -> None:
+            keyboard = InlineKeyboardBuilder()
+            keyboard.button(text="📋 Мої активні замовлення", callback_data=MenuCallback(action=MenuAction.MY_ORDERS).pack())
+            keyboard.button(text="🔙 Назад", callback_data=MenuCallback(action=MenuAction.BACK_TO_ADMIN).pack())
+            keyboard.adjust(1)
+
+            await outbox.add(db, order['ID_worker'], "✅ Замовлення виконано!", reply_markup=keyboard.as_markup())
+            await outbox.add(
+                db, order['ID_user'],
+                f"✅ Замовлення #{order_id} позначено як виконане. Дякуємо що обираєте нас!"
+            )
+            await ReminderService.cancel_order(db, order_id)
+
+        return await self.transition(
+            order_id, OrderStatus.IN_PROGRESS, OrderStatus.COMPLETED, 'completed', client_id,
+            fields={'completed_at': datetime.now().isoformat()},
+            conditions={'ID_user': client_id} if client_id is not None else None,
+            on_success=notify
+        )
 
     async def process_new_order(
         self, 
         user_id: int,
         username: str,
         order_data: Dict[str, Any],
-        comment: str,
-        bot: Bot
+        comment: str
     ) -> Optional[str]:
-        """Створення нового замовлення та надсилання повідомлення адміністратору."""
+        """
+        Створення нового замовлення та сповіщення адміністраторів
+
+        Замовлення та повідомлення в канал адміністраторів (через outbox) записуються
+        однією транзакцією: обробник не чекає на Telegram, а сповіщення не губиться.
+        """
         try:
             prepared_order = {
                 "ID_user": user_id,
@@ -151,65 +242,53 @@ class OrderService:
                 "created_at": datetime.now().isoformat()
             }
             logger.debug(f"prepared_order: {prepared_order}")
-            
-            new_id = await self.create_order(prepared_order)
-            if not new_id:
-                return None
-            
+
+            async def create_and_notify(db: aiosqlite.Connection) -> str:
+                new_id = await self._insert_order(db, prepared_order)
+                # Без каналу адміністраторів замовлення все одно створюється
+                if Config.ADMIN_CHANNEL_ID is None:
+                    logger.warning(f"ADMIN_CHANNEL_ID не налаштовано, сповіщення про замовлення {new_id} не надіслано")
+                    return new_id
+                text, markup = self._admin_notification(new_id, username, prepared_order, comment)
+                await outbox.add(db, Config.ADMIN_CHANNEL_ID, text, parse_mode="HTML", reply_markup=markup)
+                return new_id
+
+            new_id = await write_queue.submit(create_and_notify)
             logger.debug(f"nes_id: {new_id}")
 
-            await self._send_admin_notification(
-                bot=bot,
-                order_id=new_id,
-                username=username,
-                order_data=prepared_order,
-                comment=comment
-            )
-            
             return new_id
             
         except Exception as e:
             logger.exception(f"Error processing new order: ")
             return None
             
-    async def _send_admin_notification(
-        self,
-        bot: Bot,
+    @staticmethod
+    def _admin_notification(
         order_id: str,
         username: str,
         order_data: Dict[str, Any],
         comment: str
-    ) -> None:
-        """Send notification about new order to admin channel."""
-        try:
-            builder = InlineKeyboardBuilder()
-            builder.button(
-                text="Взяти замовлення", 
-                callback_data=f"take_order_{order_id}"
-            )
-            
-            admin_message = (
-                f"--- Нове замовлення ---\n"
-                f"<b>Час:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-                f"<b>ID замовлення:</b> {order_id}\n"
-                f"<b>Від:</b> @{username or 'Без нікнейма'}\n"
-                f"<b>Предмет:</b> {work_dict.subjects.get(order_data['subject'], order_data['subject'])}\n"
-                f"<b>Тип роботи:</b> {work_dict.type_work.get(order_data['type_work'], order_data['type_work'])}\n"
-                f"<b>Деталі замовлення:</b> {comment}\n"
-                f"---------------------------"
-            )
-            
-            await bot.send_message(
-                Config.ADMIN_CHANNEL_ID,
-                admin_message,
-                parse_mode="HTML",
-                reply_markup=builder.as_markup()
-            )
-            
-        except Exception as e:
-            logger.exception(f"Error sending admin notification: ")
-            raise
+    ) -> Tuple[str, InlineKeyboardMarkup]:
+        """Builds the new order notification for the admin channel."""
+        builder = InlineKeyboardBuilder()
+        builder.button(
+            text="Взяти замовлення", 
+            callback_data=OrderCallback(action=OrderAction.TAKE, order_id=order_id).pack()
+        )
+        
+        admin_message = (
+            f"--- Нове замовлення ---\n"
+            f"<b>Час:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+            f"<b>ID замовлення:</b> {order_id}\n"
+            f"<b>Від:</b> @{username or 'Без нікнейма'}\n"
+            f"<b>Предмет:</b> {work_dict.subjects.get(order_data['subject'], order_data['subject'])}\n"
+            f"<b>Тип роботи:</b> {work_dict.type_work.get(order_data['type_work'], order_data['type_work'])}\n"
+            f"<b>Деталі замовлення:</b> {comment}\n"
+            f"---------------------------"
+        )
+        return admin_message, builder.as_markup()
 
+    @staticmethod
     async def get_worker_orders(worker_id: int) -> list:
         """
             Отримує всі замовлення працівника з бази даних.
@@ -221,8 +300,7 @@ class OrderService:
                 list: Список замовлень
         """
         try:
-            async with aiosqlite.connect(Config.DATABASE_PATH) as db:
-                db.row_factory = aiosqlite.Row
+            async with db_pool.reader() as db:
                 async with db.execute("""
                     SELECT 
                         o.ID_order,
@@ -248,7 +326,7 @@ class OrderService:
                       OrderStatus.NEW.value,
                       OrderStatus.IN_PROGRESS.value,
                       OrderStatus.NEW.value)) as cursor:
-                    return [dict(row) for row in await cursor.fetchall()]
+                    return await cursor.fetchall()
         except Exception as e:
             logger.exception(f"Помилка отримання замовлень воркера: ")
             return []
@@ -0,0 +1,316 @@
+import asyncio
+import json
+import time
+import aiosqlite
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramNotFound, TelegramRetryAfter
+from aiogram.types import InlineKeyboardMarkup
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from model.records import Record
+from services.file_service import FileService
+from services.write_queue import write_queue
+from utils.logging import get_logger
+
+from config import Config
+
+logger = get_logger("services/outbox")
+
+# Статуси записів outbox
+PENDING = 0
+SENT = 1
+FAILED = 2
+
+# Помилки, після яких повторна спроба не допоможе (бот заблоковано, чат не існує, неправильний запит)
+PERMANENT_ERRORS = (TelegramForbiddenError, TelegramBadRequest, TelegramNotFound)
+
+# Як часто видаляти старі надіслані записи (секунди)
+PRUNE_INTERVAL = 3600
+
+# Резервування готових записів. Запис чату береться лише якщо всі попередні записи цього
+# чату теж можна взяти: повідомлення в чат ідуть в порядку запису навіть після помилки.
+CLAIM_QUERY = """
+    UPDATE outbox SET claimed_until = :lease
+    WHERE id IN (
+        SELECT o.id FROM outbox o
+        WHERE o.status = 0 AND o.next_attempt_at <= :now AND o.claimed_until <= :now
+          AND NOT EXISTS (
+              SELECT 1 FROM outbox p
+              WHERE p.chat_id = o.chat_id AND p.status = 0 AND p.id < o.id
+                AND (p.next_attempt_at > :now OR p.claimed_until > :now)
+          )
+        ORDER BY o.id
+        LIMIT :limit
+    )
+    RETURNING id, chat_id, kind, payload, attempts
+"""
+
+class Outbox:
+    """
+    Transactional outbox для сповіщень у Telegram.
+
+    Сервіси записують повідомлення через add() всередині задачі write_queue, що змінює
+    стан замовлення, тому сповіщення фіксується разом зі зміною або не фіксується зовсім.
+    Фонова задача (start) забирає готові записи, надсилає їх (чати паралельно, в межах
+    чату - по черзі) та повторює тимчасові помилки з експоненційною паузою. Записи
+    резервуються на Config.OUTBOX_LEASE секунд, тому кілька процесів бота не надсилають
+    одне повідомлення двічі, а записи зупиненого процесу підхоплюються після перезапуску.
+    Доставка - щонайменше один раз: якщо процес впав після відправки, але до позначки
+    в БД, повідомлення буде надіслано повторно.
+    """
+
+    def __init__(self, batch: int = None, poll_interval: float = None):
+        self.batch = batch or Config.OUTBOX_BATCH
+        self.poll_interval = poll_interval or Config.OUTBOX_POLL_INTERVAL
+        self._bot: Optional[Bot] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._running = False
+        self._pruned_at = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def add(self,
+                  db: aiosqlite.Connection,
+                  chat_id: Union[int, str],
+                  text: Optional[str] = None,
+                  *,
+                  parse_mode: Optional[str] = None,
+                  reply_markup: Optional[InlineKeyboardMarkup] = None,
+                  files: Optional[List[Dict]] = None,
+                  messages: Optional[List[Dict]] = None) -> Optional[int]:
+        """
+        Запис повідомлення в outbox
+
+        Викликається всередині задачі write_queue: запис з'являється в БД лише після
+        commit тієї ж транзакції. Якщо передано files або messages, матеріали розбиваються
+        як у FileService.send_files (об'єднані тексти, альбоми до 10 файлів, голосові окремо)
+        і кожна частина стає окремим записом: помилка однієї частини повторює лише її,
+        без дублювання вже надісланих.
+
+        Args:
+            db: aiosqlite.Connection - з'єднання задачі write_queue
+            chat_id: Union[int, str] - ID отримувача або @username каналу
+            text: Optional[str] - текст повідомлення
+            parse_mode: Optional[str] - режим розмітки (за замовчуванням - налаштування бота)
+            reply_markup: Optional[InlineKeyboardMarkup] - клавіатура повідомлення
+            files: Optional[List[Dict]] - файли з FSM
+            messages: Optional[List[Dict]] - текстові повідомлення з FSM
+
+        Return:
+            Optional[int] - ID останнього запису outbox (None - матеріалів для відправки немає)
+        """
+        if files is not None or messages is not None:
+            entries = [('message', {'text': chunk}) for chunk in FileService.join_texts(messages or [])]
+            entries += [('media', {'files': batch}) for _, batch in FileService.group_files(files or [])]
+        else:
+            payload: Dict[str, Any] = {'text': text}
+            if parse_mode:
+                payload['parse_mode'] = parse_mode
+            if reply_markup is not None:
+                payload['reply_markup'] = reply_markup.model_dump(mode='json', exclude_none=True)
+            entries = [('message', payload)]
+
+        now = time.time()
+        outbox_id = None
+        for kind, payload in entries:
+            cursor = await db.execute(
+                """
+                INSERT INTO outbox (chat_id, kind, payload, next_attempt_at, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (chat_id, kind, json.dumps(payload, ensure_ascii=False), now, now)
+            )
+            outbox_id = cursor.lastrowid
+
+        # Резервування йде через write_queue після цієї транзакції, тому будити можна одразу
+        self.wake()
+        return outbox_id
+
+    async def enqueue(self, *notifications: Dict[str, Any]) -> None:
+        """
+        Запис кількох повідомлень однією транзакцією (коли стан замовлення не змінюється)
+
+        Args:
+            notifications: Dict[str, Any] - аргументи add() для кожного повідомлення (chat_id, text, ...)
+        """
+        async def insert(db: aiosqlite.Connection) -> None:
+            for notification in notifications:
+                await self.add(db, **notification)
+
+        await write_queue.submit(insert)
+
+    def wake(self) -> None:
+        """Перевірити outbox без очікування poll_interval."""
+        self._wakeup.set()
+
+    async def start(self, bot: Bot) -> None:
+        """Запуск фонової відправки (після write_queue.start)."""
+        self._bot = bot
+        if self.is_running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run(), name="outbox-relay")
+        logger.info("Відправка outbox запущена")
+
+    async def stop(self, timeout: float = None) -> None:
+        """Зупинка фонової відправки: готові записи надсилаються до кінця (не довше timeout)."""
+        if self._task is None:
+            return
+        self._running = False
+        self.wake()
+        try:
+            await asyncio.wait_for(self._task, timeout or Config.SHUTDOWN_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("Відправку outbox перервано, решта повідомлень буде надіслана після перезапуску")
+        except Exception as e:
+            logger.exception(f"Помилка зупинки відправки outbox: ")
+        self._task = None
+        logger.info("Відправка outbox зупинена")
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            claimed = 0
+            try:
+                claimed = await self.relay_once()
+                if time.monotonic() - self._pruned_at >= PRUNE_INTERVAL:
+                    self._pruned_at = time.monotonic()
+                    await self.prune()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Помилка відправки outbox: ")
+
+            # При зупинці надсилаємо все, що вже готове до відправки
+            if not self._running and not claimed:
+                break
+            # Повний пакет - можливо, готові ще записи
+            if claimed >= self.batch or not self._running:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def relay_once(self) -> int:
+        """
+        Резервування та відправка одного пакету готових записів
+
+        Return:
+            int - кількість зарезервованих записів
+        """
+        now = time.time()
+        params = {'now': now, 'lease': now + Config.OUTBOX_LEASE, 'limit': self.batch}
+
+        async def claim(db: aiosqlite.Connection) -> List[Record]:
+            async with db.execute(CLAIM_QUERY, params) as cursor:
+                return await cursor.fetchall()
+
+        rows = await write_queue.submit(claim)
+        if not rows:
+            return 0
+
+        chats: Dict[Union[int, str], List[Record]] = {}
+        for row in sorted(rows, key=lambda row: row['id']):
+            chats.setdefault(row['chat_id'], []).append(row)
+
+        await asyncio.gather(*(self._relay_chat(chat_rows) for chat_rows in chats.values()))
+        return len(rows)
+
+    async def _relay_chat(self, rows: List[Record]) -> None:
+        """Відправка записів одного чату по черзі; після тимчасової помилки решта чекає повтору."""
+        sent: List[int] = []
+        failed: List[Tuple[int, str, int]] = []
+        retry: Optional[Tuple[int, float, str, int]] = None
+        released: List[int] = []
+
+        for index, row in enumerate(rows):
+            try:
+                await self._deliver(row)
+                sent.append(row['id'])
+                continue
+            except PERMANENT_ERRORS as e:
+                logger.warning(f"Повідомлення outbox {row['id']} в чат {row['chat_id']} не надіслано: {e}")
+                failed.append((row['attempts'] + 1, str(e), row['id']))
+                continue
+            except TelegramRetryAfter as e:
+                # Ліміт Telegram - не помилка повідомлення, спроба не рахується
+                error, attempts, delay = e, row['attempts'], e.retry_after
+            except Exception as e:
+                error, attempts = e, row['attempts'] + 1
+                delay = min(Config.OUTBOX_RETRY_MAX, Config.OUTBOX_RETRY_BASE * 2 ** (attempts - 1))
+
+            if attempts >= Config.OUTBOX_MAX_ATTEMPTS:
+                logger.error(f"Повідомлення outbox {row['id']} в чат {row['chat_id']} не надіслано після {attempts} спроб: {error}")
+                failed.append((attempts, str(error), row['id']))
+                continue
+
+            logger.warning(f"Повідомлення outbox {row['id']} в чат {row['chat_id']}: повтор через {delay:.0f} с (спроба {attempts}): {error}")
+            retry = (attempts, time.time() + delay, str(error), row['id'])
+            released = [rest['id'] for rest in rows[index + 1:]]
+            break
+
+        async def mark(db: aiosqlite.Connection) -> None:
+            if sent:
+                await db.executemany(
+                    f"UPDATE outbox SET status = {SENT}, sent_at = ?, attempts = attempts + 1, error = NULL WHERE id = ?",
+                    [(time.time(), outbox_id) for outbox_id in sent]
+                )
+            if failed:
+                await db.executemany(
+                    f"UPDATE outbox SET status = {FAILED}, attempts = ?, error = ? WHERE id = ?",
+                    failed
+                )
+            if retry:
+                await db.execute(
+                    "UPDATE outbox SET attempts = ?, next_attempt_at = ?, claimed_until = 0, error = ? WHERE id = ?",
+                    retry
+                )
+            if released:
+                await db.executemany(
+                    "UPDATE outbox SET claimed_until = 0 WHERE id = ?",
+                    [(outbox_id,) for outbox_id in released]
+                )
+
+        await write_queue.submit(mark)
+
+    async def _deliver(self, row: Record) -> None:
+        payload = json.loads(row['payload'])
+        chat_id = row['chat_id']
+
+        if row['kind'] == 'media':
+            # Помилки не перехоплюються: тимчасові повторюють запис, постійні позначають його FAILED
+            files = payload['files']
+            if len(files) == 1:
+                await FileService.send_single(self._bot, chat_id, files[0])
+            else:
+                await self._bot.send_media_group(chat_id, [FileService.input_media(file) for file in files])
+            return
+
+        kwargs: Dict[str, Any] = {}
+        if 'parse_mode' in payload:
+            kwargs['parse_mode'] = payload['parse_mode']
+        if 'reply_markup' in payload:
+            kwargs['reply_markup'] = InlineKeyboardMarkup.model_validate(payload['reply_markup'])
+        await self._bot.send_message(chat_id, payload['text'], **kwargs)
+
+    async def prune(self) -> int:
+        """
+        Видалення надісланих записів, старших за Config.OUTBOX_RETENTION
+
+        Return:
+            int - кількість видалених записів
+        """
+        cutoff = time.time() - Config.OUTBOX_RETENTION
+        cursor = await write_queue.submit(
+            lambda db: db.execute(f"DELETE FROM outbox WHERE status = {SENT} AND sent_at < ?", (cutoff,))
+        )
+        if cursor.rowcount:
+            logger.info(f"Видалено надісланих записів outbox: {cursor.rowcount}")
+        return cursor.rowcount
+
+outbox = Outbox()
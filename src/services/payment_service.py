@@ -1,21 +1,26 @@
 import aiosqlite
 
 from datetime import datetime
-from typing import Optional, Dict
-
-from model.payments import Payments
-from services.database_service import DatabaseService
+from typing import List, Optional
+
+from model.records import PaymentRecord
+from services.db_pool import db_pool
+from services.order_service import OrderService
+from services.outbox import outbox
+from services.reminder_service import PAYMENT_REMINDER, ReminderService
+from services.scheduler import scheduler
+from services.write_queue import write_queue
 from utils.logging import get_logger
 
 logger = get_logger("services/payment_service")
 
-database_service = DatabaseService()
-
 class PaymentService:
     async def write_price(self, order_id: str, price: float) -> bool:
         """
         Запис ціни на замовлення
 
+        Разом із ціною планується нагадування клієнту про оплату.
+
         Args:
             order_id: str - ID замовлення (наприклад 12345678) 
             price: float - ціна на замовлення (наприкла 12.34)
@@ -23,20 +28,21 @@ class PaymentService:
         Return:
             True or False - результат виконнаня функції
         """
-        db = None
         try:
-            db = await database_service._get_db_connection()
             query = """
             UPDATE payments SET price = ?
             WHERE ID_order = ?
             """
-            cursor = await db.execute(query, (price, order_id))
+            async def update(db: aiosqlite.Connection) -> int:
+                cursor = await db.execute(query, (price, order_id))
+                if cursor.rowcount:
+                    await ReminderService.schedule_payment(db, order_id)
+                return cursor.rowcount
 
-            if cursor.rowcount == 0:
+            if not await write_queue.submit(update):
                 logger.warning(f"Замовлення {order_id} не знайдено в БД")
                 return False
             
-            await db.commit()
             return True
         except aiosqlite.Error as e:
             logger.exception(f"Помилка бази данних (внесення прайсу в БД): ")
@@ -44,12 +50,9 @@ class PaymentService:
         except Exception as e:
             logger.exception(f"Помилка внесення прайсу в БД: ")
             return False
-        finally:
-            if db:
-                await db.close()
 
 
-    async def get_unpaid_orders(self, client_id: int, status: int) -> Optional[Dict]:
+    async def get_unpaid_orders(self, client_id: int, status: int) -> Optional[List[PaymentRecord]]:
         """
         Отримання не оплачених замовлень
         
@@ -58,12 +61,9 @@ class PaymentService:
             status: int - статус оплати (0 - не оплачено; 1 - оплачено)
         
         Returns:
-            List[Payments] - список об'єктів Payments з знайденими записами, або None якщо client_id None
+            List[PaymentRecord] - знайдені платежі, або None якщо client_id None
         """
-        db = None
         try:
-            db = await database_service._get_db_connection()
-            
             if not client_id:
                 logger.warning(f"Користувача {client_id} не знайдено.")
                 return None
@@ -76,9 +76,9 @@ class PaymentService:
                         FROM payments p
                         WHERE p.client_id = ? AND p.status = ?
                         """
-                    async with db.execute(query, (str(client_id), str(status))) as cursor:
-                        rows = await cursor.fetchall()
-                        return [Payments(**dict(row)) for row in rows]
+                    async with db_pool.reader() as db:
+                        async with db.execute(query, (str(client_id), str(status))) as cursor:
+                            return await cursor.fetchall()
 
                 except aiosqlite.Error as e:
                     logger.exception(f"Помилка бази данних при отриманні данних з таблиці payments: ")
@@ -86,39 +86,45 @@ class PaymentService:
         except Exception as e:
             logger.exception(f"Помилка отримання не оплачених замовлень: ")
             raise
-        finally:
-            if db:
-                await db.close()
 
-    async def mark_confirm_pay(self, order_id: str) -> bool:
-        """Змінення статусу оплати на ОПЛАЧЕНО (1)
-        
+    async def mark_confirm_pay(self, order_id: str, actor_id: Optional[int] = None) -> Optional[PaymentRecord]:
+        """Змінення статусу оплати з НЕ ОПЛАЧЕНО (0) на ОПЛАЧЕНО (1)
+
+        Один запит UPDATE ... WHERE status = 0 (compare-and-set): повторне або одночасне
+        підтвердження не проходить. Подія 'payment_confirmed' в order_events, сповіщення
+        клієнту в outbox та скасування нагадування про оплату - в тій самій транзакції.
+
         Args:
             order_id: str - ID замовлення (наприклад 12345678)
+            actor_id: Optional[int] - ID адміністратора, що підтвердив оплату
 
         Returns:
-            True - функція внесла зміни в БД        
+            Optional[PaymentRecord] - платіж після зміни, або None якщо його не знайдено
+            чи вже оплачено
         """
-        db = None
-        try:
-            db = await database_service._get_db_connection()
-            current_time = datetime.now().isoformat()
-            query = """
+        current_time = datetime.now().isoformat()
+        query = """
             UPDATE payments SET status = ?, paid_at = ?
-            WHERE ID_order = ?
-            """
-            cursor = await db.execute(query, (1, current_time, order_id))
+            WHERE ID_order = ? AND status = ?
+            RETURNING *
+        """
 
-            if cursor.rowcount == 0:
-                logger.warning(f"Замовлення {order_id} не знайдено в БД")
-                return False
-            
-            await db.commit()
-            return True
+        async def confirm(db: aiosqlite.Connection) -> Optional[PaymentRecord]:
+            async with db.execute(query, (1, current_time, order_id, 0)) as cursor:
+                payment = await cursor.fetchone()
+            if payment is not None:
+                # Статус замовлення не змінюється; стан оплати відображає назва події
+                await OrderService.record_event(db, order_id, 'payment_confirmed', None, None, actor_id)
+                await outbox.add(db, int(payment['client_id']), f"Ваше замовлення {order_id} було успішно оплачено.")
+                await scheduler.cancel(db, PAYMENT_REMINDER, order_id)
+            return payment
 
+        try:
+            payment = await write_queue.submit(confirm)
         except Exception as e:
             logger.exception(f"Замовлення {order_id} не позначено як оплачене: ")
-            return False
-        finally:
-            if db:
-                await db.close()
\ No newline at end of file
+            return None
+
+        if payment is None:
+            logger.warning(f"Не оплачений платіж для замовлення {order_id} не знайдено в БД")
+        return payment
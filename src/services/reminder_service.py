@@ -0,0 +1,140 @@
+import aiosqlite
+
+from datetime import datetime
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+from typing import Any, Dict
+
+from model.order import OrderStatus
+from model.records import OrderRecord, PaymentRecord
+from services.outbox import outbox
+from services.scheduler import scheduler
+from services.write_queue import write_queue
+from utils.callbacks import OrderAction, OrderCallback, PaymentAction, PaymentCallback
+from utils.keyboards import get_worker_order_keyboard
+from utils.logging import get_logger
+
+from config import Config
+
+logger = get_logger("services/reminder_service")
+
+# Види задач планувальника (key - ID замовлення)
+PAYMENT_REMINDER = "payment_reminder"   # клієнту: ціну встановлено, замовлення не оплачено
+STALE_ORDER_REMINDER = "stale_order"    # виконавцю: замовлення довго в роботі без змін
+CONFIRM_REMINDER = "confirm_reminder"   # клієнту: роботу надіслано, виконання не підтверджено
+
+class ReminderService:
+    """
+    Нагадування про неоплачені, завислі та непідтверджені замовлення.
+
+    Нагадування плануються через scheduler в тих самих транзакціях, що змінюють
+    замовлення, а при спрацюванні обробник перевіряє актуальний стан і записує
+    повідомлення в outbox. Кожне нагадування повторюється до Config.REMINDER_REPEATS разів.
+    """
+
+    @staticmethod
+    async def schedule_payment(db: aiosqlite.Connection, order_id: str) -> None:
+        """Нагадування про оплату (після встановлення ціни; повторне встановлення переносить його)."""
+        await scheduler.add(db, PAYMENT_REMINDER, order_id, Config.PAYMENT_REMINDER_DELAY)
+
+    @staticmethod
+    async def schedule_stale_order(db: aiosqlite.Connection, order_id: str) -> None:
+        """Нагадування виконавцю, якщо замовлення залишиться в роботі без змін."""
+        await scheduler.add(db, STALE_ORDER_REMINDER, order_id, Config.STALE_ORDER_DELAY)
+
+    @staticmethod
+    async def cancel_order(db: aiosqlite.Connection, order_id: str) -> None:
+        """Скасування нагадувань про хід виконання замовлення (після завершення)."""
+        await scheduler.cancel(db, STALE_ORDER_REMINDER, order_id)
+        await scheduler.cancel(db, CONFIRM_REMINDER, order_id)
+
+    async def work_sent(self, order_id: str) -> None:
+        """Роботу надіслано клієнту: замість нагадування виконавцю чекаємо підтвердження клієнта."""
+        async def update(db: aiosqlite.Connection) -> None:
+            await scheduler.cancel(db, STALE_ORDER_REMINDER, order_id)
+            await scheduler.add(db, CONFIRM_REMINDER, order_id, Config.CONFIRM_REMINDER_DELAY)
+
+        await write_queue.submit(update)
+
+    async def corrections_sent(self, order_id: str) -> None:
+        """Клієнт надіслав правки: робота знову у виконавця."""
+        async def update(db: aiosqlite.Connection) -> None:
+            await scheduler.cancel(db, CONFIRM_REMINDER, order_id)
+            await scheduler.add(db, STALE_ORDER_REMINDER, order_id, Config.STALE_ORDER_DELAY)
+
+        await write_queue.submit(update)
+
+    @staticmethod
+    async def _repeat(db: aiosqlite.Connection, kind: str, order_id: str,
+                      delay: float, payload: Dict[str, Any]) -> None:
+        count = payload.get('count', 0) + 1
+        if count < Config.REMINDER_REPEATS:
+            await scheduler.add(db, kind, order_id, delay, {'count': count})
+
+    @staticmethod
+    async def _get_order(db: aiosqlite.Connection, order_id: str) -> OrderRecord:
+        async with db.execute("SELECT * FROM order_request WHERE ID_order = ?", (order_id,)) as cursor:
+            return await cursor.fetchone()
+
+    @staticmethod
+    async def remind_payment(db: aiosqlite.Connection, order_id: str, payload: Dict[str, Any]) -> None:
+        async with db.execute("SELECT * FROM payments WHERE ID_order = ?", (order_id,)) as cursor:
+            payment: PaymentRecord = await cursor.fetchone()
+        if payment is None or payment.is_paid or payment['price'] is None:
+            return
+
+        keyboard = InlineKeyboardBuilder()
+        keyboard.button(text="💰 Оплатити", callback_data=PaymentCallback(action=PaymentAction.PAY, order_id=order_id).pack())
+
+        await outbox.add(
+            db, int(payment['client_id']),
+            f"⏰ Замовлення #{order_id} очікує на оплату ({payment['price']} грн).",
+            reply_markup=keyboard.as_markup()
+        )
+        await ReminderService._repeat(db, PAYMENT_REMINDER, order_id, Config.PAYMENT_REMINDER_DELAY, payload)
+        logger.info(f"Нагадування про оплату замовлення {order_id}")
+
+    @staticmethod
+    async def remind_stale_order(db: aiosqlite.Connection, order_id: str, payload: Dict[str, Any]) -> None:
+        order = await ReminderService._get_order(db, order_id)
+        if order is None or order.order_status is not OrderStatus.IN_PROGRESS or order['ID_worker'] is None:
+            return
+
+        # Замовлення змінювалось після планування - відраховуємо час від останньої зміни
+        last_change = order.updated_at or order.taken_at
+        if last_change is not None:
+            idle = (datetime.now() - last_change).total_seconds()
+            if idle < Config.STALE_ORDER_DELAY:
+                await scheduler.add(db, STALE_ORDER_REMINDER, order_id, Config.STALE_ORDER_DELAY - idle, payload)
+                return
+
+        await outbox.add(
+            db, order['ID_worker'],
+            f"⏰ Замовлення #{order_id} в роботі вже понад {Config.STALE_ORDER_DELAY / 3600:.0f} год без змін.\n"
+            f"Не забудьте відправити роботу клієнту.",
+            reply_markup=get_worker_order_keyboard(order_id).as_markup()
+        )
+        await ReminderService._repeat(db, STALE_ORDER_REMINDER, order_id, Config.STALE_ORDER_DELAY, payload)
+        logger.info(f"Нагадування виконавцю про замовлення {order_id}")
+
+    @staticmethod
+    async def remind_confirmation(db: aiosqlite.Connection, order_id: str, payload: Dict[str, Any]) -> None:
+        order = await ReminderService._get_order(db, order_id)
+        if order is None or order.order_status is not OrderStatus.IN_PROGRESS:
+            return
+
+        keyboard = InlineKeyboardBuilder()
+        keyboard.button(text="✅ Все ОК", callback_data=OrderCallback(action=OrderAction.COMPLETE, order_id=order_id).pack())
+        keyboard.button(text="❌ Потрібні правки", callback_data=OrderCallback(action=OrderAction.FIX, order_id=order_id).pack())
+
+        await outbox.add(
+            db, order['ID_user'],
+            f"⏰ Роботу до замовлення #{order_id} надіслано.\n"
+            f"Підтвердіть виконання або надішліть правки.",
+            reply_markup=keyboard.as_markup()
+        )
+        await ReminderService._repeat(db, CONFIRM_REMINDER, order_id, Config.CONFIRM_REMINDER_DELAY, payload)
+        logger.info(f"Нагадування про підтвердження замовлення {order_id}")
+
+scheduler.register(PAYMENT_REMINDER, ReminderService.remind_payment)
+scheduler.register(STALE_ORDER_REMINDER, ReminderService.remind_stale_order)
+scheduler.register(CONFIRM_REMINDER, ReminderService.remind_confirmation)
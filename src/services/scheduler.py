@@ -0,0 +1,259 @@
+import asyncio
+import heapq
+import json
+import time
+import aiosqlite
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.db_pool import db_pool
+from services.write_queue import write_queue
+from utils.logging import get_logger
+
+from config import Config
+
+logger = get_logger("services/scheduler")
+
+# Обробник задачі: (з'єднання задачі write_queue, key, payload)
+JobHandler = Callable[[aiosqlite.Connection, str, Dict[str, Any]], Awaitable[None]]
+
+# Планування з переносом: для виду та об'єкта існує не більше однієї очікуючої задачі
+UPSERT_QUERY = """
+    INSERT INTO scheduled_jobs (kind, key, payload, run_at, created_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (kind, key) WHERE done_at IS NULL
+    DO UPDATE SET payload = excluded.payload, run_at = excluded.run_at, attempts = 0, error = NULL
+    RETURNING id
+"""
+
+# Захоплення задачі (compare-and-set по done_at): з кількох процесів, у яких спрацював
+# таймер, задачу виконує рівно один, а перенесена чи скасована задача не виконується
+CLAIM_QUERY = """
+    UPDATE scheduled_jobs SET done_at = ?, attempts = attempts + 1
+    WHERE id = ? AND done_at IS NULL AND run_at <= ?
+    RETURNING kind, key, payload
+"""
+
+class Scheduler:
+    """
+    Планувальник відкладених задач (нагадування тощо), що переживає перезапуски.
+
+    Задачі зберігаються в таблиці scheduled_jobs, а в пам'яті тримається лише min-heap
+    таймерів (run_at, id) для задач, що мають виконатися протягом horizon секунд.
+    БД читається один раз на horizon / 2, а не кожну секунду; задачі, заплановані цим
+    процесом, одразу потрапляють у heap. Обробник виконується всередині задачі
+    write_queue разом із захопленням задачі, тому його записи (наприклад outbox.add)
+    фіксуються лише разом з позначкою виконання. Після помилки задача повторюється
+    через Config.SCHEDULER_RETRY_DELAY, не більше Config.SCHEDULER_MAX_ATTEMPTS разів.
+    """
+
+    def __init__(self, horizon: float = None):
+        self.horizon = horizon or Config.SCHEDULER_HORIZON
+        self._handlers: Dict[str, JobHandler] = {}
+        self._heap: List[Tuple[float, int]] = []
+        # id -> run_at актуального таймера (застарілі записи heap пропускаються)
+        self._timers: Dict[int, float] = {}
+        self._loaded_until = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._running = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Реєстрація обробника задач виду kind."""
+        if kind in self._handlers:
+            raise ValueError(f"Обробник задач '{kind}' вже зареєстровано")
+        self._handlers[kind] = handler
+
+    async def add(self,
+                  db: aiosqlite.Connection,
+                  kind: str,
+                  key: str,
+                  delay: float,
+                  payload: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Планування задачі всередині задачі write_queue
+
+        Якщо задача kind для key вже очікує, вона переноситься на новий час.
+
+        Args:
+            db: aiosqlite.Connection - з'єднання задачі write_queue
+            kind: str - вид задачі (зареєстрований через register)
+            key: str - об'єкт задачі (наприклад ID замовлення)
+            delay: float - через скільки секунд виконати
+            payload: Optional[Dict[str, Any]] - дані для обробника (JSON)
+
+        Return:
+            int - ID задачі
+        """
+        now = time.time()
+        run_at = now + delay
+        async with db.execute(
+            UPSERT_QUERY, (kind, str(key), json.dumps(payload or {}), run_at, now)
+        ) as cursor:
+            job_id = (await cursor.fetchone())[0]
+
+        # Якщо транзакцію буде відкочено, таймер спрацює вхолосту (CLAIM_QUERY нічого не знайде)
+        self._push(job_id, run_at)
+        return job_id
+
+    async def schedule(self, kind: str, key: str, delay: float,
+                       payload: Optional[Dict[str, Any]] = None) -> int:
+        """Планування задачі окремою транзакцією (аргументи як у add)."""
+        return await write_queue.submit(lambda db: self.add(db, kind, key, delay, payload))
+
+    @staticmethod
+    async def cancel(db: aiosqlite.Connection, kind: str, key: str) -> None:
+        """Скасування очікуючої задачі kind для key всередині задачі write_queue."""
+        await db.execute(
+            "DELETE FROM scheduled_jobs WHERE kind = ? AND key = ? AND done_at IS NULL",
+            (kind, str(key))
+        )
+
+    def _push(self, job_id: int, run_at: float) -> None:
+        # Задачі за межами завантаженого вікна підхопить наступне читання з БД
+        if run_at > self._loaded_until or self._timers.get(job_id) == run_at:
+            return
+        self._timers[job_id] = run_at
+        heapq.heappush(self._heap, (run_at, job_id))
+        if self._heap[0][1] == job_id:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        """Запуск планувальника (після write_queue.start)."""
+        if self.is_running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run(), name="scheduler")
+        logger.info("Планувальник запущено")
+
+    async def stop(self, timeout: float = None) -> None:
+        """Зупинка планувальника: задачі, що вже виконуються, завершуються (не довше timeout)."""
+        if self._task is None:
+            return
+        self._running = False
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout or Config.SHUTDOWN_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("Виконання задач планувальника перервано")
+        except Exception as e:
+            logger.exception(f"Помилка зупинки планувальника: ")
+        self._task = None
+        self._heap.clear()
+        self._timers.clear()
+        self._loaded_until = 0.0
+        logger.info("Планувальник зупинено")
+
+    async def _load(self) -> None:
+        """Завантаження таймерів задач, що мають виконатися протягом horizon, та очищення виконаних."""
+        now = time.time()
+        # Межа вікна змінюється до читання: задачі, заплановані під час читання, потрапляють
+        # у heap через _push, а повтори відкидаються за _timers
+        self._loaded_until = now + self.horizon
+
+        async with db_pool.reader() as db:
+            async with db.execute(
+                "SELECT id, run_at FROM scheduled_jobs WHERE done_at IS NULL AND run_at <= ?",
+                (self._loaded_until,)
+            ) as cursor:
+                rows = await cursor.fetchall()
+        for job_id, run_at in (row.values() for row in rows):
+            self._push(job_id, run_at)
+
+        cutoff = now - Config.SCHEDULER_RETENTION
+        cursor = await write_queue.submit(
+            lambda db: db.execute("DELETE FROM scheduled_jobs WHERE done_at < ?", (cutoff,))
+        )
+        if cursor.rowcount:
+            logger.info(f"Видалено виконаних задач планувальника: {cursor.rowcount}")
+
+    async def _run(self) -> None:
+        while self._running:
+            self._wakeup.clear()
+            try:
+                if time.time() >= self._loaded_until - self.horizon / 2:
+                    await self._load()
+
+                now = time.time()
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    run_at, job_id = heapq.heappop(self._heap)
+                    if self._timers.get(job_id) == run_at:
+                        del self._timers[job_id]
+                        due.append(job_id)
+
+                # Кожна задача - окрема задача write_queue: вони виконуються пакетами
+                # в одній транзакції, а помилка однієї не відкочує інші
+                if due:
+                    await asyncio.gather(*(self._execute(job_id) for job_id in due))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Помилка планувальника: ")
+
+            reload_at = self._loaded_until - self.horizon / 2
+            wake_at = min(self._heap[0][0], reload_at) if self._heap else reload_at
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), max(0.0, wake_at - time.time()))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _execute(self, job_id: int) -> None:
+        now = time.time()
+
+        async def run(db: aiosqlite.Connection) -> None:
+            async with db.execute(CLAIM_QUERY, (now, job_id, now)) as cursor:
+                job = await cursor.fetchone()
+            if job is None:
+                return
+
+            handler = self._handlers.get(job['kind'])
+            if handler is None:
+                logger.warning(f"Немає обробника для задачі {job_id} виду '{job['kind']}'")
+                return
+            await handler(db, job['key'], json.loads(job['payload']))
+
+        try:
+            await write_queue.submit(run)
+        except Exception as e:
+            logger.exception(f"Помилка виконання задачі планувальника {job_id}: ")
+            await self._retry(job_id, e)
+
+    async def _retry(self, job_id: int, error: Exception) -> None:
+        """Перенесення задачі після помилки (або завершення після вичерпаних спроб)."""
+        now = time.time()
+        run_at = now + Config.SCHEDULER_RETRY_DELAY
+
+        async def reschedule(db: aiosqlite.Connection) -> Optional[Tuple[float, Optional[float]]]:
+            async with db.execute(
+                """
+                UPDATE scheduled_jobs
+                SET attempts = attempts + 1, error = ?, run_at = ?,
+                    done_at = CASE WHEN attempts + 1 >= ? THEN ? END
+                WHERE id = ? AND done_at IS NULL
+                RETURNING run_at, done_at
+                """,
+                (str(error), run_at, Config.SCHEDULER_MAX_ATTEMPTS, now, job_id)
+            ) as cursor:
+                row = await cursor.fetchone()
+            return row.values() if row is not None else None
+
+        try:
+            result = await write_queue.submit(reschedule)
+        except Exception as e:
+            logger.exception(f"Не вдалося перенести задачу планувальника {job_id}: ")
+            return
+
+        if result is None:
+            return
+        run_at, done_at = result
+        if done_at is not None:
+            logger.error(f"Задачу планувальника {job_id} скасовано після {Config.SCHEDULER_MAX_ATTEMPTS} спроб: {error}")
+        else:
+            self._push(job_id, run_at)
+
+scheduler = Scheduler()
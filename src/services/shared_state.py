@@ -0,0 +1,151 @@
+import asyncio
+import json
+import os
+import uuid
+
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from utils.logging import get_logger
+
+from config import Config
+
+logger = get_logger("services/shared_state")
+
+# Канал Redis для повідомлень про зміну кешованих даних
+INVALIDATION_CHANNEL = "gradle:invalidate"
+
+InvalidationHandler = Callable[[Dict[str, Any]], None]
+
+class SharedState:
+    """
+    Спільний для кількох процесів бота стан: FSM-сховище та інвалідація кешів.
+
+    Без Config.REDIS_URL працює в межах одного процесу (локальні кеші, FSM в sqlite/пам'яті).
+    З REDIS_URL зміни кешу розсилаються іншим процесам через pub/sub, а FSM може
+    зберігатися в Redis. Клієнт можна передати в connect() (наприклад fakeredis для перевірок).
+    """
+
+    def __init__(self):
+        self.client = None
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}" # Щоб не обробляти власні повідомлення
+        self._handlers: Dict[str, List[InvalidationHandler]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        # Публікації notify_invalidation, що ще не завершились (посилання не дає задачам зникнути)
+        self._pending: Set[asyncio.Task] = set()
+
+    @property
+    def is_shared(self) -> bool:
+        return self.client is not None
+
+    def connect(self, client: Any = None) -> None:
+        """
+        Підключення до Redis (якщо задано Config.REDIS_URL або передано клієнт)
+
+        Args:
+            client: Any - готовий клієнт redis.asyncio.Redis або сумісний (fakeredis)
+        """
+        if client is None and not Config.REDIS_URL:
+            logger.info("Спільний стан вимкнено (REDIS_URL не задано), працюємо в одному процесі")
+            return
+
+        if client is None:
+            try:
+                from redis.asyncio import Redis
+            except ImportError as e:
+                raise RuntimeError("Для REDIS_URL потрібен пакет redis (pip install redis)") from e
+            client = Redis.from_url(Config.REDIS_URL)
+
+        self.client = client
+        logger.info("Спільний стан підключено до Redis")
+
+    async def start(self) -> None:
+        """Запуск підписки на повідомлення інших процесів."""
+        if self.is_shared and (self._listener is None or self._listener.done()):
+            self._listener = asyncio.create_task(self._listen(), name="shared-state-listener")
+
+    async def close(self) -> None:
+        if self._listener is not None and not self._listener.done():
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._listener = None
+
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def on_invalidate(self, kind: str, handler: InvalidationHandler) -> None:
+        """Реєстрація обробника інвалідації кешу певного виду (наприклад 'user')."""
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def _dispatch(self, kind: str, payload: Dict[str, Any]) -> None:
+        for handler in self._handlers.get(kind, []):
+            try:
+                handler(payload)
+            except Exception as e:
+                logger.exception(f"Помилка обробника інвалідації {kind}: ")
+
+    async def publish_invalidation(self, kind: str, **payload: Any) -> None:
+        """
+        Повідомлення інших процесів про зміну даних
+
+        Локальний кеш викликаючий код інвалідує сам, тут повідомлення тільки розсилається.
+        """
+        if not self.is_shared:
+            return
+        message = json.dumps({'origin': self.origin, 'kind': kind, 'payload': payload})
+        try:
+            await self.client.publish(INVALIDATION_CHANNEL, message)
+        except Exception as e:
+            logger.exception(f"Помилка публікації інвалідації {kind}: ")
+
+    def notify_invalidation(self, kind: str, **payload: Any) -> None:
+        """Як publish_invalidation(), але без очікування (для синхронного коду; close() дочікується)."""
+        if self.is_shared:
+            task = asyncio.get_running_loop().create_task(self.publish_invalidation(kind, **payload))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _listen(self) -> None:
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(INVALIDATION_CHANNEL)
+        try:
+            while True:
+                try:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if not message:
+                        continue
+                    data = json.loads(message['data'])
+                    if data.get('origin') == self.origin:
+                        continue
+                    self._dispatch(data['kind'], data.get('payload', {}))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.exception(f"Помилка обробки повідомлення спільного стану: ")
+                    await asyncio.sleep(1)
+        finally:
+            await pubsub.unsubscribe(INVALIDATION_CHANNEL)
+            await pubsub.aclose()
+
+    def create_fsm_storage(self):
+        """FSM-сховище aiogram в Redis (спільне для всіх процесів)."""
+        if not self.is_shared:
+            raise RuntimeError("FSM_STORAGE=redis потребує REDIS_URL")
+
+        from aiogram.fsm.storage.base import DefaultKeyBuilder
+        from aiogram.fsm.storage.redis import RedisStorage
+
+        return RedisStorage(
+            self.client,
+            key_builder=DefaultKeyBuilder(with_bot_id=True, with_destiny=True),
+            state_ttl=int(Config.FSM_STATE_TTL) or None,
+            data_ttl=int(Config.FSM_STATE_TTL) or None,
+        )
+
+shared_state = SharedState()
@@ -0,0 +1,159 @@
+import asyncio
+import time
+import aiosqlite
+
+from typing import Any, Awaitable, Callable, List, Optional
+
+from services.db_pool import db_pool, record_db_time
+from utils.logging import get_logger
+
+from config import Config
+
+logger = get_logger("services/write_queue")
+
+WriteJob = Callable[[aiosqlite.Connection], Awaitable[Any]]
+
+class _PendingJob:
+    __slots__ = ("func", "future")
+
+    def __init__(self, func: WriteJob, future: asyncio.Future):
+        self.func = func
+        self.future = future
+
+class WriteQueue:
+    """
+    Єдиний writer для всіх змін у БД.
+
+    Сервіси передають функції-зміни через submit(), а фонова задача збирає їх у пакети
+    і виконує кожен пакет в одній транзакції (один commit / fsync на пакет).
+    Кожна зміна виконується в окремому SAVEPOINT, тому помилка однієї зміни
+    не відкочує інші, а повертається тільки тому, хто її надіслав.
+    """
+
+    def __init__(self, max_batch: int = None, tick: float = None):
+        self.max_batch = max(1, max_batch or Config.WRITE_QUEUE_MAX_BATCH)
+        self.tick = Config.WRITE_QUEUE_TICK if tick is None else tick
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Запуск фонової задачі запису."""
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run(), name="db-write-queue")
+        logger.info("Черга запису в БД запущена")
+
+    async def stop(self) -> None:
+        """Зупинка задачі запису після виконання всіх змін, що вже в черзі."""
+        if not self.is_running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+        # Зміни, додані в чергу після маркера зупинки, виконуємо тут (нові submit() вже
+        # виконуються одразу, бо задача завершилась), інакше їх виклики чекали б вічно
+        while not self._queue.empty():
+            batch = []
+            while len(batch) < self.max_batch and not self._queue.empty():
+                job = self._queue.get_nowait()
+                if job is not None:
+                    batch.append(job)
+            if batch:
+                await self._execute(batch)
+
+        self._queue = None
+        logger.info("Черга запису в БД зупинена")
+
+    async def submit(self, func: WriteJob) -> Any:
+        """
+        Виконання зміни в БД через єдиний writer
+
+        Args:
+            func: WriteJob - async функція, що приймає з'єднання aiosqlite і виконує запити.
+                Не повинна викликати commit() / rollback() самостійно
+
+        Return:
+            Any - результат func, або виняток, який вона підняла
+        """
+        future = asyncio.get_running_loop().create_future()
+        job = _PendingJob(func, future)
+
+        if not self.is_running:
+            # Без запущеної черги (скрипти, тести) виконуємо зміну одразу
+            await self._execute([job])
+            return await future
+
+        # Пакет виконується у фоновій задачі, тому час запису рахуємо тут
+        started_at = time.perf_counter()
+        self._queue.put_nowait(job)
+        try:
+            return await future
+        finally:
+            record_db_time(started_at)
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            job = await self._queue.get()
+            if job is None:
+                break
+
+            # Даємо іншим обробникам додати свої зміни в той самий пакет
+            if self.tick > 0:
+                await asyncio.sleep(self.tick)
+
+            batch = [job]
+            while len(batch) < self.max_batch:
+                try:
+                    job = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if job is None:
+                    stopping = True
+                    break
+                batch.append(job)
+
+            await self._execute(batch)
+
+    async def _execute(self, batch: List[_PendingJob]) -> None:
+        done = []
+        try:
+            async with db_pool.writer() as db:
+                await db.execute("BEGIN IMMEDIATE")
+                for job in batch:
+                    if job.future.cancelled():
+                        continue
+
+                    await db.execute("SAVEPOINT write_job")
+                    try:
+                        result = await job.func(db)
+                    except Exception as e:
+                        await db.execute("ROLLBACK TO write_job")
+                        await db.execute("RELEASE write_job")
+                        job.future.set_exception(e)
+                    else:
+                        await db.execute("RELEASE write_job")
+                        done.append((job, result))
+
+            if len(batch) > 1:
+                logger.debug(f"Записано пакет з {len(batch)} змін")
+
+        except Exception as e:
+            logger.exception(f"Помилка запису пакету змін в БД: ")
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            return
+
+        # Результати віддаємо тільки після успішного commit
+        for job, result in done:
+            if not job.future.done():
+                job.future.set_result(result)
+
+write_queue = WriteQueue()
@@ -19,6 +19,8 @@ help_text_admin = """Ось ваш перелік команд юзера:
 /search - Пошук за ІД чи link.
 /send_message - Надсилання повідомлення конкретному користувачу.
 /status - Пошук замовлення по статусу замовлення.
+/rebuild_stats - Перерахунок статистики виконавців.
+/metrics - Метрики швидкодії бота.
 
 """
 
@@ -1,10 +1,34 @@
+from .album import AlbumMiddleware, append_to_state
+from .cache import LRUCache
+from .callbacks import (CallbackTable, MenuAction, MenuCallback, OrderAction, OrderCallback, OrderListCallback,
+                        OrderListTakeCallback, PaymentAction, PaymentCallback, ReplyCallback, ReplySide, parse_legacy)
+from .concurrency import UpdateConcurrencyMiddleware
 from .decorators import require_admin
 from .dict import work_dict
 from .keyboards import get_admin_keyboard, get_user_pay_keyboard, get_worker_order_keyboard, subject_keyboard, type_work_keyboard
 from .logging import get_logger
+from .metrics import BotMetrics, Histogram, metrics
+from .rate_limiter import OutboundRateLimiter, TokenBucket, outbound_limiter
+from .roles import AdminOnlyMiddleware, Role, RoleMiddleware, admin_only, deny, is_admin, role_middleware
 from .validators import validate_course, validate_input, _validate_table_column
 
 __all__ = [
+    'AlbumMiddleware',
+    'append_to_state',
+    'LRUCache',
+    'CallbackTable',
+    'MenuAction',
+    'MenuCallback',
+    'OrderAction',
+    'OrderCallback',
+    'OrderListCallback',
+    'OrderListTakeCallback',
+    'PaymentAction',
+    'PaymentCallback',
+    'ReplyCallback',
+    'ReplySide',
+    'parse_legacy',
+    'UpdateConcurrencyMiddleware',
     'require_admin',
     'work_dict',
     'get_admin_keyboard',
@@ -13,6 +37,19 @@ __all__ = [
     'subject_keyboard', 
     'type_work_keyboard',
     'get_logger',
+    'BotMetrics',
+    'Histogram',
+    'metrics',
+    'OutboundRateLimiter',
+    'TokenBucket',
+    'outbound_limiter',
+    'AdminOnlyMiddleware',
+    'Role',
+    'RoleMiddleware',
+    'admin_only',
+    'deny',
+    'is_admin',
+    'role_middleware',
     'validate_course', 
     'validate_input',
     '_validate_table_column'
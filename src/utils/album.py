@@ -0,0 +1,76 @@
+import asyncio
+
+from aiogram import BaseMiddleware
+from aiogram.fsm.context import FSMContext
+from aiogram.types import Message, TelegramObject
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from weakref import WeakValueDictionary
+
+from utils.logging import get_logger
+
+from config import Config
+
+logger = get_logger("utils/album")
+
+# Lock на кожен FSM-ключ, щоб паралельні повідомлення не перезаписували списки одне одного
+_state_locks: "WeakValueDictionary[Any, asyncio.Lock]" = WeakValueDictionary()
+
+async def append_to_state(state: FSMContext, field: str, items: List[Dict]) -> int:
+    """
+    Атомарне додавання елементів до списку в даних FSM
+
+    Args:
+        state: FSMContext - стан користувача
+        field: str - назва списку в даних стану (наприклад 'files')
+        items: List[Dict] - елементи для додавання
+
+    Return:
+        int - довжина списку після додавання
+    """
+    lock = _state_locks.get(state.key)
+    if lock is None:
+        lock = _state_locks[state.key] = asyncio.Lock()
+
+    async with lock:
+        data = await state.get_data()
+        values = list(data.get(field, []))
+        values.extend(items)
+        await state.update_data({field: values})
+        return len(values)
+
+class AlbumMiddleware(BaseMiddleware):
+    """
+    Збирає повідомлення одного альбому (media_group_id) в одне оброблення.
+
+    Перше повідомлення альбому чекає latency секунд, решта додаються до нього і не
+    обробляються окремо. Обробник отримує всі повідомлення альбому в аргументі album.
+    Повідомлення без media_group_id проходять без затримки.
+    """
+
+    def __init__(self, latency: float = None):
+        self.latency = Config.ALBUM_LATENCY if latency is None else latency
+        self._albums: Dict[Tuple[int, str], List[Message]] = {}
+
+    async def __call__(self,
+                       handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject,
+                       data: Dict[str, Any]) -> Any:
+        if not isinstance(event, Message) or not event.media_group_id:
+            return await handler(event, data)
+
+        key = (event.chat.id, event.media_group_id)
+        album = self._albums.get(key)
+        if album is not None:
+            album.append(event)
+            return None
+
+        album = self._albums[key] = [event]
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            del self._albums[key]
+
+        album.sort(key=lambda message: message.message_id)
+        logger.debug(f"Альбом {event.media_group_id}: {len(album)} повідомлень")
+        data["album"] = album
+        return await handler(event, data)
@@ -0,0 +1,79 @@
+import time
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+# Маркер відсутнього значення (None теж може бути валідним значенням)
+MISSING = object()
+
+class LRUCache:
+    """
+    Обмежений за розміром кеш з часом життя записів (LRU + TTL).
+
+    generation збільшується при кожній інвалідації: читач, що запам'ятав його до запиту
+    в БД, може не кешувати результат, якщо запис інвалідували під час запиту.
+
+    Args:
+        maxsize: int - максимальна кількість записів, найдавніше використані витісняються першими
+        ttl: float - час життя запису в секундах (0 - без обмеження)
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Any:
+        """Повертає значення з кешу, або MISSING якщо його немає чи воно застаріло."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        value, expires_at = entry
+        if expires_at and expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return MISSING
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key: Hashable) -> Any:
+        """Як get(), але без оновлення порядку LRU та лічильників hits/misses."""
+        entry = self._data.get(key)
+        return entry[0] if entry is not None else MISSING
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else 0
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self.generation += 1
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
@@ -0,0 +1,234 @@
+from enum import Enum
+
+from aiogram import Router
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import CallbackQuery
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type, Union
+from weakref import WeakKeyDictionary
+
+from utils.logging import get_logger
+
+logger = get_logger("utils/callbacks")
+
+# ==========================================
+# Формати callback_data
+# ==========================================
+# Короткі префікси та коди дій: "o:t:000123" замість "take_order_000123".
+# CallbackData.pack() перевіряє ліміт Telegram у 64 байти.
+
+class MenuAction(str, Enum):
+    NEW_ORDERS = "n"
+    MY_ORDERS = "m"
+    REFRESH_ORDERS = "r"
+    STATISTICS = "s"
+    BACK_TO_ADMIN = "a"
+    UNPAID = "u"
+    BACK_HOME = "h"
+
+class OrderAction(str, Enum):
+    TAKE = "t"
+    SEND_WORK = "sw"
+    FINISH_SENDING = "fs"
+    CANCEL_SEND = "cs"
+    COMPLETE = "c"
+    FIX = "f"
+    FINISH_CORRECT = "fc"
+    CANCEL_CORRECT = "cc"
+
+class PaymentAction(str, Enum):
+    PUT_PRICE = "pp"
+    PAY = "p"
+    PAID = "pd"
+    CONFIRM = "c"
+    REJECT = "r"
+
+class ReplySide(str, Enum):
+    USER = "u"  # кнопку натискає користувач, відповідь йде адміну
+    ADMIN = "a" # кнопку натискає адмін, відповідь йде користувачу
+
+class MenuCallback(CallbackData, prefix="m"):
+    action: MenuAction
+
+class OrderCallback(CallbackData, prefix="o"):
+    action: OrderAction
+    order_id: str
+
+class PaymentCallback(CallbackData, prefix="p"):
+    action: PaymentAction
+    order_id: str
+
+class ReplyCallback(CallbackData, prefix="r"):
+    action: ReplySide
+    user_id: int
+    admin_id: int
+
+class OrderListCallback(CallbackData, prefix="l"):
+    """Перехід на сторінку списку замовлень (OrderListService)."""
+    kind: str
+    page: int
+    arg: str = ""
+
+class OrderListTakeCallback(CallbackData, prefix="lt"):
+    """Взяти замовлення зі сторінки нових замовлень (page - для оновлення сторінки)."""
+    page: int
+    order_id: str
+
+# ==========================================
+# Старі формати
+# ==========================================
+# Кнопки у вже надісланих повідомленнях містять callback_data старого формату,
+# тому вони перетворюються на нові об'єкти. Перевіряються лише якщо префікс
+# не знайдено в таблиці, тобто не впливають на розбір нових кнопок.
+
+def _legacy_id(action: Enum, factory: Type[CallbackData]) -> Callable[[str], CallbackData]:
+    return lambda rest: factory(action=action, order_id=rest)
+
+def _legacy_reply(side: ReplySide) -> Callable[[str], CallbackData]:
+    def parse(rest: str) -> CallbackData:
+        user_id, admin_id = rest.split(':')[:2]
+        return ReplyCallback(action=side, user_id=int(user_id), admin_id=int(admin_id))
+    return parse
+
+def _legacy_list_page(rest: str) -> CallbackData:
+    kind, page, arg = rest.split('_', 2)
+    return OrderListCallback(kind=kind, page=int(page), arg=arg)
+
+def _legacy_list_take(rest: str) -> CallbackData:
+    page, order_id = rest.split('_', 1)
+    return OrderListTakeCallback(page=int(page), order_id=order_id)
+
+LEGACY_CALLBACKS: Tuple[Tuple[str, Callable[[str], CallbackData]], ...] = (
+    ("new_orders", lambda rest: MenuCallback(action=MenuAction.NEW_ORDERS)),
+    ("my_orders", lambda rest: MenuCallback(action=MenuAction.MY_ORDERS)),
+    ("refresh_worker_orders", lambda rest: MenuCallback(action=MenuAction.REFRESH_ORDERS)),
+    ("my_statistics", lambda rest: MenuCallback(action=MenuAction.STATISTICS)),
+    ("back_to_admin", lambda rest: MenuCallback(action=MenuAction.BACK_TO_ADMIN)),
+    ("unpaid_order", lambda rest: MenuCallback(action=MenuAction.UNPAID)),
+    ("back_to_home", lambda rest: MenuCallback(action=MenuAction.BACK_HOME)),
+    ("take_order_", _legacy_id(OrderAction.TAKE, OrderCallback)),
+    ("send_work_", _legacy_id(OrderAction.SEND_WORK, OrderCallback)),
+    ("finish_sending_", _legacy_id(OrderAction.FINISH_SENDING, OrderCallback)),
+    ("cancel_send_", _legacy_id(OrderAction.CANCEL_SEND, OrderCallback)),
+    ("complete_order_", _legacy_id(OrderAction.COMPLETE, OrderCallback)),
+    ("fix_work_", _legacy_id(OrderAction.FIX, OrderCallback)),
+    ("finish_correct_", _legacy_id(OrderAction.FINISH_CORRECT, OrderCallback)),
+    ("cancel_correct_", _legacy_id(OrderAction.CANCEL_CORRECT, OrderCallback)),
+    ("put_price_", _legacy_id(PaymentAction.PUT_PRICE, PaymentCallback)),
+    ("pay_order_", _legacy_id(PaymentAction.PAY, PaymentCallback)),
+    ("paid_", _legacy_id(PaymentAction.PAID, PaymentCallback)),
+    ("confirm_pay_", _legacy_id(PaymentAction.CONFIRM, PaymentCallback)),
+    ("reject_", _legacy_id(PaymentAction.REJECT, PaymentCallback)),
+    ("reply_user:", _legacy_reply(ReplySide.USER)),
+    ("reply_admin:", _legacy_reply(ReplySide.ADMIN)),
+    ("olp_", _legacy_list_page),
+    ("olt_", _legacy_list_take),
+)
+
+def parse_legacy(data: str) -> Optional[CallbackData]:
+    """
+    Розбір callback_data старого формату ("take_order_000123", "reply_user:1:2", ...)
+
+    Return:
+        Optional[CallbackData] - відповідний об'єкт нового формату, або None
+    """
+    for prefix, parse in LEGACY_CALLBACKS:
+        if data == prefix or (prefix.endswith(('_', ':')) and data.startswith(prefix)):
+            try:
+                return parse(data[len(prefix):])
+            except (TypeError, ValueError):
+                return None
+    return None
+
+# ==========================================
+# Таблиця обробників
+# ==========================================
+
+class CallbackTable:
+    """
+    Диспетчеризація callback-запитів роутера через словник замість послідовних фільтрів.
+
+    Реєструє в роутері один обробник callback_query. Його фільтр бере префікс
+    та код дії з callback_data, знаходить обробник у словнику та передає йому
+    розібраний об'єкт як callback_data. Невідомі префікси пропускаються далі
+    (інші обробники роутера та наступні роутери).
+
+    Приклад:
+        callbacks = CallbackTable(admin_orders_router)
+
+        @callbacks(OrderCallback, OrderAction.TAKE)
+        async def take_order(callback: CallbackQuery, callback_data: OrderCallback) -> None: ...
+    """
+
+    # Таблиці кожного роутера (для utils.roles.AdminOnlyMiddleware)
+    _tables: "WeakKeyDictionary[Router, List[CallbackTable]]" = WeakKeyDictionary()
+
+    def __init__(self, router: Router):
+        self.router = router
+        # префікс -> (клас callback_data, {код дії або None: обробник})
+        self._routes: Dict[str, Tuple[Type[CallbackData], Dict[Optional[str], HandlerObject]]] = {}
+        router.callback_query.register(self._dispatch, self._resolve)
+        CallbackTable._tables.setdefault(router, []).append(self)
+
+    @classmethod
+    def of(cls, router: Router) -> List["CallbackTable"]:
+        """Таблиці, зареєстровані в роутері."""
+        return cls._tables.get(router, [])
+
+    def keys(self) -> Set[Tuple[str, Optional[str]]]:
+        """Зареєстровані пари (префікс, код дії або None для factory без поля action)."""
+        return {(prefix, action) for prefix, (_, handlers) in self._routes.items() for action in handlers}
+
+    def __call__(self, factory: Type[CallbackData], action: Optional[Enum] = None):
+        """Декоратор обробника для factory (і значення поля action, якщо воно є у factory)."""
+        def decorator(func):
+            prefix = factory.__prefix__
+            registered, handlers = self._routes.setdefault(prefix, (factory, {}))
+            if registered is not factory:
+                raise ValueError(f"Префікс '{prefix}' вже зайнятий {registered.__name__}")
+
+            key = action.value if action is not None else None
+            if key in handlers:
+                raise ValueError(f"Обробник для {factory.__name__}:{key} вже зареєстровано")
+            handlers[key] = HandlerObject(callback=func)
+            return func
+        return decorator
+
+    def _unpack(self, data: str) -> Optional[Tuple[CallbackData, Dict[Optional[str], HandlerObject]]]:
+        prefix = data.split(':', 1)[0]
+        route = self._routes.get(prefix)
+        if route is not None:
+            factory, handlers = route
+            try:
+                return factory.unpack(data), handlers
+            except (TypeError, ValueError):
+                logger.warning(f"Неправильний формат callback_data: {data!r}")
+                return None
+
+        parsed = parse_legacy(data)
+        if parsed is None:
+            return None
+        route = self._routes.get(parsed.__prefix__)
+        return (parsed, route[1]) if route is not None else None
+
+    async def _resolve(self, callback: CallbackQuery) -> Union[bool, Dict[str, Any]]:
+        if not callback.data:
+            return False
+
+        unpacked = self._unpack(callback.data)
+        if unpacked is None:
+            return False
+
+        callback_data, handlers = unpacked
+        action = getattr(callback_data, 'action', None)
+        handler = handlers.get(action.value if action is not None else None)
+        if handler is None:
+            return False
+
+        # data['handler'] замінюється знайденим обробником: його бачать inner middleware
+        # (метрики рахують час за назвою справжнього обробника, а не _dispatch)
+        return {'callback_data': callback_data, 'handler': handler}
+
+    @staticmethod
+    async def _dispatch(callback: CallbackQuery, **data: Any) -> Any:
+        return await data['handler'].call(callback, **data)
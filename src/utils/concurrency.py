@@ -0,0 +1,60 @@
+import asyncio
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from typing import Any, Awaitable, Callable, Dict
+
+from utils.logging import get_logger
+
+from config import Config
+
+logger = get_logger("utils/concurrency")
+
+class UpdateConcurrencyMiddleware(BaseMiddleware):
+    """
+    Обмежує кількість оновлень, що обробляються одночасно, та рахує незавершені.
+
+    Реєструється як outer middleware для dp.update. При зупинці бота drain()
+    чекає, поки всі прийняті оновлення будуть оброблені.
+    """
+
+    def __init__(self, limit: int = None):
+        self.limit = max(1, limit or Config.MAX_CONCURRENT_UPDATES)
+        self.in_flight = 0
+        self._semaphore = asyncio.Semaphore(self.limit)
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def __call__(self,
+                       handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject,
+                       data: Dict[str, Any]) -> Any:
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            async with self._semaphore:
+                return await handler(event, data)
+        finally:
+            self.in_flight -= 1
+            if not self.in_flight:
+                self._idle.set()
+
+    async def drain(self, timeout: float = None) -> bool:
+        """
+        Очікування завершення всіх прийнятих оновлень
+
+        Args:
+            timeout: float - максимальний час очікування (за замовчуванням Config.SHUTDOWN_DRAIN_TIMEOUT)
+
+        Return:
+            bool - True якщо всі оновлення оброблено
+        """
+        timeout = Config.SHUTDOWN_DRAIN_TIMEOUT if timeout is None else timeout
+        if self.in_flight:
+            logger.info(f"Очікуємо завершення {self.in_flight} оновлень...")
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"Не дочекались завершення {self.in_flight} оновлень за {timeout} с")
+            return False
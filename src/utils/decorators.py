@@ -1,13 +1,20 @@
 from functools import wraps
-from aiogram.types import Message
-from config import Config  
+from typing import Union
+
+from aiogram.types import CallbackQuery, Message
+
+from utils.roles import deny, is_admin
 
 def require_admin(func):
+    """
+    Перевірка прав для окремих обробників поза адмін-роутерами
+    (адмін-роутери перевіряються цілком через utils.roles.admin_only)
+    """
     @wraps(func)
-    async def wrapper(message: Message, *args, **kwargs):
-        if message.from_user.id in Config.ADMIN_IDS:  # Використовуємо Config.ADMIN_IDS
-            return await func(message, *args, **kwargs)
-        else:
-            await message.answer("У вас немає прав для виконання цієї команди.")
-            return False
-    return wrapper
\ No newline at end of file
+    async def wrapper(event: Union[Message, CallbackQuery], *args, **kwargs):
+        if is_admin(event.from_user.id):
+            return await func(event, *args, **kwargs)
+
+        await deny(event)
+        return False
+    return wrapper
@@ -2,24 +2,26 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.types import InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
 from aiogram.utils.keyboard import ReplyKeyboardBuilder
 
+from utils.callbacks import MenuAction, MenuCallback, OrderAction, OrderCallback
+
 
 def get_admin_keyboard() -> InlineKeyboardBuilder:
     keyboard = InlineKeyboardBuilder()
-    keyboard.button(text="📋 Нові замовлення", callback_data="new_orders")
-    keyboard.button(text="📋 Мої замовлення", callback_data="my_orders")
-    keyboard.button(text="📊 Статистика", callback_data="my_statistics")
+    keyboard.button(text="📋 Нові замовлення", callback_data=MenuCallback(action=MenuAction.NEW_ORDERS).pack())
+    keyboard.button(text="📋 Мої замовлення", callback_data=MenuCallback(action=MenuAction.MY_ORDERS).pack())
+    keyboard.button(text="📊 Статистика", callback_data=MenuCallback(action=MenuAction.STATISTICS).pack())
     keyboard.adjust(1)
     return keyboard
 
 def get_user_pay_keyboard() -> InlineKeyboardBuilder:
     keyboard = InlineKeyboardBuilder()
-    keyboard.button(text="Не оплачені замовлення", callback_data="unpaid_order")
+    keyboard.button(text="Не оплачені замовлення", callback_data=MenuCallback(action=MenuAction.UNPAID).pack())
     keyboard.adjust(1)
     return keyboard
 
 def get_worker_order_keyboard(order_id: str) -> InlineKeyboardBuilder:
     keyboard = InlineKeyboardBuilder()
-    keyboard.button(text="📤 Відправити роботу", callback_data=f"send_work_{order_id}")
+    keyboard.button(text="📤 Відправити роботу", callback_data=OrderCallback(action=OrderAction.SEND_WORK, order_id=order_id).pack())
     keyboard.adjust(1)
     return keyboard
 
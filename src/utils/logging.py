@@ -1,35 +1,169 @@
+import atexit
+import copy
+import gzip
+import itertools
+import json
 import logging
-import sys
+import logging.handlers
 import os
+import queue
+import shutil
+import sys
+import threading
+
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
 from config import Config
 
 level = logging.DEBUG if Config.DEBUG else logging.INFO
 
-def get_logger(name: str = "bot"):
-    logger = logging.getLogger(name)
-    logger.setLevel(level)
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
-    if logger.handlers:
-        return logger
-    
-    log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    formatter = logging.Formatter(log_format)
+# Записи з усіх логерів проходять через одну чергу; у файл та консоль
+# їх пише окремий потік QueueListener, тому виклик logger.* не чекає на диск
+_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_queue_handler: Optional[logging.Handler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_setup_lock = threading.Lock()
+
+class JSONFormatter(logging.Formatter):
+    """Один JSON-об'єкт на рядок (для збору логів зовнішніми системами)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+            'process': record.process,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False)
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler, що зберігає повідомлення та traceback окремими полями.
+
+    Стандартний prepare() вклеює traceback у текст повідомлення, через що
+    JSON-формат не зміг би віддати його окремим полем.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class SamplingFilter(logging.Filter):
+    """
+    Пропускає кожен N-й запис рівня INFO та нижче (rate = 1/N); попередження
+    та помилки не відкидаються ніколи. Для логерів у гарячих циклах.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        if not self.every:
+            return False
+        return next(self._counter) % self.every == 0
+
+def _rotator(source: str, dest: str) -> None:
+    # Ротація виконується в потоці QueueListener, тому стиснення не блокує бота
+    with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+def _create_sinks() -> list:
+    formatter = JSONFormatter() if Config.LOG_FORMAT == 'json' else logging.Formatter(LOG_FORMAT)
 
     # Консольний обробник
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(level)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
 
-    # Запис логів в bot.log
-    log_dir = 'logs/'
-    log_path = 'logs/bot.log'
-
-    os.makedirs(log_dir, exist_ok=True)
-
-    file_handler = logging.FileHandler(log_path, encoding='utf-8-sig')
+    # Запис логів в bot.log з ротацією за розміром, старі файли стискаються (bot.log.1.gz, ...)
+    os.makedirs(Config.LOG_DIR, exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(
+        os.path.join(Config.LOG_DIR, 'bot.log'),
+        maxBytes=Config.LOG_MAX_BYTES,
+        backupCount=Config.LOG_BACKUP_COUNT,
+        encoding='utf-8-sig'
+    )
+    file_handler.namer = lambda name: f"{name}.gz"
+    file_handler.rotator = _rotator
     file_handler.setLevel(level)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+
+    return [console_handler, file_handler]
+
+def _ensure_listener() -> logging.Handler:
+    global _queue_handler, _listener
+
+    with _setup_lock:
+        if _queue_handler is None:
+            _listener = logging.handlers.QueueListener(_queue, *_create_sinks(), respect_handler_level=True)
+            _listener.start()
+            _queue_handler = _QueueHandler(_queue)
+            atexit.register(shutdown_logging)
+        return _queue_handler
+
+def shutdown_logging() -> None:
+    """Запис усіх записів з черги та зупинка потоку логування (викликається при виході)."""
+    global _listener
+
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+def _sample_rates() -> Dict[str, float]:
+    """Config.LOG_SAMPLING: 'handlers/admin/views=0.1,services/x=0.5'."""
+    rates = {}
+    for item in Config.LOG_SAMPLING.split(','):
+        name, _, rate = item.partition('=')
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+def get_logger(name: str = "bot", sample_rate: float = None):
+    """
+    Логер, що пише через спільну чергу в консоль та logs/bot.log
+
+    Args:
+        name: str - назва логера (наприклад 'services/db_pool')
+        sample_rate: float - частка записів INFO/DEBUG, що записуються (для гарячих циклів);
+                             Config.LOG_SAMPLING має пріоритет
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+
+    if logger.handlers:
+        return logger
+
+    logger.addHandler(_ensure_listener())
+    logger.propagate = False
+
+    sample_rate = _sample_rates().get(name, sample_rate)
+    if sample_rate is not None and sample_rate < 1:
+        logger.addFilter(SamplingFilter(sample_rate))
 
     return logger
@@ -0,0 +1,335 @@
+import bisect
+import time
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import TelegramObject, Update
+from aiohttp import web
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.db_pool import QueryTimer, db_timer
+from utils.logging import get_logger
+from utils.rate_limiter import outbound_limiter
+
+from config import Config
+
+logger = get_logger("utils/metrics")
+
+# Межі кошиків гістограм (секунди)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Час запитів до Bot API поточного оновлення (аналог db_timer)
+api_timer: ContextVar[Optional[QueryTimer]] = ContextVar("api_timer", default=None)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    """Гістограма з фіксованими кошиками (як histogram у Prometheus)."""
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # останній - +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Оцінка квантиля лінійною інтерполяцією всередині кошика (як histogram_quantile)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def render(self, name: str, labels: Labels) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {self.sum}")
+        lines.append(f"{name}_count{_labels(labels)} {self.count}")
+        return lines
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+def _handler_name(data: Dict[str, Any]) -> str:
+    handler = data.get("handler")
+    callback = getattr(handler, "callback", None)
+    return getattr(callback, "__name__", None) or "unknown"
+
+class BotMetrics:
+    """
+    Метрики обробки оновлень: час та помилки обробників, оновлення в обробці,
+    час роботи з БД та Bot API на одне оновлення.
+
+    Збирається трьома middleware (реєструються в BotRunner):
+    update_middleware - outer middleware dp.update (оновлення, час БД та Bot API),
+    handler_middleware - inner middleware dp.message / dp.callback_query
+    (після фільтрів, тому відомі роутер та обробник), api_middleware - middleware сесії бота.
+    Дані віддаються в текстовому форматі Prometheus (render(), /metrics на localhost)
+    та короткою зведенкою для адміністратора (summary()).
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.updates: Dict[str, int] = {}
+        self.updates_in_flight = 0
+        self.update_latency = Histogram()
+        self.update_db_time = Histogram()
+        self.update_api_time = Histogram()
+
+        self.handler_latency: Dict[Tuple[str, str], Histogram] = {}
+        self.handler_errors: Dict[Tuple[str, str], int] = {}
+        self.handlers_in_flight: Dict[str, int] = {}
+
+        self.api_latency: Dict[str, Histogram] = {}
+        self.api_errors: Dict[str, int] = {}
+
+        self.api_middleware = _APIMetricsMiddleware(self)
+        self._runner: Optional[web.AppRunner] = None
+
+    # --- Збір ------------------------------------------------------------
+
+    async def update_middleware(self,
+                                handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                                event: TelegramObject,
+                                data: Dict[str, Any]) -> Any:
+        event_type = event.event_type if isinstance(event, Update) else type(event).__name__
+        self.updates[event_type] = self.updates.get(event_type, 0) + 1
+        self.updates_in_flight += 1
+
+        db = QueryTimer(db_timer.get())
+        api = QueryTimer(api_timer.get())
+        db_token, api_token = db_timer.set(db), api_timer.set(api)
+        started_at = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            self.update_latency.observe(time.perf_counter() - started_at)
+            db_timer.reset(db_token)
+            api_timer.reset(api_token)
+            self.update_db_time.observe(db.total)
+            self.update_api_time.observe(api.total)
+            self.updates_in_flight -= 1
+
+    async def handler_middleware(self,
+                                 handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                                 event: TelegramObject,
+                                 data: Dict[str, Any]) -> Any:
+        router = data.get("event_router")
+        router_name = getattr(router, "name", None) or "unknown"
+        key = (router_name, _handler_name(data))
+
+        self.handlers_in_flight[router_name] = self.handlers_in_flight.get(router_name, 0) + 1
+        started_at = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            self.handler_errors[key] = self.handler_errors.get(key, 0) + 1
+            raise
+        finally:
+            histogram = self.handler_latency.get(key)
+            if histogram is None:
+                histogram = self.handler_latency[key] = Histogram()
+            histogram.observe(time.perf_counter() - started_at)
+            self.handlers_in_flight[router_name] -= 1
+
+    def observe_api(self, method: str, seconds: float, failed: bool) -> None:
+        histogram = self.api_latency.get(method)
+        if histogram is None:
+            histogram = self.api_latency[method] = Histogram()
+        histogram.observe(seconds)
+        if failed:
+            self.api_errors[method] = self.api_errors.get(method, 0) + 1
+
+        timer = api_timer.get()
+        if timer is not None:
+            timer.add(seconds)
+
+    # --- Вивід -----------------------------------------------------------
+
+    def render(self) -> str:
+        """Всі метрики в текстовому форматі Prometheus (version 0.0.4)."""
+        lines = [
+            "# HELP gradle_uptime_seconds Час роботи процесу бота.",
+            "# TYPE gradle_uptime_seconds gauge",
+            f"gradle_uptime_seconds {time.time() - self.started_at:.3f}",
+            "# HELP gradle_updates_total Отримані оновлення за типом.",
+            "# TYPE gradle_updates_total counter",
+        ]
+        lines += [f"gradle_updates_total{_labels((('type', t),))} {n}" for t, n in sorted(self.updates.items())]
+        lines += [
+            "# HELP gradle_updates_in_flight Оновлення, що обробляються зараз.",
+            "# TYPE gradle_updates_in_flight gauge",
+            f"gradle_updates_in_flight {self.updates_in_flight}",
+        ]
+        for name, description, histogram in (
+            ("gradle_update_duration_seconds", "Час обробки оновлення.", self.update_latency),
+            ("gradle_update_db_seconds", "Час роботи з БД на одне оновлення.", self.update_db_time),
+            ("gradle_update_api_seconds", "Час запитів до Bot API на одне оновлення.", self.update_api_time),
+        ):
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+            lines += histogram.render(name, ())
+
+        lines += [
+            "# HELP gradle_handler_duration_seconds Час роботи обробника (з inner middleware роутера).",
+            "# TYPE gradle_handler_duration_seconds histogram",
+        ]
+        for (router, handler), histogram in sorted(self.handler_latency.items()):
+            lines += histogram.render("gradle_handler_duration_seconds", (("router", router), ("handler", handler)))
+
+        lines += [
+            "# HELP gradle_handler_errors_total Необроблені винятки в обробниках.",
+            "# TYPE gradle_handler_errors_total counter",
+        ]
+        for (router, handler), count in sorted(self.handler_errors.items()):
+            lines.append(f"gradle_handler_errors_total{_labels((('router', router), ('handler', handler)))} {count}")
+
+        lines += [
+            "# HELP gradle_handlers_in_flight Обробники, що виконуються зараз, за роутером.",
+            "# TYPE gradle_handlers_in_flight gauge",
+        ]
+        for router, count in sorted(self.handlers_in_flight.items()):
+            lines.append(f"gradle_handlers_in_flight{_labels((('router', router),))} {count}")
+
+        lines += [
+            "# HELP gradle_api_request_duration_seconds Час запиту до Bot API за методом.",
+            "# TYPE gradle_api_request_duration_seconds histogram",
+        ]
+        for method, histogram in sorted(self.api_latency.items()):
+            lines += histogram.render("gradle_api_request_duration_seconds", (("method", method),))
+
+        lines += [
+            "# HELP gradle_api_errors_total Помилки запитів до Bot API за методом.",
+            "# TYPE gradle_api_errors_total counter",
+        ]
+        for method, count in sorted(self.api_errors.items()):
+            lines.append(f"gradle_api_errors_total{_labels((('method', method),))} {count}")
+
+        limiter = outbound_limiter.stats()
+        lines += [
+            "# HELP gradle_outbound_queue_depth Вихідні повідомлення в черзі лімітів Telegram.",
+            "# TYPE gradle_outbound_queue_depth gauge",
+            f"gradle_outbound_queue_depth {limiter['queue_depth']}",
+            "# HELP gradle_outbound_retries_total Повтори після flood control.",
+            "# TYPE gradle_outbound_retries_total counter",
+            f"gradle_outbound_retries_total {limiter['retries']}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def summary(self, limit: int = 10) -> str:
+        """
+        Коротка зведенка для команди /metrics
+
+        Args:
+            limit: int - скільки найповільніших обробників показати (за p95)
+        """
+        uptime = int(time.time() - self.started_at)
+        total = sum(self.updates.values())
+        text = (
+            f"📈 Метрики бота\n\n"
+            f"⏱ Працює: {uptime // 3600} год {uptime % 3600 // 60} хв\n"
+            f"📨 Оновлень: {total} (зараз в обробці: {self.updates_in_flight})\n"
+            f"🕒 Оновлення p50/p95: {_ms(self.update_latency.quantile(0.5))} / {_ms(self.update_latency.quantile(0.95))}\n"
+            f"🗄 БД на оновлення p50/p95: {_ms(self.update_db_time.quantile(0.5))} / {_ms(self.update_db_time.quantile(0.95))}\n"
+            f"📡 Bot API на оновлення p50/p95: {_ms(self.update_api_time.quantile(0.5))} / {_ms(self.update_api_time.quantile(0.95))}\n"
+        )
+
+        slowest = sorted(self.handler_latency.items(), key=lambda item: item[1].quantile(0.95), reverse=True)
+        if slowest:
+            text += f"\n🐢 Найповільніші обробники (p95, к-сть, помилки):\n"
+            for (router, handler), histogram in slowest[:limit]:
+                errors = self.handler_errors.get((router, handler), 0)
+                text += f"- {router}/{handler}: {_ms(histogram.quantile(0.95))}, {histogram.count}, {errors}\n"
+
+        busy = {router: count for router, count in self.handlers_in_flight.items() if count}
+        if busy:
+            text += "\n⚙️ В обробці за роутером: " + ", ".join(f"{r}: {n}" for r, n in sorted(busy.items())) + "\n"
+
+        api_errors = sum(self.api_errors.values())
+        api_calls = sum(histogram.count for histogram in self.api_latency.values())
+        text += f"\n📡 Запитів до Bot API: {api_calls} (помилок: {api_errors})"
+        return text
+
+    # --- HTTP ------------------------------------------------------------
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(body=self.render().encode("utf-8"),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+    async def start_server(self, host: str = None, port: int = None) -> None:
+        """
+        Запуск HTTP-ендпоінта /metrics (Config.METRICS_HOST:Config.METRICS_PORT)
+
+        Порт 0 вимикає ендпоінт. Помилка запуску (наприклад, зайнятий порт) не зупиняє бота.
+        """
+        host = host or Config.METRICS_HOST
+        port = Config.METRICS_PORT if port is None else port
+        if not port or self._runner is not None:
+            return
+
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, host, port).start()
+        except OSError as e:
+            logger.warning(f"Не вдалося запустити /metrics на {host}:{port}: {e}")
+            await runner.cleanup()
+            return
+
+        self._runner = runner
+        logger.info(f"Метрики доступні на http://{host}:{port}/metrics")
+
+    async def stop_server(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+class _APIMetricsMiddleware(BaseRequestMiddleware):
+    """Час кожного запиту до Bot API (реєструється після лімітів, тому без часу в черзі)."""
+
+    def __init__(self, metrics: BotMetrics):
+        self.metrics = metrics
+
+    async def __call__(self,
+                       make_request: NextRequestMiddlewareType[TelegramType],
+                       bot: Bot,
+                       method: TelegramMethod[TelegramType]) -> Response[TelegramType]:
+        started_at = time.perf_counter()
+        failed = True
+        try:
+            response = await make_request(bot, method)
+            failed = False
+            return response
+        finally:
+            self.metrics.observe_api(type(method).__name__, time.perf_counter() - started_at, failed)
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.0f} мс"
+
+metrics = BotMetrics()
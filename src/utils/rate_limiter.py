@@ -0,0 +1,187 @@
+import asyncio
+import time
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from typing import Dict, Optional, Union
+
+from utils.logging import get_logger
+
+from config import Config
+
+logger = get_logger("utils/rate_limiter")
+
+# Методи, що надсилають або змінюють повідомлення в чаті і підпадають під ліміти Telegram
+LIMITED_METHOD_PREFIXES = ("Send", "Copy", "Forward", "Edit")
+
+# Скільки неактивних чатів тримати в пам'яті до очищення
+MAX_IDLE_CHATS = 1000
+
+class TokenBucket:
+    """
+    Token bucket: rate токенів за секунду, не більше capacity накопичених.
+
+    Очікувачі обслуговуються по черзі (asyncio.Lock віддає lock в порядку FIFO).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    @property
+    def is_full(self) -> bool:
+        self._refill()
+        return self.tokens >= self.capacity and not self._lock.locked()
+
+    async def acquire(self, amount: float = 1) -> None:
+        """Очікує, поки в bucket з'явиться amount токенів, і забирає їх."""
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+class _ChatState:
+    __slots__ = ("bucket", "lock", "waiting")
+
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.lock = asyncio.Lock() # FIFO - зберігає порядок повідомлень у чаті
+        self.waiting = 0
+
+class OutboundRateLimiter(BaseRequestMiddleware):
+    """
+    Middleware сесії бота, що обмежує швидкість вихідних повідомлень.
+
+    Кожен запит, що надсилає повідомлення, проходить через чергу свого чату
+    (порядок повідомлень у чаті зберігається, різні чати працюють паралельно),
+    per-chat token bucket (особисті чати / групи та канали) та глобальний bucket.
+    При TelegramRetryAfter запит повторюється після вказаної паузи.
+    """
+
+    def __init__(self,
+                 global_rate: float = None,
+                 chat_rate: float = None,
+                 group_rate_per_minute: float = None,
+                 max_retries: int = None):
+        global_rate = global_rate or Config.OUTBOUND_GLOBAL_RATE
+        self.chat_rate = chat_rate or Config.OUTBOUND_CHAT_RATE
+        self.group_rate = (group_rate_per_minute or Config.OUTBOUND_GROUP_RATE_PER_MIN) / 60
+        self.max_retries = Config.OUTBOUND_MAX_RETRIES if max_retries is None else max_retries
+
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self._chats: Dict[Union[int, str], _ChatState] = {}
+
+        # Метрики
+        self.waiting = 0
+        self.dequeued = 0
+        self.sent = 0
+        self.retries = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @staticmethod
+    def _is_group(chat_id: Union[int, str]) -> bool:
+        # Групи та канали мають від'ємний ID або @username
+        return isinstance(chat_id, str) or chat_id < 0
+
+    def _chat_state(self, chat_id: Union[int, str]) -> _ChatState:
+        state = self._chats.get(chat_id)
+        if state is None:
+            if len(self._chats) >= MAX_IDLE_CHATS:
+                self._drop_idle_chats()
+            if self._is_group(chat_id):
+                bucket = TokenBucket(self.group_rate, Config.OUTBOUND_GROUP_BURST)
+            else:
+                bucket = TokenBucket(self.chat_rate, 1)
+            state = self._chats[chat_id] = _ChatState(bucket)
+        return state
+
+    def _drop_idle_chats(self) -> None:
+        idle = [
+            chat_id for chat_id, state in self._chats.items()
+            if not state.waiting and not state.lock.locked() and state.bucket.is_full
+        ]
+        for chat_id in idle:
+            del self._chats[chat_id]
+
+    @staticmethod
+    def _cost(method: TelegramMethod) -> int:
+        # Альбом рахується Telegram як окремі повідомлення
+        media = getattr(method, "media", None)
+        return len(media) if isinstance(media, list) else 1
+
+    async def __call__(self,
+                       make_request: NextRequestMiddlewareType[TelegramType],
+                       bot: Bot,
+                       method: TelegramMethod[TelegramType]) -> Response[TelegramType]:
+        chat_id: Optional[Union[int, str]] = getattr(method, "chat_id", None)
+        if chat_id is None or not type(method).__name__.startswith(LIMITED_METHOD_PREFIXES):
+            return await make_request(bot, method)
+
+        state = self._chat_state(chat_id)
+        cost = self._cost(method)
+
+        queued_at = time.monotonic()
+        self.waiting += 1
+        state.waiting += 1
+        try:
+            async with state.lock:
+                await state.bucket.acquire(cost)
+                await self.global_bucket.acquire(cost)
+
+                waited = time.monotonic() - queued_at
+                self.dequeued += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+                self.waiting -= 1
+                state.waiting -= 1
+                queued_at = None
+
+                attempt = 0
+                while True:
+                    try:
+                        response = await make_request(bot, method)
+                        self.sent += 1
+                        return response
+                    except TelegramRetryAfter as e:
+                        attempt += 1
+                        if attempt > self.max_retries:
+                            raise
+                        self.retries += 1
+                        logger.warning(
+                            f"Flood control у чаті {chat_id}: повтор {attempt} через {e.retry_after} с"
+                        )
+                        await asyncio.sleep(e.retry_after)
+        finally:
+            if queued_at is not None:
+                # Запит скасовано ще в черзі
+                self.waiting -= 1
+                state.waiting -= 1
+
+    def stats(self) -> Dict[str, float]:
+        """Метрики черги: очікуючі запити, кількість надісланих та час очікування в черзі."""
+        return {
+            'queue_depth': self.waiting,
+            'active_chats': len(self._chats),
+            'sent': self.sent,
+            'retries': self.retries,
+            'wait_avg': self.wait_total / self.dequeued if self.dequeued else 0.0,
+            'wait_max': self.wait_max,
+        }
+
+outbound_limiter = OutboundRateLimiter()
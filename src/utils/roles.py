@@ -0,0 +1,109 @@
+from enum import Enum
+
+from aiogram import BaseMiddleware, Router
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.filters import Command
+from aiogram.types import CallbackQuery, Message, TelegramObject, User
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple, Union
+
+from utils.callbacks import CallbackTable
+
+from config import Config
+
+DENIED_TEXT = "У вас немає прав для виконання цієї команди."
+
+class Role(str, Enum):
+    ADMIN = "admin"
+    USER = "user"
+
+def is_admin(user_id: Optional[int]) -> bool:
+    """Перевірка прав адміністратора (Config.ADMIN_IDS - frozenset, пошук O(1))."""
+    return user_id in Config.ADMIN_IDS
+
+def resolve_role(user: Optional[User]) -> Role:
+    return Role.ADMIN if user is not None and is_admin(user.id) else Role.USER
+
+async def deny(event: Union[Message, CallbackQuery]) -> None:
+    """Відповідь користувачу без прав (для callback-запиту - alert, щоб кнопка не "зависла")."""
+    if isinstance(event, CallbackQuery):
+        await event.answer(DENIED_TEXT, show_alert=True)
+    else:
+        await event.answer(DENIED_TEXT)
+
+class RoleMiddleware(BaseMiddleware):
+    """
+    Визначає роль відправника один раз на оновлення та додає її в data['role'].
+
+    Реєструється як outer middleware для dp.update (після вбудованого
+    UserContextMiddleware, що заповнює data['event_from_user']).
+    """
+
+    async def __call__(self,
+                       handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject,
+                       data: Dict[str, Any]) -> Any:
+        data['role'] = resolve_role(data.get('event_from_user'))
+        return await handler(event, data)
+
+class AdminOnlyMiddleware(BaseMiddleware):
+    """
+    Пропускає в роутер лише оновлення адміністраторів.
+
+    Підключається до адмін-роутерів через protect() як outer middleware для
+    message/callback_query, тому для решти користувачів фільтри обробників роутера
+    не перевіряються зовсім: повертається UNHANDLED і диспетчер переходить до
+    наступного роутера. Відмову отримують лише адмінські команди та кнопки - вони
+    шукаються за множинами, зібраними з роутерів при реєстрації (O(1) на оновлення).
+    """
+
+    def __init__(self):
+        self.commands: Set[str] = set()
+        self.callbacks: Set[Tuple[str, Optional[str]]] = set()
+
+    def protect(self, router: Router) -> None:
+        """
+        Підключення до адмін-роутера (після реєстрації його обробників)
+
+        Запам'ятовує команди (Command) та callback-и (CallbackTable) роутера,
+        на які користувачу без прав надсилається відмова.
+        """
+        router.message.outer_middleware(self)
+        router.callback_query.outer_middleware(self)
+
+        for handler_object in router.message.handlers:
+            for filter_object in handler_object.filters or ():
+                if isinstance(filter_object.callback, Command):
+                    self.commands.update(
+                        command for command in filter_object.callback.commands if isinstance(command, str)
+                    )
+        for table in CallbackTable.of(router):
+            self.callbacks.update(table.keys())
+
+    def _is_admin_action(self, event: TelegramObject) -> bool:
+        if isinstance(event, CallbackQuery):
+            if not event.data:
+                return False
+            prefix, _, rest = event.data.partition(':')
+            return (prefix, rest.split(':', 1)[0]) in self.callbacks or (prefix, None) in self.callbacks
+        if isinstance(event, Message) and event.text and event.text.startswith('/'):
+            command = event.text.split(maxsplit=1)[0][1:].split('@', 1)[0]
+            return command in self.commands
+        return False
+
+    async def __call__(self,
+                       handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject,
+                       data: Dict[str, Any]) -> Any:
+        role = data.get('role')
+        if role is None:
+            role = resolve_role(data.get('event_from_user'))
+        if role is Role.ADMIN:
+            return await handler(event, data)
+
+        if self._is_admin_action(event):
+            await deny(event)
+            return True
+        return UNHANDLED
+
+role_middleware = RoleMiddleware()
+admin_only = AdminOnlyMiddleware()
@@ -6,7 +6,7 @@ ALLOWED_COURSES = ['1', '2', '3', '4']
 ALLOWED_TABLES = {
     'user_data': ['ID', 'user_name', 'user_link', 'real_full_name', 'for_father', 'education', 'course', 'edu_group', 'phone_number', 'language_code', 'created_at'],
     'order_request': ['ID_order', 'ID_user', 'ID_worker', 'subject', 'type_work', 'order_details', 'status', 'created_at', 'taken_at', 'completed_at', 'updated_at'],
-    'payments': ['id_operation', 'ID_order', 'status', 'price', 'paid', 'created_at', 'paid_at']
+    'payments': ['id_operation', 'ID_order', 'client_id', 'status', 'price', 'paid', 'created_at', 'paid_at']
 
 }
 
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Код бота імпортується як у main.py (з каталогу src), а config перевіряє налаштування при імпорті
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+os.environ.setdefault("BOT_TOKEN", "1:test")
+os.environ.setdefault("ADMIN_IDS", "1")
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from services.shared_state import SharedState
+
+async def wait_for(condition, timeout: float = 3.0) -> None:
+    """Очікування, поки listener обробить повідомлення pub/sub."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        if loop.time() > deadline:
+            raise AssertionError("Умова не виконалась вчасно")
+        await asyncio.sleep(0.01)
+
+# --- Один процес (REDIS_URL не задано) ---
+
+def test_local_state_is_not_shared():
+    state = SharedState()
+    state.connect()
+    assert not state.is_shared
+
+    async def scenario():
+        await state.start()
+        await state.publish_invalidation('user', user_id=1)
+        state.notify_invalidation('user', user_id=1)
+        await state.close()
+
+    asyncio.run(scenario())
+
+def test_local_state_has_no_redis_fsm():
+    with pytest.raises(RuntimeError):
+        SharedState().create_fsm_storage()
+
+def test_dispatch_isolates_handler_errors():
+    state = SharedState()
+    received = []
+
+    def broken(payload):
+        raise ValueError("broken handler")
+
+    state.on_invalidate('user', broken)
+    state.on_invalidate('user', received.append)
+    state._dispatch('user', {'user_id': 1})
+    state._dispatch('order', {'order_id': '1'})
+
+    assert received == [{'user_id': 1}]
+
+# --- Кілька процесів через Redis (fakeredis) ---
+
+@pytest.fixture
+def redis_pair():
+    """Два екземпляри SharedState, підключені до одного fakeredis-сервера (як два процеси бота)."""
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+
+    def make() -> SharedState:
+        state = SharedState()
+        state.connect(fakeredis.FakeAsyncRedis(server=server))
+        return state
+
+    return make(), make()
+
+def test_invalidation_reaches_other_processes(redis_pair):
+    first, second = redis_pair
+    first_received, second_received = [], []
+    first.on_invalidate('user', first_received.append)
+    second.on_invalidate('user', second_received.append)
+
+    async def scenario():
+        await first.start()
+        await second.start()
+        # Підписка listener-а відбувається в його задачі
+        await wait_for(lambda: second._listener is not None)
+        await asyncio.sleep(0.1)
+
+        await first.publish_invalidation('user', user_id=7, user_link='@user7')
+        await wait_for(lambda: second_received)
+        await asyncio.sleep(0.1)
+
+        await first.close()
+        await second.close()
+
+    asyncio.run(scenario())
+
+    assert second_received == [{'user_id': 7, 'user_link': '@user7'}]
+    # Власні повідомлення не обробляються
+    assert first_received == []
+
+def test_notify_invalidation_tasks_are_tracked(redis_pair):
+    first, second = redis_pair
+    received = []
+    second.on_invalidate('user', received.append)
+
+    async def scenario():
+        await second.start()
+        await asyncio.sleep(0.1)
+
+        first.notify_invalidation('user', user_id=1)
+        first.notify_invalidation('user', user_id=2)
+        assert len(first._pending) == 2
+
+        await wait_for(lambda: len(received) == 2)
+        assert not first._pending
+
+        # close() дочікується публікацій, що ще не завершились
+        first.notify_invalidation('user', user_id=3)
+        await first.close()
+        await wait_for(lambda: len(received) == 3)
+        await second.close()
+
+    asyncio.run(scenario())
+
+    assert [payload['user_id'] for payload in received] == [1, 2, 3]
+
+def test_redis_fsm_storage_is_shared(redis_pair):
+    pytest.importorskip("redis")
+    from aiogram.fsm.storage.base import StorageKey
+
+    first, second = redis_pair
+    key = StorageKey(bot_id=1, chat_id=10, user_id=10)
+
+    async def scenario():
+        first_storage = first.create_fsm_storage()
+        second_storage = second.create_fsm_storage()
+
+        await first_storage.set_state(key, "OrderStates:waiting_subject")
+        await first_storage.set_data(key, {'subject': 'math'})
+
+        assert await second_storage.get_state(key) == "OrderStates:waiting_subject"
+        assert await second_storage.get_data(key) == {'subject': 'math'}
+
+        await second_storage.set_state(key, None)
+        assert await first_storage.get_state(key) is None
+
+        await first.close()
+        await second.close()
+
+    asyncio.run(scenario())